@@ -0,0 +1,64 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark rubisco.lib.variable.format.format_many.
+
+It's compared with calling format_str in a loop.
+"""
+
+import sys
+import time
+
+from rubisco.lib.variable.format import format_many, format_str
+
+COUNT = 20
+
+
+def main() -> None:
+    """Run the benchmark."""
+    fmt = {f"var{i}": i for i in range(8)}
+    strings = [
+        f"${{{{var{i % 8}}}}}/item{i % 50}-${{{{var{(i + 1) % 8}}}}}"
+        for i in range(1000)
+    ]
+
+    expected: list[object] = []
+    res: list[object] = []
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        expected = [format_str(string, fmt=fmt) for string in strings]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        res = format_many(strings, fmt=fmt)
+    many_time = time.perf_counter() - start
+
+    if res != expected:
+        msg = "format_many() should be the same as format_str()."
+        raise AssertionError(msg)
+    sys.stdout.write(
+        f"format_str loop: {loop_time / COUNT * 1e3:.2f} ms, "
+        f"format_many: {many_time / COUNT * 1e3:.2f} ms "
+        f"for {len(strings)} strings.\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark the throughput of rubisco.lib.variable.lexer in MB/s.
+
+The scanner is compared with the character-by-character reference lexer of
+the differential test.
+"""
+
+import sys
+import time
+
+from rubisco.lib.variable.lexer import get_token
+from tests.rubisco_tests.lib.variable.test_lexer_differential import (
+    _reference_get_token,  # pyright: ignore[reportPrivateUsage]
+)
+
+SCRIPT = (
+    'if [ -d "$HOME/.cache" ]; then echo "cache found"; fi\n'
+    "${{ cc }} -O2 -Wall -o build/${{name:a.out}} src/main.c\n"
+    "test $&{{ nproc * 2 }} -gt 1 && make -j$(nproc) all\n"
+)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    expression = SCRIPT * 8192
+    size = len(expression.encode()) / 1024 / 1024
+
+    start = time.perf_counter()
+    tokens = get_token(expression)
+    scanner_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = _reference_get_token(expression)
+    reference_time = time.perf_counter() - start
+
+    if tokens != expected:
+        msg = "The scanner and the reference lexer differ."
+        raise AssertionError(msg)
+    sys.stdout.write(
+        f"Lexer throughput: {size / scanner_time:.2f} MB/s "
+        f"(reference: {size / reference_time:.2f} MB/s).\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
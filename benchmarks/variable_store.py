@@ -0,0 +1,75 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark the variable store of rubisco.lib.variable.variable.
+
+The lookup is compared with the top of a rubisco.lib.stack.Stack, which the
+store used before.
+"""
+
+import sys
+import time
+
+from rubisco.lib.stack import Stack
+from rubisco.lib.variable.variable import (
+    get_variable,
+    pop_frame,
+    pop_variables,
+    push_frame,
+    push_variables,
+)
+
+COUNT = 100000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    scope = {f"project.var{i}": i for i in range(8)}
+
+    push_variables("a", 1)
+    try:
+        start = time.perf_counter()
+        for _ in range(COUNT):
+            get_variable("a")
+        get_time = time.perf_counter() - start
+    finally:
+        pop_variables("a")
+
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        pop_frame(push_frame(scope))
+    frame_time = time.perf_counter() - start
+
+    stack: Stack[int] = Stack()
+    stack.put(1)
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        stack.top()
+    stack_time = time.perf_counter() - start
+
+    sys.stdout.write(
+        f"get_variable: {get_time / COUNT * 1e9:.0f} ns, "
+        f"push/pop frame of {len(scope)}: "
+        f"{frame_time / COUNT * 1e9:.0f} ns, "
+        f"Stack.top: {stack_time / COUNT * 1e9:.0f} ns.\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,7 @@ from rubisco.kernel.command_event.event_types import (
     EventObjectType,
 )
 from rubisco.kernel.command_event.register import EventUnit, register_events
+from rubisco.kernel.workflow.scheduler import DEFAULT_MAX_JOBS
 from rubisco.lib.l10n import _
 
 __all__ = [
@@ -92,6 +93,38 @@ def init_arg_parser() -> None:
                     typecheck=str,
                     default="",
                 ),
+                Option[int](
+                    name="jobs",
+                    title=_("Jobs"),
+                    description=_(
+                        "The max count of workflow steps running at the same "
+                        "time.",
+                    ),
+                    typecheck=int,
+                    aliases=["j"],
+                    default=DEFAULT_MAX_JOBS,
+                ),
+                Option[str](
+                    name="trace",
+                    title=_("Trace file"),
+                    description=_(
+                        "Save the time of workflows, steps and processes as "
+                        "Chrome trace JSON.",
+                    ),
+                    typecheck=str,
+                    default="",
+                ),
+                Option[bool](
+                    name="check",
+                    title=_("Check"),
+                    description=_(
+                        "Check the workflows of all hooks without running "
+                        "them. Values with variables are checked when the "
+                        "steps run.",
+                    ),
+                    typecheck=bool,
+                    default=False,
+                ),
                 Option[bool](
                     name="rubisco-debug",
                     title=_("Debug mode"),
@@ -156,10 +189,14 @@ def get_arg_parser() -> argparse.ArgumentParser:
         argparse.ArgumentParser: The generated argument parser.
 
     """
+    # The early options are parsed before the event tree is loaded, but the
+    # full parser must know them too. Otherwise their values, like "2" of
+    # "-j 2", are taken as commands.
     arg_parser = argparse.ArgumentParser(
         description="Rubisco CLI",
         formatter_class=RUHelpFormatter,
         allow_abbrev=True,
+        parents=[early_arg_parser],
     )
 
     arg_parser.register("action", "version", CLIVersionAction)
@@ -202,3 +239,35 @@ early_arg_parser.add_argument(
     default=set(),
     dest="used_prompt_colors",
 )
+
+# For "rubisco -j JOBS".
+early_arg_parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    help=_("The max count of workflow steps running at the same time."),
+    action="store",
+    dest="jobs",
+)
+
+# For "rubisco --check".
+early_arg_parser.add_argument(
+    "--check",
+    help=_(
+        "Check the workflows of all hooks without running them. Values with "
+        "variables are checked when the steps run.",
+    ),
+    action="store_true",
+    dest="check",
+)
+
+# For "rubisco --trace FILE".
+early_arg_parser.add_argument(
+    "--trace",
+    type=str,
+    help=_(
+        "Save the time of workflows, steps and processes as Chrome trace JSON.",
+    ),
+    action="store",
+    dest="trace",
+)
@@ -21,17 +21,23 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from rubisco.cli.main.project_config import get_project_config
+from rubisco.kernel.command_event.args import Argument, load_callback_args
 from rubisco.kernel.command_event.callback import EventCallback
 from rubisco.kernel.command_event.event_file_data import EventFileData
 from rubisco.kernel.command_event.event_path import EventPath
+from rubisco.kernel.workflow import load_workflow_file
+from rubisco.kernel.workflow.references import get_workflow_references
 from rubisco.lib.l10n import _
+from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
 if TYPE_CHECKING:
-    from rubisco.kernel.command_event.args import Argument, Option
+    from rubisco.kernel.command_event.args import Option
+    from rubisco.lib.variable.references import VariableReferences
 
 __all__ = ["register_builtin_cmds"]
 
@@ -53,6 +59,56 @@ def show_project_info(
     )
 
 
+def _format_references(title: str, refs: VariableReferences) -> str:
+    names = ", ".join(sorted(refs.names)) if refs.names else _("<None>")
+    res = f"[green]{title}[/green]: {names}"
+    for pyexpr in refs.opaque:
+        res += "\n\t" + fast_format_str(
+            _("[yellow]Opaque python expression:[/yellow] ${{expr}}"),
+            fmt={"expr": pyexpr.strip()},
+        )
+    return res
+
+
+def show_workflow_deps(
+    options: list[Option[Any]],
+    args: list[Argument[Any]],
+) -> None:
+    """For 'rubisco workflow-deps FILE' command.
+
+    Print the variables referenced by each step of the workflow, without
+    running it.
+
+    Args:
+        options (list[Option[Any]]): List of options.
+        args (list[Argument[Any]]): List of arguments.
+
+    """
+    _opts, args_ = load_callback_args(options, args)
+    file = Path(args_[0])
+    refs = get_workflow_references(load_workflow_file(file), file.stem)
+
+    call_ktrigger(
+        IKernelTrigger.on_output,
+        message=fast_format_str(
+            _("Workflow [cyan]${{id}}[/cyan] defines: ${{vars}}"),
+            fmt={
+                "id": refs.id,
+                "vars": ", ".join(refs.defines) or _("<None>"),
+            },
+        ),
+    )
+    call_ktrigger(
+        IKernelTrigger.on_output,
+        message=_format_references(refs.id, refs.workflow),
+    )
+    for step_id, step_refs in refs.steps.items():
+        call_ktrigger(
+            IKernelTrigger.on_output,
+            message=_format_references(step_id, step_refs),
+        )
+
+
 def register_builtin_cmds() -> None:
     """Register built-in commands."""
     # If user don't provide any arguments. We should show the project info.
@@ -70,3 +126,25 @@ def register_builtin_cmds() -> None:
         ),
         description=_("Show project information."),
     )
+
+    EventPath("/workflow-deps").mkfile(
+        EventFileData(
+            args=[
+                Argument[str](
+                    name="workflow",
+                    title=_("Workflow file"),
+                    description=_("The workflow file to analyze."),
+                    typecheck=str,
+                ),
+            ],
+            callbacks=[
+                EventCallback(
+                    callback=show_workflow_deps,
+                    description=_(
+                        "Show the variables referenced by each workflow step.",
+                    ),
+                ),
+            ],
+        ),
+        description=_("Show variable dependencies of a workflow (debug)."),
+    )
@@ -28,6 +28,7 @@ import colorama
 import rich
 import rich.live
 import rich.progress
+import rich.table
 from pygments import highlight  # type: ignore[attr-defined]
 from pygments.formatters.terminal256 import Terminal256Formatter
 from pygments.lexers import get_lexer_by_name
@@ -35,6 +36,7 @@ from pygments.lexers import get_lexer_by_name
 from rubisco.cli.input import ask_yesno
 from rubisco.cli.main.project_config import get_hooks
 from rubisco.cli.output import (
+    get_level,
     get_prompt,
     output_error,
     output_hint,
@@ -43,6 +45,7 @@ from rubisco.cli.output import (
     output_warning,
     pop_level,
     push_level,
+    set_level,
     sum_level_indent,
 )
 from rubisco.config import (
@@ -64,6 +67,7 @@ if TYPE_CHECKING:
     from rubisco.envutils.packages import ExtensionPackageInfo
     from rubisco.kernel.project_config import ProjectConfigration
     from rubisco.kernel.workflow.step import Step
+    from rubisco.kernel.workflow.steps.matrix import MatrixJobResult
     from rubisco.kernel.workflow.workflow import Workflow
     from rubisco.lib.process import Process
     from rubisco.lib.variable.autoformatdict import AutoFormatDict
@@ -89,6 +93,7 @@ class RubiscoKTrigger(  # pylint: disable=too-many-public-methods
     task_totals: dict[str, float]
     live: rich.live.Live | None
     _speedtest_hosts: dict[str, str]
+    _matrix_levels: list[int]
 
     def __init__(self) -> None:
         super().__init__()
@@ -98,6 +103,7 @@ class RubiscoKTrigger(  # pylint: disable=too-many-public-methods
         self.task_totals = {}
         self.live = None
         self._speedtest_hosts = {}
+        self._matrix_levels = []
 
     def _highlight_command(self, shell: Path, cmd: str) -> str:
         shellname = shell.name.lower()
@@ -336,6 +342,13 @@ class RubiscoKTrigger(  # pylint: disable=too-many-public-methods
     ) -> None:
         pop_level()
 
+    def on_step_up_to_date(
+        self,
+        *,
+        step: Step,  # noqa: ARG002
+    ) -> None:
+        output_step(_("Up to date, skipped."))
+
     def pre_run_workflow(self, *, workflow: Workflow) -> None:
         if workflow.name:
             output_step(
@@ -360,14 +373,46 @@ class RubiscoKTrigger(  # pylint: disable=too-many-public-methods
             )
 
     def pre_run_matrix(self, *, variables: AutoFormatDict) -> None:
+        self._matrix_levels.append(get_level())
         output_step(fast_format_str(_("Running jobs with variables:")))
         push_level()
         for key, val in variables.items():
             output_line(f"{key}: {val!r}")
         pop_level()
 
-    def post_run_matrix(self, *, variables: AutoFormatDict) -> None:
-        pass
+    def post_run_matrix(
+        self,
+        *,
+        variables: AutoFormatDict,  # noqa: ARG002
+    ) -> None:
+        # Steps of a failed job don't pop their levels.
+        if self._matrix_levels:
+            set_level(self._matrix_levels.pop())
+
+    def on_matrix_summary(self, *, results: list[MatrixJobResult]) -> None:
+        statuses = {
+            "success": _("[green]Success[/green]"),
+            "failure": _("[red]Failure[/red]"),
+            "cancelled": _("[yellow]Cancelled[/yellow]"),
+        }
+        table = rich.table.Table(
+            "#",
+            _("Variables"),
+            _("Status"),
+            _("Duration"),
+            box=None,
+        )
+        for result in results:
+            table.add_row(
+                str(result.index),
+                ", ".join(
+                    f"{key}={val!r}" for key, val in result.variables.items()
+                ),
+                statuses[result.status.value],
+                f"{result.duration:.2f}s",
+            )
+        output_step(_("Matrix summary:"))
+        rich.print(table)
 
     def on_mkdir(self, *, path: Path) -> None:
         output_step(
@@ -25,6 +25,7 @@ import atexit
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import colorama
 
@@ -37,35 +38,93 @@ from rubisco.cli.main.builtin_cmds import register_builtin_cmds
 from rubisco.cli.main.extman_cmds import register_extman_cmds
 from rubisco.cli.main.ktrigger import RubiscoKTrigger
 from rubisco.cli.main.log_cleaner import clean_logfile
-from rubisco.cli.main.project_config import load_project
+from rubisco.cli.main.project_config import check_hooks, load_project
 from rubisco.cli.output import output_step, set_available_color, show_exception
 from rubisco.config import (
     APP_VERSION,
 )
+from rubisco.kernel.workflow.scheduler import set_max_jobs
 from rubisco.lib.exceptions import RUNotRubiscoProjectError
 from rubisco.lib.l10n import _
 from rubisco.lib.log import logger
 from rubisco.lib.variable import make_pretty
 from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.template_cache import (
+    render_memo_info,
+    template_cache_info,
+)
 from rubisco.shared.extension import load_all_extensions
 from rubisco.shared.ktrigger import (
     bind_ktrigger_interface,
 )
+from rubisco.shared.trace import TraceKTrigger
+
+if TYPE_CHECKING:
+    import argparse
 
 __all__ = ["main"]
 
 
 def on_exit() -> None:
-    """Reset terminal color."""
+    """Reset terminal color and log the template cache statistics."""
     sys.stdout.write(colorama.Fore.RESET)
     sys.stdout.flush()
+    cache_info = template_cache_info()
+    memo_info = render_memo_info()
+    logger.debug(
+        "Template cache: %d hits, %d misses, %d/%d cached.",
+        cache_info.hits,
+        cache_info.misses,
+        cache_info.currsize,
+        cache_info.maxsize,
+    )
+    logger.debug(
+        "Memoized rendering: %d hits, %d misses, %d uncacheable.",
+        memo_info.hits,
+        memo_info.misses,
+        memo_info.uncacheable,
+    )
 
 
 atexit.register(on_exit)
 
 
-def parse_early_arguments() -> None:
-    """Parse early arguments."""
+def start_trace() -> None:
+    """Trace the kernel operations if `--trace FILE` is given.
+
+    It's started before loading extensions, so they are traced too.
+    """
+    trace_file: str | None = early_arg_parser.parse_known_args()[0].trace
+    if not trace_file:
+        return
+
+    path = Path(trace_file).absolute()
+    tracer = TraceKTrigger()
+    bind_ktrigger_interface("trace", tracer)
+
+    def _save_trace() -> None:
+        try:
+            tracer.save(path)
+        except OSError as exc:
+            show_exception(exc)
+            return
+        output_step(
+            fast_format_str(
+                _("Trace is saved to ${{path}}."),
+                fmt={"path": make_pretty(path)},
+            ),
+        )
+
+    atexit.register(_save_trace)
+
+
+def parse_early_arguments() -> argparse.Namespace:
+    """Parse early arguments.
+
+    Returns:
+        argparse.Namespace: The early arguments.
+
+    """
     early_args = early_arg_parser.parse_known_args()[0]
 
     set_available_color(early_args.used_prompt_colors)
@@ -81,6 +140,11 @@ def parse_early_arguments() -> None:
         )
         os.chdir(rootdir)
 
+    if early_args.jobs is not None:
+        set_max_jobs(early_args.jobs)
+
+    return early_args
+
 
 def main() -> None:
     """Rubisco main entry point."""
@@ -89,6 +153,7 @@ def main() -> None:
         logger.info("Rubisco CLI version %s started.", str(APP_VERSION))
         colorama.init()
         bind_ktrigger_interface("rubisco", RubiscoKTrigger())
+        start_trace()
         init_arg_parser()
         load_all_extensions()
 
@@ -96,7 +161,7 @@ def main() -> None:
         register_builtin_cmds()
         register_extman_cmds()
 
-        parse_early_arguments()
+        early_args = parse_early_arguments()
 
         try:
             load_project()
@@ -107,6 +172,10 @@ def main() -> None:
         if no_project_mode:
             logger.debug("Running in no project mode.")
 
+        if early_args.check:
+            check_hooks()
+            sys.exit(0)
+
         arg_parser = get_arg_parser()
 
         args = arg_parser.parse_known_args()[0]
@@ -24,6 +24,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
 
+from rubisco.cli.output import output_step, show_exception
 from rubisco.config import USER_REPO_CONFIG
 from rubisco.kernel.command_event.callback import EventCallback
 from rubisco.kernel.command_event.event_file_data import EventFileData
@@ -42,6 +43,7 @@ if TYPE_CHECKING:
 __all__ = [
     "bind_hook",
     "call_hook",
+    "check_hooks",
     "get_hooks",
     "get_project_config",
     "load_project",
@@ -133,6 +135,43 @@ def call_hook(name: str) -> None:
         hook.run()
 
 
+def check_hooks() -> None:
+    """Check the workflows of all hooks without running them.
+
+    Raises:
+        RUValueError: If any hook is invalid.
+
+    """
+    hooks = cast("ProjectConfigration", get_project_config()).hooks
+    failed: list[str] = []
+    for name in hooks:
+        output_step(
+            fast_format_str(
+                _("Checking hook [cyan]${{name}}[/cyan] ..."),
+                fmt={"name": name},
+            ),
+        )
+        try:
+            cast("ProjectHook", hooks[name]).check()
+        except Exception as exc:  # pylint: disable=broad-except # noqa: BLE001
+            failed.append(name)
+            show_exception(exc)
+
+    if failed:
+        raise RUValueError(
+            fast_format_str(
+                _("Invalid hooks: ${{hooks}}"),
+                fmt={"hooks": ", ".join(failed)},
+            ),
+        )
+    output_step(
+        fast_format_str(
+            _("All ${{count}} hooks are valid."),
+            fmt={"count": str(len(hooks))},
+        ),
+    )
+
+
 def load_project() -> None:
     """Load the project in cwd."""
     global _project_config  # pylint: disable=global-statement # noqa: PLW0603
@@ -35,6 +35,7 @@ from rubisco.lib.variable import AFTypeError
 from rubisco.lib.variable.fast_format_str import fast_format_str
 
 __all__ = [
+    "get_level",
     "get_prompt",
     "output_error",
     "output_hint",
@@ -43,6 +44,7 @@ __all__ = [
     "output_warning",
     "pop_level",
     "push_level",
+    "set_level",
     "show_exception",
     "sum_level_indent",
 ]
@@ -100,6 +102,27 @@ def pop_level() -> None:
     step_level -= 1
 
 
+def get_level() -> int:
+    """Get the output step level.
+
+    Returns:
+        int: The level.
+
+    """
+    return step_level
+
+
+def set_level(level: int) -> None:
+    """Set the output step level.
+
+    Args:
+        level (int): The level.
+
+    """
+    global step_level  # pylint: disable=global-statement # noqa: PLW0603
+    step_level = level
+
+
 def sum_level_indent(level: int) -> str:
     """Sum the indent of the level.
 
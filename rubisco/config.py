@@ -46,6 +46,8 @@ WORKSPACE_LIB_DIR = Path(f".{APP_NAME}")
 WORKSPACE_CONFIG_DIR = WORKSPACE_LIB_DIR
 WORKSPACE_CONFIG_FILE = WORKSPACE_LIB_DIR / "config.json"
 WORKSPACE_EXTENSIONS_VENV_DIR = WORKSPACE_LIB_DIR / "extensions"
+WORKSPACE_FINGERPRINTS_DIR = WORKSPACE_LIB_DIR / "fingerprints"
+WORKSPACE_CACHE_DIR = WORKSPACE_LIB_DIR / "cache"
 EXTENSIONS_DIR = Path("lib") / APP_NAME
 USER_REPO_CONFIG = Path("repo.json")
 if os.name == "nt":
@@ -21,13 +21,19 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
 import json5 as json
 
 from rubisco.config import APP_VERSION, USER_REPO_CONFIG
-from rubisco.kernel.workflow import run_inline_workflow, run_workflow
+from rubisco.kernel.workflow import (
+    compile_inline_workflow,
+    compile_workflow_file,
+    run_inline_workflow,
+    run_workflow,
+)
 from rubisco.lib.exceptions import (
     RUNotRubiscoProjectError,
     RUTypeError,
@@ -49,6 +55,9 @@ from rubisco.lib.variable.typecheck import is_instance
 from rubisco.lib.version import Version
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
 __all__ = [
     "ProjectConfigration",
     "ProjectHook",
@@ -67,36 +76,53 @@ class ProjectHook:  # pylint: disable=too-few-public-methods
         self._raw_data = data
         self.name = name
 
-    def run(self) -> None:
-        """Run this hook."""
+    @contextmanager
+    def _push_variables(self) -> Generator[None]:
         variables: AutoFormatDict = self._raw_data.get(
             "vars",
             {},
             valtype=dict,
         )
         try:
-            for name, val in variables.items():  # Push all variables first.
+            for name, val in variables.items():
                 push_variables(name, val)
+            yield
+        finally:
+            for name in variables:
+                pop_variables(name)
 
-            cmd = self._raw_data.get("exec", None, valtype=str | list | None)
-            workflow = self._raw_data.get("run", None, valtype=str | None)
-            inline_wf = self._raw_data.get(
-                "workflow",
-                None,
-                valtype=dict | AutoFormatDict | list | None,
+    def _get_actions(
+        self,
+    ) -> tuple[
+        str | list[str] | None,
+        str | None,
+        AutoFormatDict | list[AutoFormatDict] | None,
+    ]:
+        cmd = self._raw_data.get("exec", None, valtype=str | list | None)
+        workflow = self._raw_data.get("run", None, valtype=str | None)
+        inline_wf = self._raw_data.get(
+            "workflow",
+            None,
+            valtype=dict | AutoFormatDict | list | None,
+        )
+
+        if not cmd and not workflow and not inline_wf:
+            raise RUValueError(
+                fast_format_str(
+                    _("Hook '${{name}}' is invalid."),
+                    fmt={"name": self.name},
+                ),
+                hint=_(
+                    "A workflow [yellow]SHOULD[/yellow] contain at "
+                    "least 'exec', 'run' and 'workflow'.",
+                ),
             )
+        return cmd, workflow, inline_wf
 
-            if not cmd and not workflow and not inline_wf:
-                raise RUValueError(
-                    fast_format_str(
-                        _("Hook '${{name}}' is invalid."),
-                        fmt={"name": self.name},
-                    ),
-                    hint=_(
-                        "A workflow [yellow]SHOULD[/yellow] contain at "
-                        "least 'exec', 'run' and 'workflow'.",
-                    ),
-                )
+    def run(self) -> None:
+        """Run this hook."""
+        with self._push_variables():  # Push all variables first.
+            cmd, workflow, inline_wf = self._get_actions()
 
             # Then, run inline workflow.
             if inline_wf:
@@ -109,9 +135,22 @@ class ProjectHook:  # pylint: disable=too-few-public-methods
             # Finally, execute shell command.
             if cmd:
                 Process(cmd).run()
-        finally:
-            for name in variables:
-                pop_variables(name)
+
+    def check(self) -> None:
+        """Compile the workflows of this hook without running them.
+
+        The shell command is not checked.
+
+        Raises:
+            RUValueError: If the hook or its workflows are invalid.
+
+        """
+        with self._push_variables():
+            _cmd, workflow, inline_wf = self._get_actions()
+            if inline_wf:
+                compile_inline_workflow(inline_wf, self.name)
+            if workflow:
+                compile_workflow_file(Path(workflow))
 
 
 class ProjectConfigration:  # pylint: disable=too-many-instance-attributes
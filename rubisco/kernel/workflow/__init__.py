@@ -25,13 +25,14 @@ Workflow is a ordered list of steps. Each step only contains one action.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import json5 as json
-import yaml
-
-from rubisco.config import DEFAULT_CHARSET
 from rubisco.kernel.workflow._interfaces import WorkflowInterfaces
-from rubisco.kernel.workflow.steps import step_contributes, step_types
+from rubisco.kernel.workflow.cache import load_workflow_data
+from rubisco.kernel.workflow.steps import (
+    step_contributes,
+    step_types,
+)
 from rubisco.kernel.workflow.workflow import Workflow
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
@@ -40,7 +41,17 @@ from rubisco.lib.variable import AutoFormatDict, make_pretty
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
-__all__ = ["register_step_type", "run_inline_workflow", "run_workflow"]
+if TYPE_CHECKING:
+    from rubisco.kernel.workflow.plan import WorkflowPlan
+
+__all__ = [
+    "compile_inline_workflow",
+    "compile_workflow_file",
+    "load_workflow_file",
+    "register_step_type",
+    "run_inline_workflow",
+    "run_workflow",
+]
 
 
 def register_step_type(name: str, cls: type, contributes: list[str]) -> None:
@@ -95,9 +106,10 @@ def run_inline_workflow(
     if isinstance(data, list):
         data = AutoFormatDict({"name": "", "steps": data})
 
-    wf = Workflow(data, default_id)
     try:
-        wf.run()
+        # The workflow is compiled when it's created, so a compiling error
+        # also respects `fail_fast`.
+        Workflow(data, default_id).run()
     except Exception as exc:  # pylint: disable=broad-except # noqa: BLE001
         if fail_fast:
             raise exc from None
@@ -114,9 +126,56 @@ def run_inline_workflow(
     return None
 
 
+def compile_inline_workflow(
+    data: AutoFormatDict | list[AutoFormatDict],
+    default_id: str,
+) -> WorkflowPlan:
+    """Compile a inline workflow without running it.
+
+    Args:
+        data (AutoFormatDict | list[AutoFormatDict]): Workflow data.
+        default_id (str): Default id of the workflow.
+
+    Returns:
+        WorkflowPlan: The compiled plan.
+
+    """
+    if isinstance(data, list):
+        data = AutoFormatDict({"name": "", "steps": data})
+
+    return Workflow(data, default_id).plan
+
+
 WorkflowInterfaces.set_run_inline_workflow(run_inline_workflow)
 
 
+def load_workflow_file(file: Path) -> AutoFormatDict:
+    """Load a workflow file without running it.
+
+    Args:
+        file (Path): Workflow file path. It can be a JSON, or a yaml.
+
+    Returns:
+        AutoFormatDict: The workflow data.
+
+    Raises:
+        RUValueError: If the suffix of the file is not supported.
+
+    """
+    if file.suffix.lower() not in {".json", ".json5", ".yaml", ".yml"}:
+        raise RUValueError(
+            fast_format_str(
+                _(
+                    "The suffix of ${{path}} is invalid.",
+                ),
+                fmt={"path": make_pretty(file.absolute())},
+            ),
+            hint=_("We only support '.json', '.json5', '.yaml', '.yml'."),
+        )
+    workflow = load_workflow_data(file)
+    return AutoFormatDict(workflow)
+
+
 def run_workflow(
     file: Path,
     *,
@@ -136,31 +195,28 @@ def run_workflow(
             exception. Return None if succeed.
 
     """
-    with file.open(encoding=DEFAULT_CHARSET) as f:
-        if file.suffix.lower() in [".json", ".json5"]:
-            workflow = json.load(f)
-        elif file.suffix.lower() in [".yaml", ".yml"]:
-            workflow = yaml.safe_load(f)
-        else:
-            raise RUValueError(
-                fast_format_str(
-                    _(
-                        "The suffix of ${{path}} is invalid.",
-                    ),
-                    fmt={"path": make_pretty(file.absolute())},
-                ),
-                hint=_("We only support '.json', '.json5', '.yaml', '.yml'."),
-            )
-
-        return run_inline_workflow(
-            AutoFormatDict(workflow),
-            fail_fast=fail_fast,
-            default_id=file.stem,
-        )
+    return run_inline_workflow(
+        load_workflow_file(file),
+        fail_fast=fail_fast,
+        default_id=file.stem,
+    )
 
 
 WorkflowInterfaces.set_run_workflow(run_workflow)
 
 
+def compile_workflow_file(file: Path) -> WorkflowPlan:
+    """Compile a workflow file without running it.
+
+    Args:
+        file (Path): Workflow file path. It can be a JSON, or a yaml.
+
+    Returns:
+        WorkflowPlan: The compiled plan.
+
+    """
+    return compile_inline_workflow(load_workflow_file(file), file.stem)
+
+
 if __name__ == "__main__":
     run_workflow(Path("workflow.yaml"))
@@ -0,0 +1,244 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Background processes of workflow steps.
+
+A `shell` or `popen` step with `background: true` starts its process in a
+background thread and finishes at once. Its handle (the global id of the
+step) is pushed to `<step-id>.handle`. A `wait` step joins the handles, and
+pushes the variables the step would push if it's not in background, e.g.
+`<step-id>.retcode`.
+
+The output of a background process is buffered, and shown when it's waited.
+Background processes which are not waited are terminated when their workflow
+finishes.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from rubisco.lib.exceptions import RUShellExecutionError, RUValueError
+from rubisco.lib.l10n import _
+from rubisco.lib.log import logger
+from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.variable import push_variables
+from rubisco.shared.ktrigger import (
+    IKernelTrigger,
+    KTriggerBuffer,
+    buffer_ktriggers,
+    call_ktrigger,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from rubisco.kernel.workflow.step import Step
+    from rubisco.kernel.workflow.workflow import Workflow
+    from rubisco.lib.process import Process
+
+__all__ = [
+    "BackgroundJob",
+    "find_background_job",
+    "start_background_job",
+    "terminate_background_jobs",
+]
+
+
+@dataclass(eq=False)
+class BackgroundJob:
+    """A process running in background."""
+
+    handle: str
+    process: Process
+    # The workflow which starts the job.
+    workflow: Workflow
+    fail_on_error: bool
+    # The variables to push when it's waited. Without the handle prefix.
+    future: Future[dict[str, Any]] = field(default_factory=Future)
+    buffer: KTriggerBuffer | None = None
+    terminated: bool = False
+
+    def terminate(self) -> None:
+        """Terminate the process and wait for it."""
+        self.terminated = True
+        # The process may be not started yet.
+        while not self.future.done():
+            self.process.terminate()
+            try:
+                self.future.exception(timeout=0.1)
+            except TimeoutError:
+                continue
+
+    def wait(self, *, terminate: bool = False) -> dict[str, Any]:
+        """Wait for the job, then show its output and forget it.
+
+        Args:
+            terminate (bool, optional): Terminate the process first.
+                Defaults to False.
+
+        Returns:
+            dict[str, Any]: The variables to push. Without the handle
+                prefix.
+
+        Raises:
+            RUShellExecutionError: If the process failed, and it's not
+                terminated by us.
+
+        """
+        try:
+            if terminate:
+                self.terminate()
+            variables = self.future.result()
+        finally:
+            with _jobs_lock:
+                _jobs.pop(self.handle, None)
+            if self.buffer is not None:
+                self.buffer.flush()
+
+        retcode = variables["retcode"]
+        if retcode != 0 and self.fail_on_error and not self.terminated:
+            raise RUShellExecutionError(
+                _("Shell execution error."),  # type: ignore[arg-type]
+                retcode=retcode,
+            )
+        return variables
+
+
+_jobs: dict[str, BackgroundJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _run_job(job: BackgroundJob, func: Callable[[], dict[str, Any]]) -> None:
+    with buffer_ktriggers() as job.buffer:
+        try:
+            job.future.set_result(func())
+        except BaseException as exc:  # noqa: BLE001 # pylint: disable=W0718
+            job.future.set_exception(exc)
+
+
+def start_background_job(
+    step: Step,
+    process: Process,
+    func: Callable[[], dict[str, Any]],
+    *,
+    fail_on_error: bool,
+) -> BackgroundJob:
+    """Run the process of a step in background.
+
+    Args:
+        step (Step): The step. Its global id is the handle of the job.
+        process (Process): The process. It's used to terminate the job.
+        func (Callable[[], dict[str, Any]]): Run the process without
+            raising on error, and return the variables to push. It's called
+            in another thread.
+        fail_on_error (bool): Raise an exception when it's waited if the
+            process failed.
+
+    Returns:
+        BackgroundJob: The job.
+
+    Raises:
+        RUValueError: If the step is already running in background.
+
+    """
+    job = BackgroundJob(
+        step.global_id,
+        process,
+        step.parent_workflow,
+        fail_on_error,
+    )
+    with _jobs_lock:
+        if job.handle in _jobs:
+            raise RUValueError(
+                fast_format_str(
+                    _("Background step '${{handle}}' is already running."),
+                    fmt={"handle": job.handle},
+                ),
+            )
+        _jobs[job.handle] = job
+    threading.Thread(
+        target=_run_job,
+        args=(job, func),
+        name=f"rubisco-bg-{job.handle}",
+        daemon=True,
+    ).start()
+    push_variables(f"{job.handle}.handle", job.handle)
+    return job
+
+
+def find_background_job(handle: str, workflow: Workflow) -> BackgroundJob:
+    """Find a running background job.
+
+    Args:
+        handle (str): The handle of the job, or the id of the step in the
+            workflow.
+        workflow (Workflow): The workflow which waits the job.
+
+    Returns:
+        BackgroundJob: The job.
+
+    Raises:
+        RUValueError: If the job is not found.
+
+    """
+    with _jobs_lock:
+        job = _jobs.get(f"{workflow.id}.{handle}") or _jobs.get(handle)
+    if job is None:
+        raise RUValueError(
+            fast_format_str(
+                _("Background step '${{handle}}' is not found."),
+                fmt={"handle": handle},
+            ),
+            hint=_("It may be waited already, or not run in background."),
+        )
+    return job
+
+
+def terminate_background_jobs(workflow: Workflow) -> None:
+    """Terminate the background jobs which a workflow does not wait.
+
+    Args:
+        workflow (Workflow): The workflow.
+
+    """
+    with _jobs_lock:
+        jobs = [job for job in _jobs.values() if job.workflow is workflow]
+    for job in jobs:
+        call_ktrigger(
+            IKernelTrigger.on_warning,
+            message=fast_format_str(
+                _(
+                    "Background step '${{handle}}' is not waited. "
+                    "Terminating it.",
+                ),
+                fmt={"handle": job.handle},
+            ),
+        )
+        try:
+            job.wait(terminate=True)
+        except Exception:  # pylint: disable=broad-except # noqa: BLE001
+            logger.warning(
+                "Background step %s failed.",
+                job.handle,
+                exc_info=True,
+            )
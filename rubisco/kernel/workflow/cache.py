@@ -0,0 +1,147 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Parsed workflow file cache.
+
+json5 and PyYAML's pure Python loader are much slower than running a big
+workflow file's steps. So the parsed data is pickled to
+`WORKSPACE_CACHE_DIR/workflows`, and reused while the file's path, mtime,
+size and content hash are all unchanged.
+
+YAML files are parsed by libyaml (`yaml.CSafeLoader`) if it's available.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from typing import TYPE_CHECKING, Any
+
+import json5
+import yaml
+
+from rubisco.config import APP_VERSION, DEFAULT_CHARSET, WORKSPACE_CACHE_DIR
+from rubisco.lib.log import logger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = [
+    "WORKFLOW_CACHE_DIR",
+    "YamlLoader",
+    "load_workflow_data",
+    "parse_workflow_data",
+]
+
+WORKFLOW_CACHE_DIR = WORKSPACE_CACHE_DIR / "workflows"
+
+# Bump it if the format of the cache file is changed.
+_CACHE_FORMAT = 1
+
+YamlLoader: type[yaml.SafeLoader] = getattr(
+    yaml,
+    "CSafeLoader",
+    yaml.SafeLoader,
+)
+
+
+def parse_workflow_data(text: str, suffix: str) -> Any:  # noqa: ANN401
+    """Parse the content of a workflow file.
+
+    Args:
+        text (str): The content.
+        suffix (str): The lower case suffix of the file. ".json", ".json5",
+            ".yaml" or ".yml".
+
+    Returns:
+        Any: The parsed data.
+
+    """
+    if suffix in {".yaml", ".yml"}:
+        return yaml.load(text, Loader=YamlLoader)  # noqa: S506
+    return json5.loads(text)
+
+
+def _cache_file(path: Path) -> Path:
+    name = hashlib.sha256(str(path).encode(DEFAULT_CHARSET)).hexdigest()
+    return WORKFLOW_CACHE_DIR / f"{name}.pickle"
+
+
+def _read_cache(cache: Path, key: tuple[Any, ...]) -> tuple[bool, Any]:
+    try:
+        with cache.open("rb") as file:
+            entry = pickle.load(file)  # noqa: S301
+    except FileNotFoundError:
+        return False, None
+    except Exception:  # pylint: disable=broad-except # noqa: BLE001
+        logger.warning("Ignored the broken cache %s.", cache, exc_info=True)
+        return False, None
+    if not isinstance(entry, tuple) or len(entry) != 2 or entry[0] != key:  # noqa: PLR2004
+        return False, None
+    return True, entry[1]
+
+
+def _write_cache(cache: Path, key: tuple[Any, ...], data: Any) -> None:  # noqa: ANN401
+    temp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        with temp.open("wb") as file:
+            pickle.dump((key, data), file, pickle.HIGHEST_PROTOCOL)
+        # Atomic, other processes never read a partial cache.
+        temp.replace(cache)
+    except (OSError, pickle.PicklingError):
+        logger.warning("Failed to write the cache %s.", cache, exc_info=True)
+        temp.unlink(missing_ok=True)
+
+
+def load_workflow_data(file: Path) -> Any:  # noqa: ANN401
+    """Load a workflow file, from the cache if it's unchanged.
+
+    Args:
+        file (Path): The workflow file. Its suffix must be ".json", ".json5",
+            ".yaml" or ".yml".
+
+    Returns:
+        Any: The parsed data. It's not shared with other callers.
+
+    """
+    path = file.absolute()
+    content = path.read_bytes()
+    stat = path.stat()
+    key = (
+        _CACHE_FORMAT,
+        str(APP_VERSION),
+        str(path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.sha256(content).hexdigest(),
+    )
+    cache = _cache_file(path)
+    hit, data = _read_cache(cache, key)
+    if hit:
+        logger.debug("Loaded workflow %s from cache %s.", path, cache)
+        return data
+
+    data = parse_workflow_data(
+        content.decode(DEFAULT_CHARSET),
+        path.suffix.lower(),
+    )
+    _write_cache(cache, key, data)
+    return data
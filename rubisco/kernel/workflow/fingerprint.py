@@ -0,0 +1,190 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Fingerprints of workflow steps.
+
+A step which declares `inputs` or `outputs` globs is skipped if nothing it
+depends on has changed since its last successful run, like make skips the
+up-to-date targets. The fingerprint is a hash of:
+
+- The step type and its formatted data.
+- The values of the variables referenced by the step data.
+- The paths and contents of the input files.
+
+It's saved in `WORKSPACE_FINGERPRINTS_DIR` after the step succeeded, with
+the variables the step pushed (e.g. `<id>.stdout`). The step is up to date if
+the saved fingerprint is the same and every output glob matches an existing
+path. Then the saved variables are pushed again instead of running it.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rubisco.config import (
+    COPY_BUFSIZE,
+    DEFAULT_CHARSET,
+    WORKSPACE_FINGERPRINTS_DIR,
+)
+from rubisco.lib.log import logger
+from rubisco.lib.variable.references import get_variable_references
+from rubisco.lib.variable.variable import get_variable
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from rubisco.kernel.workflow.step import Step
+
+__all__ = [
+    "get_step_fingerprint",
+    "get_up_to_date_variables",
+    "save_step_fingerprint",
+]
+
+
+# The default of `get_variable` for the undefined variables. `None` means
+# raising KeyError there.
+_UNDEFINED = object()
+
+
+def _glob_files(patterns: Iterable[str]) -> list[Path]:
+    files: set[Path] = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, recursive=True):  # noqa: PTH207
+            path = Path(match)
+            if path.is_dir():
+                files.update(sub for sub in path.rglob("*") if sub.is_file())
+            else:
+                files.add(path)
+    return sorted(files)
+
+
+def _hash_file(path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(COPY_BUFSIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def get_step_fingerprint(step: Step) -> str:
+    """Compute the fingerprint of a step.
+
+    Args:
+        step (Step): The step. Its data is formatted with the current
+            variables.
+
+    Returns:
+        str: The fingerprint in hex.
+
+    """
+    digest = hashlib.sha256()
+    digest.update(type(step).__qualname__.encode(DEFAULT_CHARSET))
+    digest.update(b"\0")
+    digest.update(repr(step.raw_data).encode(DEFAULT_CHARSET))
+    digest.update(b"\0")
+    for name in sorted(get_variable_references(step.raw_data).names):
+        value = get_variable(name, default=_UNDEFINED)
+        if value is _UNDEFINED:
+            digest.update(f"{name}\0undefined\0".encode(DEFAULT_CHARSET))
+        else:
+            digest.update(f"{name}={value!r}\0".encode(DEFAULT_CHARSET))
+    for path in _glob_files(step.inputs):
+        digest.update(str(path).encode(DEFAULT_CHARSET))
+        digest.update(b"\0")
+        digest.update(_hash_file(path))
+    return digest.hexdigest()
+
+
+def _fingerprint_file(step: Step) -> Path:
+    name = hashlib.sha256(step.global_id.encode(DEFAULT_CHARSET)).hexdigest()
+    return WORKSPACE_FINGERPRINTS_DIR / name
+
+
+def get_up_to_date_variables(
+    step: Step,
+    fingerprint: str,
+) -> dict[str, Any] | None:
+    """Check if a step can be skipped.
+
+    Args:
+        step (Step): The step.
+        fingerprint (str): The current fingerprint of the step.
+
+    Returns:
+        dict[str, Any] | None: The variables pushed by the step's last run if
+            the saved fingerprint is the same and all the outputs exist.
+            Otherwise None.
+
+    """
+    path = _fingerprint_file(step)
+    try:
+        with path.open("rb") as file:
+            entry = pickle.load(file)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except # noqa: BLE001
+        logger.warning(
+            "Ignored the broken fingerprint %s.",
+            path,
+            exc_info=True,
+        )
+        return None
+    if not isinstance(entry, tuple) or len(entry) != 2:  # noqa: PLR2004
+        return None
+    if entry[0] != fingerprint:
+        return None
+    if not all(glob.glob(pattern, recursive=True) for pattern in step.outputs):  # noqa: PTH207
+        return None
+    return entry[1]
+
+
+def save_step_fingerprint(
+    step: Step,
+    fingerprint: str,
+    variables: dict[str, Any],
+) -> None:
+    """Save the fingerprint of a succeeded step.
+
+    Args:
+        step (Step): The step.
+        fingerprint (str): The fingerprint computed before it ran.
+        variables (dict[str, Any]): The variables pushed by the step.
+
+    """
+    path = _fingerprint_file(step)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with temp.open("wb") as file:
+            pickle.dump((fingerprint, variables), file, pickle.HIGHEST_PROTOCOL)
+        temp.replace(path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        # It only makes the step run again next time.
+        logger.warning(
+            "Failed to save the fingerprint to %s.",
+            path,
+            exc_info=True,
+        )
+        temp.unlink(missing_ok=True)
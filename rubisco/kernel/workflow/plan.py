@@ -0,0 +1,247 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compile workflows to plans before running them.
+
+A workflow is compiled before any of its steps runs: the step ids are
+resolved and checked, the step classes are resolved, the `needs` graph is
+checked, and the common fields and the fields declared by the step types
+(`Step.fields` and `Step.required_fields`) are validated. So a typo in the
+last step is found before the first step runs.
+
+Only the raw values are checked. A templated value, the fields not declared
+by the step type and the checks in `Step.init()` (e.g. the items of a list)
+are only checked when the step runs.
+
+Like a templated `type`, a templated step id is resolved when the step runs,
+because it may reference the variables of the steps before it. The steps
+with `needs` are the exception: their ids are needed to build the graph.
+
+A plan only holds the unformatted step data and the step classes, so it can
+be pickled. The values are still formatted when a step runs, because they
+may reference the variables of the steps before it.
+
+The plan drives the execution: for each `StepPlan`, the step class is
+created with its data, which reads the step fields by `Step.init()`, then
+`Step.execute()` runs it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from os import PathLike
+from typing import TYPE_CHECKING, Any
+
+from rubisco.kernel.workflow.scheduler import StepNode, sort_step_graph
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.l10n import _
+from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.template_cache import has_template_syntax
+from rubisco.lib.variable.typecheck import is_instance
+from rubisco.lib.variable.utils import assert_iter_types
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from types import UnionType
+
+    from rubisco.kernel.workflow.step import Step
+    from rubisco.kernel.workflow.workflow import Workflow
+    from rubisco.lib.variable.autoformatdict import AutoFormatDict
+
+__all__ = ["StepPlan", "WorkflowPlan", "add_step_id", "compile_workflow"]
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """A compiled step."""
+
+    # The unformatted id if `templated_id` is True.
+    id: str
+    # The unformatted step data with its id.
+    data: AutoFormatDict
+    # None if the type is a template. It's resolved when the step runs.
+    cls: type[Step] | None
+    needs: tuple[str, ...] = ()
+    # True if the id is a template. It's resolved when the step runs.
+    templated_id: bool = False
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """A compiled workflow."""
+
+    id: str
+    name: str
+    steps: tuple[StepPlan, ...]
+    # True if any step has `needs`. The steps run by their dependencies.
+    graph: bool = False
+
+
+# The fields shared by all steps and their types.
+_STEP_FIELDS: dict[str, type | UnionType] = {
+    "name": str,
+    "type": str,
+    "strict": bool,
+    "needs": str | list,
+    "inputs": str | list,
+    "outputs": str | list,
+}
+
+
+def _is_template(value: Any) -> bool:  # noqa: ANN401
+    return isinstance(value, str) and has_template_syntax(value)
+
+
+def _check_fields(
+    step_id: str,
+    data: AutoFormatDict,
+    fields: Mapping[str, type | UnionType],
+) -> None:
+    for key, valtype in fields.items():
+        value = dict.get(data, key)
+        if value is None and not dict.__contains__(data, key):
+            continue
+        # The templates are not formatted, they are checked when the step
+        # reads them. PathLike is treated as str like `AutoFormatDict.get`.
+        if _is_template(value) or (
+            isinstance(value, PathLike) and is_instance("", valtype)
+        ):
+            continue
+        if not is_instance(value, valtype):
+            raise RUValueError(
+                fast_format_str(
+                    _(
+                        "The value of '${{key}}' of step '${{step_id}}' "
+                        "needs to be ${{type}} instead of ${{value_type}}.",
+                    ),
+                    fmt={
+                        "key": key,
+                        "step_id": step_id,
+                        "type": getattr(valtype, "__name__", str(valtype)),
+                        "value_type": repr(type(value).__name__),
+                    },
+                ),
+            )
+
+
+def _check_step_fields(
+    step_id: str,
+    data: AutoFormatDict,
+    cls: type[Step],
+) -> None:
+    # A templated key may be any field, so the required fields can't be
+    # checked.
+    if not any(map(_is_template, dict.keys(data))):
+        for key in cls.required_fields:
+            if not dict.__contains__(data, key):
+                raise RUValueError(
+                    fast_format_str(
+                        _("Step '${{step_id}}' needs '${{key}}'."),
+                        fmt={"key": key, "step_id": step_id},
+                    ),
+                )
+    _check_fields(step_id, data, cls.fields)
+
+
+def add_step_id(step_id: str, step_ids: set[str]) -> None:
+    """Add a step id to the ids of the steps before it.
+
+    Args:
+        step_id (str): The formatted step id.
+        step_ids (set[str]): The ids of the steps before it.
+
+    Raises:
+        RUValueError: If the step id is duplicated.
+
+    """
+    if step_id in step_ids:
+        raise RUValueError(
+            fast_format_str(
+                _("Step id '${{step_id}}' is duplicated."),
+                fmt={"step_id": step_id},
+            ),
+        )
+    step_ids.add(step_id)
+
+
+def _get_needs(data: AutoFormatDict) -> tuple[str, ...]:
+    needs = data.get("needs", [], valtype=list | str)
+    if isinstance(needs, str):
+        return (needs,)
+    assert_iter_types(
+        needs,
+        str,
+        RUValueError(_("'needs' must be a list of step ids.")),
+    )
+    return tuple(needs)
+
+
+def compile_workflow(workflow: Workflow) -> WorkflowPlan:
+    """Compile the steps of a workflow without running them.
+
+    Args:
+        workflow (Workflow): The workflow. Its variables are pushed.
+
+    Returns:
+        WorkflowPlan: The compiled plan.
+
+    Raises:
+        RUValueError: If a step is invalid, or the `needs` of the steps
+            are invalid.
+
+    """
+    templates: list[AutoFormatDict] = workflow.raw_data.get(
+        "steps",
+        valtype=list[dict[str, object]],
+    )
+    graph = any("needs" in template for template in templates)
+    step_ids: set[str] = set()
+    steps: list[StepPlan] = []
+    for step_idx, template in enumerate(templates):
+        # The step data may be shared by several runs (e.g. matrix jobs)
+        # and must not be modified. Per-run keys like "id" are written to
+        # a shallow copy, which shares the nested values with it.
+        data = template.raw_copy()
+        step_id = dict.get(data, "id", f"{workflow.id}.steps.{step_idx}")
+        templated_id = not graph and _is_template(step_id)
+        if not templated_id:
+            step_id = data.get("id", step_id, valtype=str)
+            add_step_id(step_id, step_ids)
+        data["id"] = step_id
+        _check_fields(step_id, data, _STEP_FIELDS)
+
+        cls = None
+        if not _is_template(dict.get(data, "type")):
+            cls = workflow.get_step_class(data)
+            _check_step_fields(step_id, data, cls)
+        steps.append(
+            StepPlan(
+                step_id,
+                data,
+                cls,
+                _get_needs(data) if graph else (),
+                templated_id=templated_id,
+            ),
+        )
+
+    if graph:  # Check the unknown steps and cycles.
+        sort_step_graph(
+            [StepNode(step.id, step.data, list(step.needs)) for step in steps],
+        )
+    return WorkflowPlan(workflow.id, workflow.name, tuple(steps), graph)
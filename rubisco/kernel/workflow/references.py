@@ -0,0 +1,89 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Static variable dependency analysis of workflows.
+
+Nothing is executed, so it can be used before running a workflow.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from rubisco.lib.variable.references import (
+    VariableReferences,
+    get_variable_references,
+)
+
+__all__ = ["WorkflowReferences", "get_workflow_references"]
+
+
+@dataclass
+class WorkflowReferences:
+    """Variable dependencies of a workflow."""
+
+    id: str
+    # Variables defined by the "vars" of the workflow.
+    defines: list[str] = field(default_factory=list)
+    # References of the workflow's own attributes, except steps.
+    workflow: VariableReferences = field(default_factory=VariableReferences)
+    # Step id -> references of the step, including its nested steps.
+    steps: dict[str, VariableReferences] = field(default_factory=dict)
+
+
+def _raw_str(data: dict[str, Any], key: str, default: str) -> str:
+    # Templates are not formatted, so a templated value is kept as is.
+    value = dict.get(data, key)
+    return value if isinstance(value, str) else default
+
+
+def get_workflow_references(
+    data: dict[str, Any],
+    default_id: str,
+) -> WorkflowReferences:
+    """Get the variables referenced by a workflow and each of its steps.
+
+    Args:
+        data (dict[str, Any]): The workflow data. AutoFormatDict is
+            accepted, its templates will not be formatted.
+        default_id (str): The default id of the workflow.
+
+    Returns:
+        WorkflowReferences: The references.
+
+    """
+    wf_id = _raw_str(data, "id", default_id)
+    res = WorkflowReferences(wf_id)
+
+    pairs = dict.get(data, "vars")
+    if isinstance(pairs, list):
+        for pair in list.__iter__(pairs):
+            if isinstance(pair, dict):
+                res.defines.extend(str(key) for key in dict.keys(pair))
+
+    res.workflow = get_variable_references(
+        {key: val for key, val in dict.items(data) if key != "steps"},
+    )
+
+    steps = dict.get(data, "steps")
+    if isinstance(steps, list):
+        for idx, step in enumerate(list.__iter__(steps)):
+            if not isinstance(step, dict):
+                continue
+            step_id = _raw_str(step, "id", f"{wf_id}.steps.{idx}")
+            res.steps[step_id] = get_variable_references(step)
+    return res
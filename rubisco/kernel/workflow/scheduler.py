@@ -0,0 +1,277 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Run the steps of a workflow by their dependencies.
+
+A step can declare the ids of the steps it depends on with the `needs` key.
+If any step of a workflow does, the steps of it form a directed acyclic
+graph, and the steps whose dependencies are finished run concurrently, up to
+`get_max_jobs()` at the same time. Without `needs`, the steps run one by one
+in order, as before.
+
+Each concurrent step runs in a forked variable scope, and its variables
+(e.g. `<step-id>.stdout`) are applied to the workflow's scope when it
+finishes. So a step can use the variables of the steps it needs.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from rubisco.kernel.workflow.step import Step, cancel_on, create_step
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.l10n import _
+from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.variable import (
+    VariableScope,
+    enter_scope,
+    fork_scope,
+    join_scope,
+)
+from rubisco.shared.ktrigger import buffer_ktriggers, get_ktrigger_buffer
+
+if TYPE_CHECKING:
+    from rubisco.kernel.workflow.workflow import Workflow
+    from rubisco.lib.variable.autoformatdict import AutoFormatDict
+    from rubisco.shared.ktrigger import KTriggerBuffer
+
+__all__ = [
+    "DEFAULT_MAX_JOBS",
+    "StepNode",
+    "get_max_jobs",
+    "run_step_graph",
+    "set_max_jobs",
+    "sort_step_graph",
+]
+
+DEFAULT_MAX_JOBS = os.cpu_count() or 1
+
+_max_jobs = DEFAULT_MAX_JOBS
+
+
+def set_max_jobs(jobs: int) -> None:
+    """Set the max count of steps running at the same time.
+
+    Args:
+        jobs (int): The max count. 1 runs the steps one by one.
+
+    Raises:
+        RUValueError: If `jobs` is not positive.
+
+    """
+    global _max_jobs  # pylint: disable=W0603  # noqa: PLW0603
+
+    if jobs < 1:
+        raise RUValueError(_("The count of jobs must be a positive integer."))
+    _max_jobs = jobs
+
+
+def get_max_jobs() -> int:
+    """Get the max count of steps running at the same time.
+
+    Returns:
+        int: The max count.
+
+    """
+    return _max_jobs
+
+
+@dataclass
+class StepNode:
+    """A step to be scheduled."""
+
+    id: str
+    data: AutoFormatDict
+    needs: list[str]
+    # The ids of the steps which need this step.
+    dependents: list[str] = field(default_factory=list)
+    # None if it's resolved when the step runs.
+    cls: type[Step] | None = None
+
+
+def sort_step_graph(nodes: list[StepNode]) -> list[StepNode]:
+    """Check the dependencies and sort the steps topologically.
+
+    Steps without dependencies between them keep their order.
+
+    Args:
+        nodes (list[StepNode]): The steps in the order of the workflow.
+
+    Returns:
+        list[StepNode]: The sorted steps.
+
+    Raises:
+        RUValueError: If a step needs an unknown step or the dependencies
+            have a cycle.
+
+    """
+    index = {node.id: node for node in nodes}
+    waiting: dict[str, int] = {}
+    for node in nodes:
+        node.dependents.clear()
+    for node in nodes:
+        node.needs = list(dict.fromkeys(node.needs))
+        for need in node.needs:
+            if need not in index:
+                raise RUValueError(
+                    fast_format_str(
+                        _(
+                            "Step '${{step_id}}' needs an unknown step "
+                            "'${{need}}'.",
+                        ),
+                        fmt={"step_id": node.id, "need": need},
+                    ),
+                )
+            index[need].dependents.append(node.id)
+        waiting[node.id] = len(node.needs)
+
+    res: list[StepNode] = []
+    ready = deque(node for node in nodes if not waiting[node.id])
+    while ready:
+        node = ready.popleft()
+        res.append(node)
+        for dependent in node.dependents:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                ready.append(index[dependent])
+
+    if len(res) != len(nodes):
+        raise RUValueError(
+            fast_format_str(
+                _("Steps have circular dependencies: ${{steps}}"),
+                fmt={
+                    "steps": ", ".join(
+                        node.id for node in nodes if waiting[node.id]
+                    ),
+                },
+            ),
+        )
+    return res
+
+
+def _run_step(node: StepNode, workflow: Workflow) -> Step:
+    # A templated type is formatted after the needed steps are finished.
+    step_cls = node.cls or workflow.get_step_class(node.data)
+    step = create_step(step_cls, node.data, workflow)
+    step.execute()
+    return step
+
+
+def _run_step_job(
+    node: StepNode,
+    workflow: Workflow,
+    scope: VariableScope,
+    cancel: threading.Event,
+    parent: KTriggerBuffer | None,
+) -> Step:
+    with (
+        enter_scope(scope),
+        cancel_on(cancel),
+        buffer_ktriggers(parent) as buffer,
+    ):
+        try:
+            return _run_step(node, workflow)
+        finally:
+            buffer.flush()
+
+
+def run_step_graph(  # noqa: C901
+    nodes: list[StepNode],
+    workflow: Workflow,
+    jobs: int | None = None,
+) -> list[Step]:
+    """Run the steps by their dependencies.
+
+    A step starts after all the steps it needs are finished. When a strict
+    step fails, no more steps are started, the running ones are finished,
+    then the exception is raised.
+
+    Args:
+        nodes (list[StepNode]): The steps in the order of the workflow.
+        workflow (Workflow): The workflow of the steps.
+        jobs (int | None, optional): The max count of steps running at the
+            same time. Defaults to `get_max_jobs()`.
+
+    Returns:
+        list[Step]: The steps in the order they finished.
+
+    """
+    order = sort_step_graph(nodes)
+    if jobs is None:
+        jobs = get_max_jobs()
+    if jobs == 1:
+        return [_run_step(node, workflow) for node in order]
+
+    index = {node.id: node for node in nodes}
+    waiting = {node.id: set(node.needs) for node in nodes}
+    ready = deque(node for node in order if not node.needs)
+    running: dict[Future[Step], tuple[StepNode, VariableScope]] = {}
+    finished: list[Step] = []
+    error: BaseException | None = None
+    cancel = threading.Event()
+    # The output of the steps goes to the buffer of the caller if any.
+    parent = get_ktrigger_buffer()
+
+    with ThreadPoolExecutor(
+        max_workers=jobs,
+        thread_name_prefix=f"workflow-{workflow.id}",
+    ) as pool:
+        try:
+            while running or (ready and error is None):
+                while ready and error is None and len(running) < jobs:
+                    node = ready.popleft()
+                    # Scopes must be forked in this thread.
+                    scope = fork_scope()
+                    future = pool.submit(
+                        _run_step_job,
+                        node,
+                        workflow,
+                        scope,
+                        cancel,
+                        parent,
+                    )
+                    running[future] = (node, scope)
+
+                done, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, scope = running.pop(future)
+                    try:
+                        finished.append(future.result())
+                    except BaseException as exc:  # noqa: BLE001
+                        if error is None:
+                            error = exc
+                            cancel.set()
+                        continue
+                    join_scope(scope)
+                    for dependent in node.dependents:
+                        waiting[dependent].discard(node.id)
+                        if not waiting[dependent]:
+                            ready.append(index[dependent])
+        except BaseException:
+            cancel.set()
+            raise
+
+    if error is not None:
+        raise error from None
+    return finished
@@ -22,23 +22,149 @@
 from __future__ import annotations
 
 import abc
+import warnings
 from abc import abstractmethod
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import UnionType
+from typing import TYPE_CHECKING, ClassVar
 
+from rubisco.kernel.workflow.fingerprint import (
+    get_step_fingerprint,
+    get_up_to_date_variables,
+    save_step_fingerprint,
+)
+from rubisco.lib.exceptions import RUError, RUValueError
 from rubisco.lib.l10n import _
 from rubisco.lib.log import logger
-from rubisco.lib.variable import AutoFormatDict, make_pretty
+from rubisco.lib.variable import AutoFormatDict, assert_iter_types, make_pretty
 from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.variable import (
+    enter_scope,
+    fork_scope,
+    join_scope,
+    push_variables,
+)
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
 if TYPE_CHECKING:
+    import threading
+    from collections.abc import Generator
+
     from rubisco.kernel.workflow import Workflow
 
-__all__ = ["Step"]
+__all__ = [
+    "Step",
+    "StepCancelledError",
+    "StepFields",
+    "cancel_on",
+    "create_step",
+]
+
+# The field names of a step type and their types.
+StepFields = dict[str, type | UnionType]
+
+
+class StepCancelledError(RUError):
+    """The step is cancelled before it runs."""
+
+
+_cancel_event: ContextVar[threading.Event | None] = ContextVar(
+    "rubisco_step_cancel_event",
+    default=None,
+)
+
+
+@contextmanager
+def cancel_on(event: threading.Event) -> Generator[None]:
+    """Cancel the steps created in this context once the event is set.
+
+    A running step is not interrupted, but the steps after it raise
+    `StepCancelledError` whether they are strict or not.
+
+    Args:
+        event (threading.Event): The cancel event.
+
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+# True while `create_step` creates a step. Its caller runs the step by
+# `execute()`.
+_deferred: ContextVar[bool] = ContextVar(
+    "rubisco_step_deferred",
+    default=False,
+)
+
+
+def create_step(
+    cls: type[Step],
+    data: AutoFormatDict,
+    parent_workflow: Workflow,
+) -> Step:
+    """Create a step without running it. Call `execute()` to run it.
+
+    Args:
+        cls (type[Step]): The step class.
+        data (AutoFormatDict): The step json data.
+        parent_workflow (Workflow): The parent workflow.
+
+    Returns:
+        Step: The step.
+
+    """
+    token = _deferred.set(True)
+    try:
+        return cls(data, parent_workflow)
+    finally:
+        _deferred.reset(token)
+
+
+def _get_globs(data: AutoFormatDict, key: str) -> list[str]:
+    globs = data.get(key, [], valtype=list | str)
+    if isinstance(globs, str):
+        return [globs]
+    assert_iter_types(
+        globs,
+        str,
+        RUValueError(
+            fast_format_str(
+                _("'${{key}}' must be a glob or a list of globs."),
+                fmt={"key": key},
+            ),
+        ),
+    )
+    return list(globs)
 
 
 class Step(abc.ABC):  # pylint: disable=too-many-instance-attributes
-    """A step in the workflow."""
+    """A step in the workflow.
+
+    If `inputs` or `outputs` globs are given, the step is skipped when its
+    fingerprint is unchanged and the outputs exist, and the variables it
+    pushed last time are pushed again. See
+    `rubisco.kernel.workflow.fingerprint`. Steps running in background are
+    never skipped, their processes may still fail after `run()` returned,
+    and a `wait` step needs them to be started.
+
+    A step type declares its fields in `fields` and `required_fields`. They
+    are checked when the workflow is compiled, so an invalid step is found
+    before the steps before it run. Templated values are only checked when
+    the step reads them in `init()`.
+
+    `create_step` creates a step, which reads its data by `init()`, and
+    `execute()` runs it. Creating a step by its constructor directly still
+    runs it as before, but it's deprecated.
+    """
+
+    # The fields of this step type and their types.
+    fields: ClassVar[StepFields] = {}
+    # The fields which must be given.
+    required_fields: ClassVar[tuple[str, ...]] = ()
 
     id: str
     parent_workflow: Workflow
@@ -48,6 +174,10 @@ class Step(abc.ABC):  # pylint: disable=too-many-instance-attributes
     global_id: str
     strict: bool
     suc: bool
+    inputs: list[str]
+    outputs: list[str]
+    # Set by `init()` if the step runs in background.
+    background: bool = False
 
     def __init__(
         self,
@@ -56,13 +186,28 @@ class Step(abc.ABC):  # pylint: disable=too-many-instance-attributes
     ) -> None:
         """Create a new step.
 
+        Use `create_step` to create a step without running it. Otherwise,
+        the step runs here and a `DeprecationWarning` is issued.
+
         Args:
             data (AutoFormatDict[str, str | int | bool]): The step json data.
             parent_workflow (Workflow): The parent workflow.
 
+        Raises:
+            StepCancelledError: If the steps of this context are cancelled.
+
         """
         self.suc = False
 
+        deferred = _deferred.get()
+        if deferred:
+            # Steps created in `init()` are not deferred.
+            _deferred.set(False)
+
+        event = _cancel_event.get()
+        if event is not None and event.is_set():
+            raise StepCancelledError(_("Step is cancelled."))
+
         self.parent_workflow = parent_workflow
         self.raw_data = data
         self.name = data.get("name", "", valtype=str)
@@ -70,16 +215,48 @@ class Step(abc.ABC):  # pylint: disable=too-many-instance-attributes
         self.next = None
         self.id = data.get("id", valtype=str)  # Always exists.
         self.global_id = f"{self.parent_workflow.id}.{self.id}"
+        self.inputs = _get_globs(data, "inputs")
+        self.outputs = _get_globs(data, "outputs")
 
         self.init()
 
+        if not deferred:
+            warnings.warn(
+                "Running a step by creating it is deprecated. Create it by "
+                "create_step() and run it by execute().",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            self.execute()
+
+    def execute(self) -> None:
+        """Run the step, or skip it if it's up to date.
+
+        A failed step which is not strict is reported and counted as
+        succeeded.
+
+        """
         call_ktrigger(
             IKernelTrigger.pre_run_workflow_step,
             step=self,
         )
 
+        fingerprint = None
+        if (self.inputs or self.outputs) and not self.background:
+            fingerprint = get_step_fingerprint(self)
+            variables = get_up_to_date_variables(self, fingerprint)
+            if variables is not None:
+                for name, value in variables.items():
+                    push_variables(name, value)
+                call_ktrigger(IKernelTrigger.on_step_up_to_date, step=self)
+                self._finish()
+                return
+
         try:
-            self.run()
+            if fingerprint is None:
+                self.run()
+            else:
+                self._run_fingerprinted(fingerprint)
         except Exception as exc:  # pylint: disable=broad-except # noqa: BLE001
             if self.strict:
                 raise exc from None
@@ -95,7 +272,30 @@ class Step(abc.ABC):  # pylint: disable=too-many-instance-attributes
                 ),
             )
 
+        self._finish()
+
+    def _finish(self) -> None:
         self.suc = True
+        call_ktrigger(IKernelTrigger.post_run_workflow_step, step=self)
+
+    def _run_fingerprinted(self, fingerprint: str) -> None:
+        # Run it in a forked scope to find the variables it pushed. They are
+        # saved with the fingerprint, and pushed again when it's skipped.
+        scope = fork_scope()
+        try:
+            with enter_scope(scope):
+                self.run()
+        finally:
+            join_scope(scope)
+        save_step_fingerprint(
+            self,
+            fingerprint,
+            {
+                name: scope[name][-1]
+                for name, generation in scope.generations.items()
+                if generation >= scope.forked_at and name in scope
+            },
+        )
 
     def __str__(self) -> str:
         """Return the name of the step.
@@ -19,6 +19,8 @@
 
 """Rubisco workflow built-in steps implementation."""
 
+from typing import Any, Self
+
 from rubisco.kernel.workflow.step import Step
 from rubisco.kernel.workflow.steps.compress import CompressStep
 from rubisco.kernel.workflow.steps.copyfile import CopyFileStep
@@ -33,9 +35,15 @@ from rubisco.kernel.workflow.steps.movefile import MoveFileStep
 from rubisco.kernel.workflow.steps.popen import PopenStep
 from rubisco.kernel.workflow.steps.remove import RemoveStep
 from rubisco.kernel.workflow.steps.shell_exec import ShellExecStep
+from rubisco.kernel.workflow.steps.wait import WaitStep
 from rubisco.kernel.workflow.steps.workflowrun import WorkflowRunStep
 
-__all__ = ["step_contributes", "step_types"]
+__all__ = [
+    "index_step_contributes",
+    "infer_step_types",
+    "step_contributes",
+    "step_types",
+]
 
 
 step_types: dict[str, type[Step]] = {
@@ -54,23 +62,190 @@ step_types: dict[str, type[Step]] = {
     "extract": ExtractStep,
     "glob": GlobFileStep,
     "matrix": MatrixStep,
+    "wait": WaitStep,
 }
 
+
+class _StepContributes(dict[type[Step], list[str]]):
+    """`step_contributes`, it counts the changes to reindex lazily."""
+
+    # Increased every time the mapping is changed.
+    version: int = 0
+
+    def __setitem__(self, cls: type[Step], contributes: list[str]) -> None:
+        """Set the contributes of the step class.
+
+        Args:
+            cls (type[Step]): The step class.
+            contributes (list[str]): The contributed keys.
+
+        """
+        super().__setitem__(cls, contributes)
+        self.version += 1
+
+    def __delitem__(self, cls: type[Step]) -> None:
+        """Remove the step class.
+
+        Args:
+            cls (type[Step]): The step class.
+
+        """
+        super().__delitem__(cls)
+        self.version += 1
+
+    def pop(self, *args: Any) -> Any:  # noqa: ANN401
+        """Remove the step class and return its contributes.
+
+        Returns:
+            Any: The contributes, or the default value.
+
+        """
+        res = super().pop(*args)
+        self.version += 1
+        return res
+
+    def popitem(self) -> tuple[type[Step], list[str]]:
+        """Remove the last step class.
+
+        Returns:
+            tuple[type[Step], list[str]]: The step class and its contributes.
+
+        """
+        res = super().popitem()
+        self.version += 1
+        return res
+
+    def setdefault(
+        self,
+        cls: type[Step],
+        default: list[str],
+    ) -> list[str]:
+        """Set the contributes of the step class if it's not set.
+
+        Args:
+            cls (type[Step]): The step class.
+            default (list[str]): The contributed keys.
+
+        Returns:
+            list[str]: The contributes of the step class.
+
+        """
+        res = super().setdefault(cls, default)
+        self.version += 1
+        return res
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Update the contributes of the step classes."""
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def __ior__(self, other: Any) -> Self:  # noqa: ANN401
+        """Update the contributes of the step classes.
+
+        Returns:
+            Self: Itself.
+
+        """
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        """Remove all the step classes."""
+        super().clear()
+        self.version += 1
+
+
 # Type is optional. If not provided, it will be inferred from the step data.
-step_contributes: dict[type[Step], list[str]] = {
-    ShellExecStep: ["run"],
-    MkdirStep: ["mkdir"],
-    PopenStep: ["popen"],
-    OutputStep: ["output"],
-    EchoStep: ["echo"],
-    MoveFileStep: ["move", "to"],
-    CopyFileStep: ["copy", "to"],
-    RemoveStep: ["remove"],
-    ExtensionLoadStep: ["extension"],
-    WorkflowRunStep: ["workflow"],
-    MklinkStep: ["mklink", "to"],
-    CompressStep: ["compress", "to"],
-    ExtractStep: ["extract", "to"],
-    GlobFileStep: ["glob"],
-    MatrixStep: ["matrix", "steps"],
-}
+# If several types match, the first one is used. A type without contributes
+# matches all the steps. The index is rebuilt when it's changed, assign a new
+# list instead of changing the contributes of a type in place.
+step_contributes = _StepContributes(
+    {
+        ShellExecStep: ["run"],
+        MkdirStep: ["mkdir"],
+        PopenStep: ["popen"],
+        OutputStep: ["output"],
+        EchoStep: ["echo"],
+        MoveFileStep: ["move", "to"],
+        CopyFileStep: ["copy", "to"],
+        RemoveStep: ["remove"],
+        ExtensionLoadStep: ["extension"],
+        WorkflowRunStep: ["workflow"],
+        MklinkStep: ["mklink", "to"],
+        CompressStep: ["compress", "to"],
+        ExtractStep: ["extract", "to"],
+        GlobFileStep: ["glob"],
+        MatrixStep: ["matrix", "steps"],
+        WaitStep: ["wait"],
+    },
+)
+
+# The first contributed key -> the step classes. A step must have the first
+# key of a type to match it. Keys shared by many types like "to" are usually
+# not the first one, so they don't make all of them candidates.
+_contribute_index: dict[str, list[type[Step]]] = {}
+# The step classes without contributes. They match all the steps.
+_contribute_fallbacks: list[type[Step]] = []
+# The step class -> its order in `step_contributes`.
+_contribute_order: dict[type[Step], int] = {}
+# The version of `step_contributes` the index is built from.
+_contribute_version = -1
+
+
+def index_step_contributes() -> None:
+    """Rebuild the contributed key index from `step_contributes`.
+
+    It's called by `infer_step_types` when `step_contributes` is changed,
+    so it's unnecessary to call it after registering a step type.
+    """
+    global _contribute_index, _contribute_fallbacks, _contribute_order  # pylint: disable=W0603  # noqa: PLW0603
+    global _contribute_version  # pylint: disable=W0603  # noqa: PLW0603
+
+    version = step_contributes.version
+    index: dict[str, list[type[Step]]] = {}
+    fallbacks: list[type[Step]] = []
+    order: dict[type[Step], int] = {}
+    for idx, (cls, contributes) in enumerate(step_contributes.items()):
+        if contributes:
+            index.setdefault(contributes[0], []).append(cls)
+        else:
+            fallbacks.append(cls)
+        order[cls] = idx
+    # Replace them instead of changing them in place, so a thread which is
+    # inferring types doesn't see a half-built index.
+    _contribute_index = index
+    _contribute_fallbacks = fallbacks
+    _contribute_order = order
+    _contribute_version = version
+
+
+def infer_step_types(data: dict[str, Any]) -> list[type[Step]]:
+    """Get the step classes whose contributed keys are all in the step data.
+
+    Only the classes whose first contributed key is in the step data are
+    checked, so it doesn't get slower with the count of registered types.
+    The classes without contributes always match.
+    The values are not formatted, a key with null value is not counted.
+
+    Args:
+        data (dict[str, Any]): The step data.
+
+    Returns:
+        list[type[Step]]: The matched step classes, in the order of
+            `step_contributes`.
+
+    """
+    if step_contributes.version != _contribute_version:
+        index_step_contributes()
+    index, order = _contribute_index, _contribute_order
+    matched = list(_contribute_fallbacks)
+    for key in dict.keys(data):
+        for cls in index.get(key, ()):
+            if all(
+                dict.get(data, item) is not None
+                for item in step_contributes[cls]
+            ):
+                matched.append(cls)  # noqa: PERF401
+    if len(matched) > 1:
+        matched.sort(key=order.__getitem__)
+    return matched
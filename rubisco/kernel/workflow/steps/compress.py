@@ -20,10 +20,12 @@
 """CompressStep implementation."""
 
 from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.archive import compress
 from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.fileutil import IgnoreMatcher
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.utils import assert_iter_types
 
@@ -40,6 +42,19 @@ class CompressStep(Step):
     compress_format: str | None
     compress_level: int | None
     overwrite: bool
+    respect_ignore: bool
+
+    fields: ClassVar[StepFields] = {
+        "compress": str,
+        "to": str,
+        "start": str | None,
+        "excludes": list | None,
+        "format": str | list | None,
+        "level": int | None,
+        "overwrite": bool,
+        "respect-ignore": bool,
+    }
+    required_fields = ("compress", "to")
 
     def init(self) -> None:
         """Initialize the step."""
@@ -63,9 +78,15 @@ class CompressStep(Step):
             valtype=int | None,
         )
         self.overwrite = self.raw_data.get("overwrite", True, valtype=bool)
+        self.respect_ignore = self.raw_data.get(
+            "respect-ignore",
+            False,
+            valtype=bool,
+        )
 
     def run(self) -> None:
         """Run the step."""
+        ignore_matcher = IgnoreMatcher() if self.respect_ignore else None
         if isinstance(self.compress_format, list):
             assert_iter_types(
                 self.compress_format,
@@ -99,6 +120,7 @@ class CompressStep(Step):
                     fmt,
                     self.compress_level,
                     overwrite=self.overwrite,
+                    ignore_matcher=ignore_matcher,
                 )
         else:
             compress(
@@ -109,4 +131,5 @@ class CompressStep(Step):
                 self.compress_format,
                 self.compress_level,
                 overwrite=self.overwrite,
+                ignore_matcher=ignore_matcher,
             )
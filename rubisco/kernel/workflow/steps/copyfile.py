@@ -21,10 +21,12 @@
 
 import glob
 from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.fileutil import (
+    IgnoreMatcher,
     assert_rel_path,
     check_file_exists,
     copy_recursive,
@@ -45,6 +47,17 @@ class CopyFileStep(Step):
     overwrite: bool
     keep_symlinks: bool
     excludes: list[str] | None
+    respect_ignore: bool
+
+    fields: ClassVar[StepFields] = {
+        "copy": str | list,
+        "to": str,
+        "overwrite": bool,
+        "keep-symlinks": bool,
+        "excludes": list | None,
+        "respect-ignore": bool,
+    }
+    required_fields = ("copy", "to")
 
     def init(self) -> None:
         """Initialize the step."""
@@ -72,6 +85,11 @@ class CopyFileStep(Step):
             None,
             valtype=list | None,
         )
+        self.respect_ignore = self.raw_data.get(
+            "respect-ignore",
+            False,
+            valtype=bool,
+        )
 
     def run(self) -> None:
         """Run the step."""
@@ -80,6 +98,7 @@ class CopyFileStep(Step):
         if self.dst.is_dir():
             check_file_exists(self.dst)
         assert_rel_path(self.dst)
+        ignore_matcher = IgnoreMatcher() if self.respect_ignore else None
 
         for src_glob in self.srcs:
             for src in glob.glob(src_glob):  # noqa: PTH207
@@ -96,4 +115,5 @@ class CopyFileStep(Step):
                     strict=not self.overwrite,
                     symlinks=self.keep_symlinks,
                     exists_ok=self.overwrite,
+                    ignore_matcher=ignore_matcher,
                 )
@@ -43,4 +43,5 @@ class EchoStep(Step):
         call_ktrigger(IKernelTrigger.on_output, message=self.msg)
 
 
-OutputStep = EchoStep
+class OutputStep(EchoStep):
+    """Output a message. The `output` type of `EchoStep`."""
@@ -20,10 +20,11 @@
 """ExtensionLoadStep implementation."""
 
 from pathlib import Path
+from typing import ClassVar
 
 from rubisco.envutils.env import GLOBAL_ENV, USER_ENV, WORKSPACE_ENV
 from rubisco.kernel.workflow._interfaces import WorkflowInterfaces
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 
 __all__ = ["ExtensionLoadStep"]
 
@@ -33,6 +34,11 @@ class ExtensionLoadStep(Step):
 
     path: Path
 
+    fields: ClassVar[StepFields] = {
+        "extension": str,
+    }
+    required_fields = ("extension",)
+
     def init(self) -> None:
         """Initialize the step."""
         self.path = Path(self.raw_data.get("extension", valtype=str))
@@ -20,8 +20,9 @@
 """ExtractStep implementation."""
 
 from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.archive import extract
 
 __all__ = ["ExtractStep"]
@@ -36,6 +37,14 @@ class ExtractStep(Step):
     overwrite: bool
     password: str | None
 
+    fields: ClassVar[StepFields] = {
+        "extract": str,
+        "to": str,
+        "overwrite": bool,
+        "password": str | None,
+    }
+    required_fields = ("extract", "to")
+
     def init(self) -> None:
         """Initialize the step."""
         self.src = Path(self.raw_data.get("extract", valtype=str))
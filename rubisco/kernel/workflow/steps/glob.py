@@ -17,14 +17,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-"""CopyFileStep implementation."""
+"""GlobFileStep implementation."""
 
-import glob
-from pathlib import Path
+import os
+import stat
+from functools import partial
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.fileutil import IgnoreMatcher
 from rubisco.lib.l10n import _
+from rubisco.lib.pathglob import FileEntry, glob_files
 from rubisco.lib.variable.utils import assert_iter_types
 from rubisco.lib.variable.variable import push_variables
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
@@ -50,6 +54,28 @@ class GlobFileStep(Step):  # pylint: disable=R0902
     include_block_devices: bool
     include_char_devices: bool
     include_mountpoints: bool
+    respect_ignore: bool
+
+    fields: ClassVar[StepFields] = {
+        "glob": str | list,
+        "excludes": str | list,
+        "root": str | None,
+        "save-to": str | None,
+        "recursive": bool,
+        "include-hidden": bool,
+        "regular": bool,
+        "dirs": bool,
+        "symlinks": bool,
+        "hardlinks": bool,
+        "fifos": bool,
+        "sockets": bool,
+        "block-devices": bool,
+        "char-devices": bool,
+        "devices": bool,
+        "mountpoints": bool,
+        "respect-ignore": bool,
+    }
+    required_fields = ("glob",)
 
     def init(self) -> None:
         """Initialize the step."""
@@ -149,53 +175,83 @@ class GlobFileStep(Step):  # pylint: disable=R0902
             default=True,
             valtype=bool,
         )
+        self.respect_ignore = self.raw_data.get(
+            "respect-ignore",
+            default=False,
+            valtype=bool,
+        )
 
-    def _need_ignore(self, path: Path) -> bool:
-        return not (
-            (self.include_regular_files and path.is_file())
-            or (self.include_directories and path.is_dir())
-            or (self.include_symlinks and path.is_symlink())
-            or (self.include_hardlinks and path.stat().st_nlink > 1)
-            or (self.include_fifos and path.is_fifo())
-            or (self.include_sockets and path.is_socket())
-            or (self.include_block_devices and path.is_block_device())
-            or (self.include_char_devices and path.is_char_device())
-            or (self.include_mountpoints and path.is_mount())
+    def _include_all(self) -> bool:
+        return (
+            self.include_regular_files
+            and self.include_directories
+            and self.include_symlinks
+            and self.include_fifos
+            and self.include_sockets
+            and self.include_block_devices
+            and self.include_char_devices
+        )
+
+    def _accept(
+        self,
+        entry: FileEntry,
+        parents: dict[str, os.stat_result],
+    ) -> bool:
+        # Types of non-symlinks are known from the directory listing. Others
+        # need one `stat` at most. Symlinks are classified by their targets.
+        try:
+            if entry.is_symlink():
+                if self.include_symlinks:
+                    return True
+                st = entry.stat()
+            else:
+                if (
+                    self.include_regular_files
+                    and entry.is_file(follow_symlinks=False)
+                ) or (
+                    self.include_directories
+                    and entry.is_dir(follow_symlinks=False)
+                ):
+                    return True
+                st = entry.stat(follow_symlinks=False)
+        except OSError:
+            return False
+
+        mode = st.st_mode
+        return (
+            (self.include_regular_files and stat.S_ISREG(mode))
+            or (self.include_directories and stat.S_ISDIR(mode))
+            or (
+                self.include_hardlinks
+                and not stat.S_ISDIR(mode)
+                and st.st_nlink > 1
+            )
+            or (self.include_fifos and stat.S_ISFIFO(mode))
+            or (self.include_sockets and stat.S_ISSOCK(mode))
+            or (self.include_block_devices and stat.S_ISBLK(mode))
+            or (self.include_char_devices and stat.S_ISCHR(mode))
+            or (
+                self.include_mountpoints
+                and stat.S_ISDIR(mode)
+                and not entry.is_symlink()
+                and _is_mount(entry, st, parents)
+            )
         )
 
     def run(self) -> None:
         """Run the step."""
-        selected: list[Path] = []
-        for pattern in self.patterns:
-            selected.extend([
-                Path(src).absolute()
-                for src in glob.glob(  # noqa: PTH207
-                    pattern,
-                    root_dir=self.root_dir,
-                    recursive=self.recursive,
-                    include_hidden=self.include_hidden,
-                )
-            ])
-        excludes: list[Path] = []
-        for pattern in self.exclude_patterns:
-            excludes.extend(
-                [
-                    Path(src).absolute()
-                    for src in glob.glob(  # noqa: PTH207
-                        pattern,
-                        root_dir=self.root_dir,
-                        recursive=self.recursive,
-                        include_hidden=self.include_hidden,
-                    )
-                ],
-            )
-        res: list[Path] = []
-        res.extend(
-            [
-                p
-                for p in selected
-                if p.absolute() not in excludes and not self._need_ignore(p)
-            ],
+        res = glob_files(
+            self.patterns,
+            self.exclude_patterns,
+            root_dir=self.root_dir,
+            recursive=self.recursive,
+            include_hidden=self.include_hidden,
+            accept=(
+                None
+                if self._include_all()
+                else partial(self._accept, parents={})
+            ),
+            skip=IgnoreMatcher().match_entry if self.respect_ignore else None,
         )
         for path in res:
             call_ktrigger(
@@ -205,3 +261,20 @@ class GlobFileStep(Step):  # pylint: disable=R0902
         if self.save_to:
             push_variables(self.save_to, res)
         push_variables(f"{self.global_id}.files", res)
+
+
+def _is_mount(
+    entry: FileEntry,
+    st: os.stat_result,
+    parents: dict[str, os.stat_result],
+) -> bool:
+    # Same as `os.path.ismount`, but the parent is only stat once.
+    parent = os.path.dirname(entry.path)  # noqa: PTH120
+    parent_st = parents.get(parent)
+    if parent_st is None:
+        try:
+            parent_st = os.lstat(parent or ".")
+        except OSError:
+            return False
+        parents[parent] = parent_st
+    return st.st_dev != parent_st.st_dev or st.st_ino == parent_st.st_ino
@@ -19,22 +19,45 @@
 
 """MatrixStep implementation."""
 
-import copy
+import enum
 import itertools
+import os
+import threading
+import time
 from collections.abc import Generator
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, ClassVar
 
 from rubisco.kernel.workflow._interfaces import WorkflowInterfaces
-from rubisco.kernel.workflow.step import Step
-from rubisco.lib.exceptions import RUTypeError
+from rubisco.kernel.workflow.step import (
+    Step,
+    StepCancelledError,
+    StepFields,
+    cancel_on,
+)
+from rubisco.lib.exceptions import RUTypeError, RUValueError
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.autoformatdict import AutoFormatDict
 from rubisco.lib.variable.autoformatlist import AutoFormatList
+from rubisco.lib.variable.format import format_many
 from rubisco.lib.variable.utils import assert_iter_types
 from rubisco.lib.variable.var_container import VariableContainer
-from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
-
-__all__ = ["MatrixStep"]
+from rubisco.lib.variable.variable import (
+    VariableScope,
+    enter_scope,
+    fork_scope,
+    join_scope,
+)
+from rubisco.shared.ktrigger import (
+    IKernelTrigger,
+    KTriggerBuffer,
+    buffer_ktriggers,
+    call_ktrigger,
+    get_ktrigger_buffer,
+)
+
+__all__ = ["MatrixJobResult", "MatrixJobStatus", "MatrixStep"]
 
 
 def _generate_combinations(
@@ -84,7 +107,14 @@ def allocate_matrix_vars(
     return AutoFormatList(_generate_combinations(mvars))
 
 
-def _in(var: AutoFormatDict, exclude: AutoFormatDict) -> bool:
+def _format_items(var: AutoFormatDict) -> dict[str, Any]:
+    # All the keys and values see the same variables. Format them in a batch.
+    count = len(var)
+    formatted = format_many([*var.orig_keys(), *var.orig_values()])
+    return dict(zip(formatted[:count], formatted[count:], strict=True))
+
+
+def _in(var: dict[str, Any], exclude: dict[str, Any]) -> bool:
     for key, value in exclude.items():
         if key not in var:
             return False
@@ -116,23 +146,71 @@ def exclude_matrix_vars(
     if not excludes:
         return mvars
 
-    excludes_list = allocate_matrix_vars(excludes)
+    # Format every matrix var and exclude once, instead of once for each
+    # comparison.
+    excludes_list = [
+        _format_items(exclude) for exclude in allocate_matrix_vars(excludes)
+    ]
+
+    kept: list[AutoFormatDict] = []
+    for mvar in mvars:
+        items = _format_items(mvar)
+        if not any(_in(items, exclude) for exclude in excludes_list):
+            kept.append(mvar)
+    return AutoFormatList(kept)
+
+
+class MatrixJobStatus(enum.Enum):
+    """Status of a matrix job."""
+
+    SUCCESS = "success"
+    FAILURE = "failure"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class MatrixJobResult:
+    """Result of a matrix job."""
 
-    return AutoFormatList(
-        [
-            mvar
-            for mvar in mvars
-            if not any(_in(mvar, exclude) for exclude in excludes_list)
-        ],
-    )
+    index: int
+    variables: AutoFormatDict
+    status: MatrixJobStatus
+    duration: float  # In seconds.
+    error: Exception | None = None
 
 
 class MatrixStep(Step):
-    """Matrix step."""
+    """Matrix step.
+
+    Jobs run one by one by default. With `parallel: true`, at most
+    `max-parallel` jobs run at the same time in threads. Each job has its own
+    variable scope and its output is shown when it finishes. If `fail-fast`
+    is true (default), the first failure cancels the jobs that are not
+    started yet and the remaining steps of the running jobs.
+
+    Both modes behave the same after the jobs:
+    - `post_run_matrix` is called for every started job, even a failed one.
+    - The variables set by the jobs stay visible. Parallel jobs' scopes are
+      joined in job order once all of them have finished. A variable set by
+      several jobs ends up with the value from the last of them.
+    """
 
     matrix_vars: dict[str, list[Any] | Any] | list[dict[str, Any]]
     excludes: dict[str, list[Any] | Any] | list[dict[str, Any]]
     steps: list[AutoFormatDict]
+    parallel: bool
+    max_parallel: int
+    fail_fast: bool
+
+    fields: ClassVar[StepFields] = {
+        "matrix": list | dict,
+        "excludes": list | dict,
+        "steps": list,
+        "parallel": bool,
+        "max-parallel": int,
+        "fail-fast": bool,
+    }
+    required_fields = ("matrix", "steps")
 
     def init(self) -> None:
         """Initialize the step."""
@@ -141,18 +219,136 @@ class MatrixStep(Step):
             self.raw_data.get("excludes", [], valtype=list | dict),
         )
         self.steps = list(self.raw_data.get("steps", valtype=list))
+        self.parallel = self.raw_data.get("parallel", False, valtype=bool)
+        self.max_parallel = self.raw_data.get(
+            "max-parallel",
+            os.cpu_count() or 1,
+            valtype=int,
+        )
+        if self.max_parallel < 1:
+            raise RUValueError(
+                _("'max-parallel' must be a positive integer."),
+            )
+        self.fail_fast = self.raw_data.get("fail-fast", True, valtype=bool)
 
     def run(self) -> None:
         """Run the step."""
         matrix_vars = allocate_matrix_vars(self.matrix_vars)
         matrix_vars = exclude_matrix_vars(matrix_vars, self.excludes)
 
+        if self.parallel:
+            self._run_parallel(matrix_vars)
+            return
+
         for idx, mvars in enumerate(matrix_vars):
             with VariableContainer(mvars):
                 call_ktrigger(IKernelTrigger.pre_run_matrix, variables=mvars)
-                default_id = f"{self.id}.matrix.{idx}"
-                WorkflowInterfaces.get_run_inline_workflow()(
-                    copy.deepcopy(self.steps),  # What the fuck?
-                    default_id,
-                )
+                try:
+                    WorkflowInterfaces.get_run_inline_workflow()(
+                        self.steps,
+                        f"{self.id}.matrix.{idx}",
+                    )
+                finally:
+                    call_ktrigger(
+                        IKernelTrigger.post_run_matrix,
+                        variables=mvars,
+                    )
+
+    def _run_job(
+        self,
+        idx: int,
+        mvars: AutoFormatDict,
+        scope: VariableScope,
+        cancel: threading.Event,
+        parent: KTriggerBuffer | None,
+    ) -> MatrixJobResult:
+        start = time.perf_counter()
+        status = MatrixJobStatus.SUCCESS
+        error: Exception | None = None
+        with (
+            enter_scope(scope),
+            cancel_on(cancel),
+            buffer_ktriggers(parent) as buffer,
+        ):
+            call_ktrigger(IKernelTrigger.pre_run_matrix, variables=mvars)
+            try:
+                with VariableContainer(mvars):
+                    WorkflowInterfaces.get_run_inline_workflow()(
+                        self.steps,
+                        f"{self.id}.matrix.{idx}",
+                    )
+            except StepCancelledError as exc:
+                status = MatrixJobStatus.CANCELLED
+                error = exc
+            except Exception as exc:  # pylint: disable=broad-except # noqa: BLE001
+                status = MatrixJobStatus.FAILURE
+                error = exc
+                if self.fail_fast:
+                    cancel.set()
+            finally:
                 call_ktrigger(IKernelTrigger.post_run_matrix, variables=mvars)
+                buffer.flush()
+        return MatrixJobResult(
+            idx,
+            mvars,
+            status,
+            time.perf_counter() - start,
+            error,
+        )
+
+    def _run_parallel(
+        self,
+        matrix_vars: AutoFormatList[AutoFormatDict],
+    ) -> None:
+        cancel = threading.Event()
+        results = [
+            MatrixJobResult(idx, mvars, MatrixJobStatus.CANCELLED, 0.0)
+            for idx, mvars in enumerate(matrix_vars)
+        ]
+        first_error: Exception | None = None
+        # The output of the jobs goes to the buffer of this step if any.
+        parent = get_ktrigger_buffer()
+
+        # Scopes must be forked and joined in this thread.
+        scopes = [fork_scope() for _ in results]
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel,
+            thread_name_prefix=f"matrix-{self.id}",
+        ) as pool:
+            futures = [
+                pool.submit(
+                    self._run_job,
+                    result.index,
+                    result.variables,
+                    scope,
+                    cancel,
+                    parent,
+                )
+                for result, scope in zip(results, scopes, strict=True)
+            ]
+            try:
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    results[result.index] = result
+                    if result.status != MatrixJobStatus.FAILURE:
+                        continue
+                    if first_error is None:
+                        first_error = result.error
+                    if self.fail_fast:
+                        for pending in futures:
+                            pending.cancel()
+            except BaseException:
+                cancel.set()
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        # Like the sequential jobs, the variables set by the jobs are kept.
+        for scope in scopes:
+            join_scope(scope)
+
+        call_ktrigger(IKernelTrigger.on_matrix_summary, results=results)
+        if first_error is not None:
+            raise first_error from None
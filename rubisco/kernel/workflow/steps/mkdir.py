@@ -20,9 +20,9 @@
 """MkdirStep implementation."""
 
 from pathlib import Path
-from typing import cast
+from typing import ClassVar, cast
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.fileutil import assert_rel_path
 from rubisco.lib.l10n import _
@@ -37,6 +37,11 @@ class MkdirStep(Step):
 
     paths: list[Path]
 
+    fields: ClassVar[StepFields] = {
+        "mkdir": str | list,
+    }
+    required_fields = ("mkdir",)
+
     def init(self) -> None:
         """Initialize the step."""
         paths = cast(
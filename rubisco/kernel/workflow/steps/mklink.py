@@ -21,8 +21,9 @@
 
 import os
 from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.fileutil import assert_rel_path
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
@@ -36,6 +37,13 @@ class MklinkStep(Step):
     dst: Path
     symlink: bool
 
+    fields: ClassVar[StepFields] = {
+        "mklink": str,
+        "to": str,
+        "symlink": bool,
+    }
+    required_fields = ("mklink", "to")
+
     def init(self) -> None:
         """Initialize the step."""
         self.src = Path(self.raw_data.get("mklink", valtype=str))
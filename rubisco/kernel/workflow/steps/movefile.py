@@ -21,8 +21,9 @@
 
 import shutil
 from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.fileutil import assert_rel_path, check_file_exists
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
@@ -35,6 +36,12 @@ class MoveFileStep(Step):
     src: Path
     dst: Path
 
+    fields: ClassVar[StepFields] = {
+        "move": str,
+        "to": str,
+    }
+    required_fields = ("move", "to")
+
     def init(self) -> None:
         """Initialize the step."""
         self.src = Path(self.raw_data.get("move", valtype=str))
@@ -19,9 +19,12 @@
 
 """PopenStep implementation."""
 
+from functools import partial
 from pathlib import Path
+from typing import Any, ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.background import start_background_job
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.process import Process
 from rubisco.lib.variable.variable import push_variables
 
@@ -36,6 +39,17 @@ class PopenStep(Step):
     fail_on_error: bool
     stdout: bool
     stderr: int
+    background: bool
+
+    fields: ClassVar[StepFields] = {
+        "popen": str,
+        "cwd": str,
+        "fail-on-error": bool,
+        "stdout": bool,
+        "stderr": bool | str,
+        "background": bool,
+    }
+    required_fields = ("popen",)
 
     def init(self) -> None:
         """Initialize the step."""
@@ -55,15 +69,34 @@ class PopenStep(Step):
             self.stderr = 0
         else:
             self.stderr = 2
+        self.background = self.raw_data.get("background", False, valtype=bool)
 
-    def run(self) -> None:
-        """Run the step."""
-        stdout, stderr, retcode = Process(self.cmd, cwd=self.cwd).popen(
+    def _popen(
+        self,
+        process: Process,
+        *,
+        fail_on_error: bool,
+    ) -> dict[str, Any]:
+        stdout, stderr, retcode = process.popen(
             stdout=self.stdout,
             stderr=self.stderr,
-            fail_on_error=self.fail_on_error,
+            fail_on_error=fail_on_error,
             show_step=True,
         )
-        push_variables(f"{self.global_id}.stdout", stdout)
-        push_variables(f"{self.global_id}.stderr", stderr)
-        push_variables(f"{self.global_id}.retcode", retcode)
+        return {"stdout": stdout, "stderr": stderr, "retcode": retcode}
+
+    def run(self) -> None:
+        """Run the step."""
+        process = Process(self.cmd, cwd=self.cwd)
+        if self.background:
+            start_background_job(
+                self,
+                process,
+                partial(self._popen, process, fail_on_error=False),
+                fail_on_error=self.fail_on_error,
+            )
+            return
+
+        variables = self._popen(process, fail_on_error=self.fail_on_error)
+        for name, value in variables.items():
+            push_variables(f"{self.global_id}.{name}", value)
@@ -19,13 +19,13 @@
 
 """RemoveStep implementation."""
 
-import glob
-from pathlib import Path
+from typing import ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.exceptions import RUValueError
-from rubisco.lib.fileutil import rm_recursive
+from rubisco.lib.fileutil import IgnoreMatcher, rm_recursive
 from rubisco.lib.l10n import _
+from rubisco.lib.pathglob import glob_files
 from rubisco.lib.variable.utils import assert_iter_types
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
@@ -35,12 +35,22 @@ __all__ = ["RemoveStep"]
 class RemoveStep(Step):
     """Remove a file or directory.
 
-    This step is dangerous. Use it with caution!
+    The paths matched by `excludes` are kept, including the ones in a
+    removed directory. This step is dangerous. Use it with caution!
     """
 
     globs: list[str]
     excludes: list[str]
     include_hidden: bool
+    respect_ignore: bool
+
+    fields: ClassVar[StepFields] = {
+        "remove": str | list,
+        "include-hidden": bool,
+        "excludes": list,
+        "respect-ignore": bool,
+    }
+    required_fields = ("remove",)
 
     def init(self) -> None:
         """Initialize the step."""
@@ -61,16 +71,34 @@ class RemoveStep(Step):
             valtype=bool,
         )
         self.excludes = self.raw_data.get("excludes", [], valtype=list)
+        self.respect_ignore = self.raw_data.get(
+            "respect-ignore",
+            False,
+            valtype=bool,
+        )
 
     def run(self) -> None:
         """Run the step."""
-        for glob_partten in self.globs:
-            paths = glob.glob(  # pylint: disable=E1123  # noqa: PTH207
-                glob_partten,
-                recursive=True,
-                include_hidden=self.include_hidden,
+        ignore_matcher = IgnoreMatcher() if self.respect_ignore else None
+        paths = glob_files(
+            self.globs,
+            self.excludes,
+            recursive=True,
+            include_hidden=self.include_hidden,
+            skip=ignore_matcher.match_entry if ignore_matcher else None,
+        )
+        # The excluded paths in the removed directories are kept too. Hidden
+        # paths are matched, it's safer to keep more.
+        keep_paths = (
+            glob_files(self.excludes, recursive=True, include_hidden=True)
+            if self.excludes and paths
+            else []
+        )
+        for path in paths:
+            call_ktrigger(IKernelTrigger.on_remove, path=path)
+            rm_recursive(
+                path,
+                strict=True,
+                ignore_matcher=ignore_matcher,
+                keep_paths=keep_paths,
             )
-            for str_path in paths:
-                path = Path(str_path)
-                call_ktrigger(IKernelTrigger.on_remove, path=path)
-                rm_recursive(path, strict=True)
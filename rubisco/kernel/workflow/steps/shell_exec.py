@@ -20,9 +20,10 @@
 """ShellExecStep implementation."""
 
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.background import start_background_job
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.process import Process
 from rubisco.lib.variable.variable import push_variables
 
@@ -35,6 +36,15 @@ class ShellExecStep(Step):
     cmd: str | list[Any]
     cwd: Path
     fail_on_error: bool
+    background: bool
+
+    fields: ClassVar[StepFields] = {
+        "run": str | list,
+        "cwd": str,
+        "fail-on-error": bool,
+        "background": bool,
+    }
+    required_fields = ("run",)
 
     def init(self) -> None:
         """Initialize the step."""
@@ -45,10 +55,23 @@ class ShellExecStep(Step):
             default=True,
             valtype=bool,
         )
+        self.background = self.raw_data.get(
+            "background",
+            default=False,
+            valtype=bool,
+        )
 
     def run(self) -> None:
         """Run the step."""
-        retcode = Process(self.cmd, self.cwd).run(
-            fail_on_error=self.fail_on_error,
-        )
+        process = Process(self.cmd, self.cwd)
+        if self.background:
+            start_background_job(
+                self,
+                process,
+                lambda: {"retcode": process.run(fail_on_error=False)},
+                fail_on_error=self.fail_on_error,
+            )
+            return
+
+        retcode = process.run(fail_on_error=self.fail_on_error)
         push_variables(f"{self.global_id}.retcode", retcode)
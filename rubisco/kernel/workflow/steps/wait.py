@@ -0,0 +1,78 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""WaitStep implementation."""
+
+from typing import ClassVar
+
+from rubisco.kernel.workflow.background import find_background_job
+from rubisco.kernel.workflow.step import Step, StepFields
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.l10n import _
+from rubisco.lib.variable.utils import assert_iter_types
+from rubisco.lib.variable.variable import push_variables
+
+__all__ = ["WaitStep"]
+
+
+class WaitStep(Step):
+    """Wait for the steps running in background."""
+
+    handles: list[str]
+    terminate: bool
+
+    fields: ClassVar[StepFields] = {
+        "wait": str | list,
+        "terminate": bool,
+    }
+    required_fields = ("wait",)
+
+    def init(self) -> None:
+        """Initialize the step."""
+        handles = self.raw_data.get("wait", valtype=str | list)
+        if isinstance(handles, str):
+            handles = [handles]
+        assert_iter_types(
+            handles,
+            str,
+            RUValueError(
+                _("'wait' must be a step id or a list of step ids."),
+            ),
+        )
+        self.handles = list(handles)
+        self.terminate = self.raw_data.get("terminate", False, valtype=bool)
+
+    def run(self) -> None:
+        """Run the step."""
+        jobs = [
+            find_background_job(handle, self.parent_workflow)
+            for handle in self.handles
+        ]
+        # Wait for all of them even if one failed, then raise the first error.
+        error: Exception | None = None
+        for job in jobs:
+            try:
+                variables = job.wait(terminate=self.terminate)
+            except Exception as exc:  # pylint: disable=broad-except # noqa: BLE001
+                error = error or exc
+                continue
+            for name, value in variables.items():
+                push_variables(f"{job.handle}.{name}", value)
+        if error is not None:
+            raise error
@@ -20,9 +20,10 @@
 """WorkflowRunStep implementation."""
 
 from pathlib import Path
+from typing import ClassVar
 
 from rubisco.kernel.workflow._interfaces import WorkflowInterfaces
-from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.step import Step, StepFields
 from rubisco.lib.variable.variable import push_variables
 
 __all__ = ["WorkflowRunStep"]
@@ -34,6 +35,12 @@ class WorkflowRunStep(Step):
     path: Path
     fail_fast: bool
 
+    fields: ClassVar[StepFields] = {
+        "workflow": str,
+        "fail-fast": bool,
+    }
+    required_fields = ("workflow",)
+
     def init(self) -> None:
         """Initialize the step."""
         self.path = Path(self.raw_data.get("workflow", valtype=str))
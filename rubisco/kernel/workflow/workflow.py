@@ -19,20 +19,45 @@
 
 """Workflow implementation."""
 
+import itertools
 from collections.abc import Generator
 
-from rubisco.kernel.workflow.step import Step
-from rubisco.kernel.workflow.steps import step_contributes, step_types
+from rubisco.kernel.workflow.background import terminate_background_jobs
+from rubisco.kernel.workflow.plan import (
+    StepPlan,
+    WorkflowPlan,
+    add_step_id,
+    compile_workflow,
+)
+from rubisco.kernel.workflow.scheduler import StepNode, run_step_graph
+from rubisco.kernel.workflow.step import Step, create_step
+from rubisco.kernel.workflow.steps import infer_step_types, step_types
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.autoformatdict import AutoFormatDict
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.lib.variable.utils import assert_iter_types, make_pretty
-from rubisco.lib.variable.variable import pop_variables, push_variables
+from rubisco.lib.variable.variable import (
+    VariableScope,
+    current_scope,
+    enter_scope,
+    pop_variables,
+    push_variables,
+)
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
 __all__ = ["Workflow"]
 
+# (step keys, matched step types) of the ambiguous steps already warned.
+_warned_ambiguous_steps: set[tuple[frozenset[str], tuple[str, ...]]] = set()
+
+
+def _get_step_type_name(cls: type[Step]) -> str:
+    for name, step_cls in step_types.items():
+        if step_cls is cls:
+            return name
+    return cls.__name__
+
 
 class Workflow:
     """A workflow."""
@@ -41,8 +66,12 @@ class Workflow:
     name: str
     first_step: Step | None
     raw_data: AutoFormatDict
+    plan: WorkflowPlan
 
     pushed_variables: list[str]
+    # The scope which the variables are pushed to. The workflow may be
+    # released in another thread.
+    scope: VariableScope
 
     def __init__(self, data: AutoFormatDict, default_id: str) -> None:
         """Create a new workflow.
@@ -53,6 +82,7 @@ class Workflow:
 
         """
         self.pushed_variables = []
+        self.scope = current_scope()
         pairs = data.get("vars", [], valtype=list)
         assert_iter_types(
             pairs,
@@ -74,98 +104,121 @@ class Workflow:
         )
         self.name = data.get("name", valtype=str)
         self.raw_data = data
+        self.first_step = None
+        # Compile all the steps before running any of them.
+        self.plan = compile_workflow(self)
 
-    def _parse_steps(  # noqa: C901
+    def _infer_step_class(
         self,
-        steps: list[AutoFormatDict],
-    ) -> Step | None:
-        """Parse the steps and run them.
+        step_data: AutoFormatDict,
+    ) -> type[Step] | None:
+        classes = infer_step_types(step_data)
+        if not classes:
+            return None
+        if len(classes) > 1:
+            names = tuple(_get_step_type_name(cls) for cls in classes)
+            # Warn once for each kind of steps, not for each matrix job.
+            warning = (frozenset(dict.keys(step_data)), names)
+            if warning not in _warned_ambiguous_steps:
+                _warned_ambiguous_steps.add(warning)
+                call_ktrigger(
+                    IKernelTrigger.on_warning,
+                    message=fast_format_str(
+                        _(
+                            "Step '${{step_id}}' matches multiple step types: "
+                            "${{types}}. '${{type}}' is used.",
+                        ),
+                        fmt={
+                            "step_id": str(dict.get(step_data, "id")),
+                            "types": ", ".join(names),
+                            "type": names[0],
+                        },
+                    ),
+                )
+        return classes[0]
+
+    def get_step_class(self, step_data: AutoFormatDict) -> type[Step]:
+        """Get the class of a step by its type or its keys.
 
         Args:
-            steps (list[AutoFormatDict]): The steps dict data.
+            step_data (AutoFormatDict): The step data with its id.
 
         Returns:
-            Step: The first step.
+            type[Step]: The step class.
 
-        """
-        first_step = None
-        prev_step = None
-
-        step_ids: list[str] = []
-
-        for step_idx, step_data in enumerate(steps):
-            step_id = step_data.get(
-                "id",
-                f"{self.id}.steps.{step_idx}",
-                valtype=str,
-            )
-            step_name = step_data.get("name", "", valtype=str)
-            step_type = step_data.get("type", "", valtype=str)
-            step_cls: type | None
-
-            step_data["id"] = step_id
-            if step_id in step_ids:
-                raise RUValueError(
-                    fast_format_str(
-                        _("Step id '${{step_id}}' is duplicated."),
-                        fmt={"step_id": step_id},
-                    ),
-                )
-            step_ids.append(step_id)
-
-            step_cls = None
-
-            if not step_type:
-                for cls, contribute in step_contributes.items():
-                    is_match = all(
-                        step_data.get(contribute_item, None) is not None
-                        for contribute_item in contribute  # All items exist.
-                    )
-                    if is_match:
-                        step_cls = cls
-                        break
-            else:
-                step_cls = step_types.get(step_type)
-                if step_cls is None:
-                    raise RUValueError(
-                        fast_format_str(
-                            _(
-                                "Unknown step type: '${{step_type}}' of step "
-                                "'${{step_name}}'. Please check the workflow.",
-                            ),
-                            fmt={
-                                "step_type": step_type,
-                                "step_name": step_name,
-                            },
-                        ),
-                        hint=_(
-                            "Consider use 'type' attribute manually.",
-                        ),
-                    )
+        Raises:
+            RUValueError: If the type is unknown or can't be inferred.
 
+        """
+        # The id and name are only used in the messages. They are not
+        # formatted, the id may be resolved when the step runs.
+        step_name = str(dict.get(step_data, "name", ""))
+        step_type = step_data.get("type", "", valtype=str)
+        step_cls: type[Step] | None = None
+
+        if not step_type:
+            step_cls = self._infer_step_class(step_data)
+        else:
+            step_cls = step_types.get(step_type)
             if step_cls is None:
                 raise RUValueError(
                     fast_format_str(
                         _(
-                            "The type of step '${{step}}'[black](${{step_id}})"
-                            "[/black] in workflow '${{workflow}}'[black]("
-                            "${{workflow_id}})[/black] is not provided and "
-                            "could not be inferred.",
+                            "Unknown step type: '${{step_type}}' of step "
+                            "'${{step_name}}'. Please check the workflow.",
                         ),
                         fmt={
-                            "step": make_pretty(step_name, _("<Unnamed>")),
-                            "workflow": make_pretty(self.name, _("<Unnamed>")),
-                            "step_id": step_id,
-                            "workflow_id": self.id,
+                            "step_type": step_type,
+                            "step_name": step_name,
                         },
                     ),
+                    hint=_(
+                        "Consider use 'type' attribute manually.",
+                    ),
                 )
-            step = step_cls(step_data, self)
-            if step.suc:
-                call_ktrigger(
-                    IKernelTrigger.post_run_workflow_step,
-                    step=step,
-                )
+
+        if step_cls is None:
+            raise RUValueError(
+                fast_format_str(
+                    _(
+                        "The type of step '${{step}}'[black](${{step_id}})"
+                        "[/black] in workflow '${{workflow}}'[black]("
+                        "${{workflow_id}})[/black] is not provided and "
+                        "could not be inferred.",
+                    ),
+                    fmt={
+                        "step": make_pretty(step_name, _("<Unnamed>")),
+                        "workflow": make_pretty(self.name, _("<Unnamed>")),
+                        "step_id": str(dict.get(step_data, "id")),
+                        "workflow_id": self.id,
+                    },
+                ),
+            )
+        return step_cls
+
+    def _run_steps(self, steps: tuple[StepPlan, ...]) -> Step | None:
+        """Run the compiled steps one by one.
+
+        Args:
+            steps (tuple[StepPlan, ...]): The compiled steps.
+
+        Returns:
+            Step: The first step.
+
+        """
+        first_step = None
+        prev_step = None
+        step_ids: set[str] = set()
+
+        for step_plan in steps:
+            # Templated ids are checked after the steps before them run.
+            step_id = step_plan.id
+            if step_plan.templated_id:
+                step_id = step_plan.data.get("id", valtype=str)
+            add_step_id(step_id, step_ids)
+            step_cls = step_plan.cls or self.get_step_class(step_plan.data)
+            step = create_step(step_cls, step_plan.data, self)
+            step.execute()
 
             if prev_step is not None:
                 prev_step.next = step
@@ -177,6 +230,30 @@ class Workflow:
 
         return first_step
 
+    def _run_step_graph(self, steps: tuple[StepPlan, ...]) -> Step | None:
+        """Run the compiled steps by their dependencies.
+
+        Args:
+            steps (tuple[StepPlan, ...]): The compiled steps.
+
+        Returns:
+            Step: The first finished step.
+
+        """
+        nodes = [
+            StepNode(
+                step_plan.id,
+                step_plan.data,
+                list(step_plan.needs),
+                cls=step_plan.cls,
+            )
+            for step_plan in steps
+        ]
+        finished = run_step_graph(nodes, self)
+        for prev_step, step in itertools.pairwise(finished):
+            prev_step.next = step
+        return finished[0] if finished else None
+
     def __str__(self) -> str:
         """Return the name of the workflow.
 
@@ -213,9 +290,13 @@ class Workflow:
             IKernelTrigger.pre_run_workflow,
             workflow=self,
         )
-        self.first_step = self._parse_steps(
-            self.raw_data.get("steps", valtype=list[dict[str, object]]),
-        )
+        try:
+            if self.plan.graph:
+                self.first_step = self._run_step_graph(self.plan.steps)
+            else:
+                self.first_step = self._run_steps(self.plan.steps)
+        finally:
+            terminate_background_jobs(self)
         call_ktrigger(
             IKernelTrigger.post_run_workflow,
             workflow=self,
@@ -223,5 +304,6 @@ class Workflow:
 
     def __del__(self) -> None:
         """Pop variables."""
-        for name in self.pushed_variables:
-            pop_variables(name)
+        with enter_scope(self.scope):
+            for name in self.pushed_variables:
+                pop_variables(name)
@@ -38,6 +38,7 @@ from rubisco.lib.archive.tar import compress_tarball, extract_tarball
 from rubisco.lib.archive.zip import compress_zip, extract_zip
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.fileutil import (
+    IgnoreMatcher,
     assert_rel_path,
     check_file_exists,
     rm_recursive,
@@ -374,6 +375,7 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     compress_level: int | None = None,
     *,
     overwrite: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     if compress_type in ["gz", "gzip"]:
         logger.info("Compressing '%s' to '%s' as 'gz' ...", src, dest)
@@ -393,10 +395,18 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             excludes,
             compress_level,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     elif compress_type == "7z":
         logger.info("Compressing '%s' to '%s' as '7z' ...", src, dest)
-        compress_7z(src, dest, start, excludes, overwrite=overwrite)
+        compress_7z(
+            src,
+            dest,
+            start,
+            excludes,
+            overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
+        )
     elif compress_type in ["tar.gz", "tgz"]:
         logger.info("Compressing '%s' to '%s' as 'tar.gz' ...", src, dest)
         compress_tarball(
@@ -407,6 +417,7 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             "gz",
             compress_level,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     elif compress_type in ["tar.bz2", "tbz2"]:
         logger.info("Compressing '%s' to '%s' as 'tar.bz2' ...", src, dest)
@@ -418,6 +429,7 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             "bz2",
             compress_level,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     elif compress_type in ["tar.xz", "txz"]:
         logger.info("Compressing '%s' to '%s' as 'tar.xz' ...", src, dest)
@@ -429,6 +441,7 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             "xz",
             compress_level,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     elif compress_type == "tar":
         logger.info("Compressing '%s' to '%s' as 'tar' ...", src, dest)
@@ -440,6 +453,7 @@ def _compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             None,
             None,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     else:
         raise UnsupportedArchiveTypeError
@@ -455,6 +469,7 @@ def compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     *,
     overwrite: bool = False,
     allow_absolute_dest: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     """Compress a file or directory to destination.
 
@@ -474,6 +489,8 @@ def compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             Defaults to False.
         allow_absolute_dest (bool, optional): Allow absolute destination path.
             Defaults to False.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            files of the directory. Defaults to None.
 
     """
     compress_type = compress_type.lower().strip() if compress_type else None
@@ -506,6 +523,7 @@ def compress(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             compress_type,
             compress_level,
             overwrite=overwrite,
+            ignore_matcher=ignore_matcher,
         )
     except UnsupportedArchiveTypeError:
         logger.error(
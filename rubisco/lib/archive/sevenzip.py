@@ -26,7 +26,11 @@ import py7zr
 import py7zr.callbacks
 
 from rubisco.lib.archive.utils import get_includes, write_to_archive
-from rubisco.lib.fileutil import check_file_exists, rm_recursive
+from rubisco.lib.fileutil import (
+    IgnoreMatcher,
+    check_file_exists,
+    rm_recursive,
+)
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.lib.variable.utils import make_pretty
@@ -169,13 +173,14 @@ def extract_7z(
                 fp.reporterd.join(0.01)  # type: ignore[attr-defined]
 
 
-def compress_7z(  # pylint: disable=too-many-arguments
+def compress_7z(  # pylint: disable=too-many-arguments # noqa: PLR0913
     src: Path,
     dest: Path,
     start: Path | None = None,
     excludes: list[str] | None = None,
     *,
     overwrite: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     """Compress a 7z file to destination.
 
@@ -187,6 +192,8 @@ def compress_7z(  # pylint: disable=too-many-arguments
             Supports glob patterns. Defaults to None.
         overwrite (bool, optional): Overwrite destination if it exists.
             Defaults to False.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            files. Defaults to None.
 
     """
     if not overwrite:
@@ -212,7 +219,11 @@ def compress_7z(  # pylint: disable=too-many-arguments
         dest,
         mode="w",
     ) as fp:
-        includes = get_includes(src, excludes)
+        includes = get_includes(
+            src,
+            excludes,
+            ignore_matcher=ignore_matcher,
+        )
 
         write_to_archive(
             includes,
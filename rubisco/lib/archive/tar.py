@@ -24,7 +24,11 @@ from pathlib import Path
 from typing import Literal, cast
 
 from rubisco.lib.archive.utils import get_includes, write_to_archive
-from rubisco.lib.fileutil import check_file_exists, rm_recursive
+from rubisco.lib.fileutil import (
+    IgnoreMatcher,
+    check_file_exists,
+    rm_recursive,
+)
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.lib.variable.utils import make_pretty
@@ -118,6 +122,7 @@ def compress_tarball(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     compress_level: int | None = None,
     *,
     overwrite: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     """Compress a tarball to destination.
 
@@ -143,6 +148,8 @@ def compress_tarball(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             others.
         overwrite (bool, optional): Overwrite destination if it exists.
             Defaults to False.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            files. Defaults to None.
 
     """
     compress_type = compress_type.lower().strip() if compress_type else None
@@ -175,7 +182,11 @@ def compress_tarball(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     if not start:
         start = src.parent
 
-    includes = get_includes(src, excludes)
+    includes = get_includes(
+        src,
+        excludes,
+        ignore_matcher=ignore_matcher,
+    )
 
     if compress_type in {"gz", "bz2"}:
         compress_level = compress_level if compress_level else 9
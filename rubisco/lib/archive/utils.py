@@ -20,10 +20,11 @@
 """Utilities for archive."""
 
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
 from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.fileutil import IgnoreMatcher
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.lib.variable.utils import make_pretty
@@ -35,6 +36,8 @@ __all__ = ["get_includes", "write_to_archive"]
 def get_includes(
     src: Path,
     excludes: list[str] | None = None,
+    *,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> list[Path]:
     """Get included files list with includes and excludes.
 
@@ -42,12 +45,23 @@ def get_includes(
         src (Path): Source file or directory.
         excludes (list[str] | None, optional): List of excluded files.
             Defaults to None.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            files, and don't walk into the ignored directories. Defaults to
+            None.
 
     Returns:
         list[Path]: Included files list.
 
     """
-    _includes = src.rglob("*") if src.is_dir() else [src]
+    _includes: Iterable[Path]
+    if ignore_matcher is not None and ignore_matcher.match(src):
+        _includes = []
+    elif not src.is_dir():
+        _includes = [src]
+    elif ignore_matcher is not None:
+        _includes = ignore_matcher.walk(src)
+    else:
+        _includes = src.rglob("*")
     includes: list[Path] = []
     for path in _includes:
         if excludes and any(path.match(ex) for ex in excludes):
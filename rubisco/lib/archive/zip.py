@@ -26,7 +26,11 @@ from pathlib import Path
 
 from rubisco.config import DEFAULT_CHARSET
 from rubisco.lib.archive.utils import get_includes, write_to_archive
-from rubisco.lib.fileutil import check_file_exists, rm_recursive
+from rubisco.lib.fileutil import (
+    IgnoreMatcher,
+    check_file_exists,
+    rm_recursive,
+)
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.fast_format_str import fast_format_str
 from rubisco.lib.variable.utils import make_pretty
@@ -109,6 +113,7 @@ def compress_zip(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     compress_level: int | None = None,
     *,
     overwrite: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     """Compress a zip file to destination.
 
@@ -123,6 +128,8 @@ def compress_zip(  # pylint: disable=R0913, R0917 # noqa: PLR0913
             others.
         overwrite (bool, optional): Overwrite destination if it exists.
             Defaults to False.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            files. Defaults to None.
 
     """
     if not overwrite:
@@ -149,7 +156,11 @@ def compress_zip(  # pylint: disable=R0913, R0917 # noqa: PLR0913
         zipfile.ZIP_DEFLATED,
         compresslevel=compress_level,
     ) as fp:
-        includes = get_includes(src, excludes)
+        includes = get_includes(
+            src,
+            excludes,
+            ignore_matcher=ignore_matcher,
+        )
 
         write_to_archive(
             includes,
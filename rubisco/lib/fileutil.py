@@ -24,9 +24,11 @@ from __future__ import annotations
 import atexit
 import fnmatch
 import os
+import re
 import shutil
 import sys
 import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Self
 
@@ -43,10 +45,14 @@ from rubisco.lib.variable.utils import make_pretty
 from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Collection, Generator
     from types import FunctionType, TracebackType
 
+    from rubisco.lib.pathglob import FileEntry
+
 __all__ = [
+    "IGNORE_FILES",
+    "IgnoreMatcher",
     "TemporaryObject",
     "check_file_exists",
     "copy_recursive",
@@ -96,16 +102,348 @@ def assert_rel_path(path: Path) -> None:
         )
 
 
+IGNORE_FILES = (".gitignore", ".rubiscoignore")
+
+
+@dataclass(frozen=True)
+class _IgnoreGroup:
+    """Adjacent ignore rules with the same effect, joined to one regex."""
+
+    sources: tuple[str, ...]
+    regex: re.Pattern[str]
+    negate: bool
+    dironly: bool
+
+
+def _translate_ignore_name(name: str) -> str:
+    res: list[str] = []
+    idx = 0
+    while idx < len(name):
+        char = name[idx]
+        idx += 1
+        if char == "*":
+            res.append("[^/]*")
+        elif char == "?":
+            res.append("[^/]")
+        elif char == "\\" and idx < len(name):
+            res.append(re.escape(name[idx]))
+            idx += 1
+        elif char == "[":
+            end = idx + 1 if name.startswith(("!", "^"), idx) else idx
+            end = name.find("]", end + 1)
+            if end < 0:
+                res.append(re.escape(char))
+                continue
+            content = name[idx:end].replace("\\", "\\\\")
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            res.append(f"[{content}]")
+            idx = end + 1
+        else:
+            res.append(re.escape(char))
+    return "".join(res)
+
+
+def _translate_ignore_line(line: str) -> tuple[str, bool, bool] | None:
+    """Translate a line of ignore file to (regex, negate, dironly)."""
+    line = line.rstrip("\r\n")
+    pattern = line.rstrip(" ")
+    if pattern.endswith("\\") and len(pattern) < len(line):
+        pattern += " "
+    if not pattern or pattern.startswith("#"):
+        return None
+    negate = pattern.startswith("!")
+    if negate or pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+    dironly = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    # A pattern with a separator is relative to the ignore file. Otherwise,
+    # it matches the names at any level.
+    anchored = "/" in pattern
+    names = pattern.lstrip("/").split("/")
+    res = "" if anchored else "(?:.*/)?"
+    for idx, name in enumerate(names):
+        last = idx == len(names) - 1
+        if name == "**":
+            res += ".*" if last else "(?:.*/)?"
+        else:
+            res += _translate_ignore_name(name) + ("" if last else "/")
+    return res, negate, dironly
+
+
+class IgnoreMatcher:
+    """Match paths with the ignore files in the directories.
+
+    The ignore files (`.gitignore` and `.rubiscoignore`) use the syntax of
+    gitignore. Like git, a rule applies to the paths under the directory of
+    its ignore file, the later rule and the deeper ignore file win, the paths
+    in an ignored directory are always ignored, and `.git` is always ignored.
+
+    The ignore files are read lazily, when a path in their directories is
+    matched. Paths not in the root directory are never ignored.
+    """
+
+    root: Path
+    files: tuple[str, ...]
+    _root_prefix: str
+    _rules: dict[str, tuple[_IgnoreGroup, ...]]
+    _ignored_dirs: dict[str, bool]
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        files: tuple[str, ...] = IGNORE_FILES,
+    ) -> None:
+        """Initialize the matcher.
+
+        Args:
+            root (Path | None, optional): The top directory whose ignore
+                files are read. Defaults to the current directory.
+            files (tuple[str, ...], optional): The names of the ignore files.
+                Defaults to IGNORE_FILES.
+
+        """
+        self.root = (root or Path.cwd()).absolute()
+        self.files = files
+        self._root_prefix = os.path.join(os.path.normpath(self.root), "")  # noqa: PTH118
+        self._rules = {"": self._read_rules("", ())}
+        self._ignored_dirs = {"": False}
+
+    def _relative(self, path: str | os.PathLike[str]) -> str | None:
+        abspath = os.path.abspath(path)  # noqa: PTH100
+        if not abspath.startswith(self._root_prefix):
+            return None
+        rel = abspath[len(self._root_prefix) :]
+        return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+    def _read_rules(
+        self,
+        rel_dir: str,
+        parent_rules: tuple[_IgnoreGroup, ...],
+    ) -> tuple[_IgnoreGroup, ...]:
+        base = re.escape(f"{rel_dir}/") if rel_dir else ""
+        rules = list(parent_rules)
+        for name in self.files:
+            try:
+                text = (self.root / rel_dir / name).read_text(
+                    encoding="utf-8",
+                    errors="replace",
+                )
+            except OSError:
+                continue
+            for line in text.splitlines():
+                rule = _translate_ignore_line(line)
+                if rule is None:
+                    continue
+                regex, negate, dironly = rule
+                last = rules[-1] if rules else None
+                if last and (last.negate, last.dironly) == (negate, dironly):
+                    sources = (*last.sources, base + regex)
+                    rules.pop()
+                else:
+                    sources = (base + regex,)
+                rules.append(
+                    _IgnoreGroup(
+                        sources,
+                        re.compile(f"(?s:{'|'.join(sources)})\\Z"),
+                        negate,
+                        dironly,
+                    ),
+                )
+        return tuple(rules)
+
+    def _get_rules(self, rel_dir: str) -> tuple[_IgnoreGroup, ...]:
+        rules = self._rules.get(rel_dir)
+        if rules is None:
+            parent = rel_dir.rpartition("/")[0]
+            rules = self._read_rules(rel_dir, self._get_rules(parent))
+            self._rules[rel_dir] = rules
+        return rules
+
+    def _is_ignored_dir(self, rel_dir: str) -> bool:
+        ignored = self._ignored_dirs.get(rel_dir)
+        if ignored is None:
+            parent = rel_dir.rpartition("/")[0]
+            ignored = self._is_ignored_dir(parent) or self._match(
+                rel_dir,
+                parent,
+                is_dir=True,
+            )
+            self._ignored_dirs[rel_dir] = ignored
+        return ignored
+
+    def _match(self, rel: str, parent: str, *, is_dir: bool | None) -> bool:
+        if rel == ".git" or rel.endswith("/.git"):
+            return True
+        for group in reversed(self._get_rules(parent)):
+            if group.dironly:
+                if is_dir is None:
+                    is_dir = (self.root / rel).is_dir()
+                if not is_dir:
+                    continue
+            if group.regex.match(rel):
+                return not group.negate
+        return False
+
+    def match(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        is_dir: bool | None = None,
+    ) -> bool:
+        """Check if the path is ignored.
+
+        Args:
+            path (str | os.PathLike[str]): The path.
+            is_dir (bool | None, optional): The path is a directory. It's
+                checked only if it's needed. Defaults to None.
+
+        Returns:
+            bool: True if the path is ignored.
+
+        """
+        rel = self._relative(path)
+        if not rel:
+            return False
+        parent = rel.rpartition("/")[0]
+        if self._is_ignored_dir(parent):
+            return True
+        if is_dir:
+            return self._is_ignored_dir(rel)
+        return self._match(rel, parent, is_dir=is_dir)
+
+    def match_entry(self, entry: FileEntry) -> bool:
+        """Check if the directory entry is ignored.
+
+        Args:
+            entry (FileEntry): The entry.
+
+        Returns:
+            bool: True if the entry is ignored.
+
+        """
+        return self.match(
+            entry.path,
+            is_dir=entry.is_dir(follow_symlinks=False),
+        )
+
+    def walk(self, top: Path) -> Generator[Path]:
+        """Yield the paths in a directory which are not ignored.
+
+        Ignored directories are not walked into. Symlinks to directories are
+        yielded but not walked into.
+
+        Args:
+            top (Path): The directory.
+
+        Yields:
+            Path: The paths, parents before their children.
+
+        """
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [
+                name
+                for name in dirnames
+                if not self.match(os.path.join(dirpath, name), is_dir=True)  # noqa: PTH118
+            ]
+            for name in dirnames:
+                yield Path(dirpath, name)
+            for name in filenames:
+                path = os.path.join(dirpath, name)  # noqa: PTH118
+                if not self.match(path, is_dir=False):
+                    yield Path(path)
+
+    def filter_names(self, directory: str, names: list[str]) -> set[str]:
+        """Get the ignored names in a directory. For `shutil.copytree`.
+
+        Args:
+            directory (str): The directory.
+            names (list[str]): The names in the directory.
+
+        Returns:
+            set[str]: The ignored names.
+
+        """
+        return {
+            name
+            for name in names
+            if self.match(os.path.join(directory, name))  # noqa: PTH118
+        }
+
+
+def _rm_not_kept(
+    path: Path,
+    keep: Callable[[Path, bool], bool],
+    *,
+    is_dir: bool | None = None,
+) -> bool:
+    """Remove the path if it's not kept, keep the kept children.
+
+    Returns:
+        bool: True if the path is removed.
+
+    """
+    if is_dir is None:
+        is_dir = path.is_dir() and not path.is_symlink()
+    if keep(path, is_dir):
+        return False
+    if not is_dir:
+        path.unlink()
+        return True
+
+    kept = False
+    with os.scandir(path) as it:
+        entries = list(it)
+    for entry in entries:
+        if not _rm_not_kept(
+            Path(entry.path),
+            keep,
+            is_dir=entry.is_dir(follow_symlinks=False),
+        ):
+            kept = True
+    if not kept:
+        path.rmdir()
+    return not kept
+
+
+def _get_keep(
+    ignore_matcher: IgnoreMatcher | None,
+    keep_paths: Collection[Path],
+) -> Callable[[Path, bool], bool] | None:
+    kept = {os.path.normpath(path.absolute()) for path in keep_paths}
+    if ignore_matcher is None and not kept:
+        return None
+
+    def _keep(path: Path, is_dir: bool) -> bool:  # noqa: FBT001
+        if kept and os.path.normpath(path) in kept:
+            return True
+        return ignore_matcher is not None and ignore_matcher.match(
+            path,
+            is_dir=is_dir,
+        )
+
+    return _keep
+
+
 def rm_recursive(
     path: Path,
     *,
     strict: bool = True,
+    ignore_matcher: IgnoreMatcher | None = None,
+    keep_paths: Collection[Path] = (),
 ) -> None:
     """Remove a file or directory recursively.
 
     Args:
         path (Path): The path to remove.
         strict (bool): Raise an exception if error occurs.
+        ignore_matcher (IgnoreMatcher | None, optional): Keep the ignored
+            paths, and the directories containing them. Defaults to None.
+        keep_paths (Collection[Path], optional): Keep these paths, and the
+            directories containing them. Defaults to ().
 
     Raises:
         OSError: If strict is True and an error occurs.
@@ -142,8 +480,11 @@ def rm_recursive(
     ) -> None:
         return _onexc(func, path, exc_info[1])
 
+    keep = _get_keep(ignore_matcher, keep_paths)
     try:
-        if path.is_dir() and not path.is_symlink():
+        if keep is not None:
+            _rm_not_kept(path, keep)
+        elif path.is_dir() and not path.is_symlink():
             if sys.version_info < (3, 13):
                 shutil.rmtree(  # pylint: disable=deprecated-argument
                     path,
@@ -173,6 +514,7 @@ def _match_path_only(pattern: str) -> bool:
 def _ignore_patterns(
     patterns: list[str],
     start_dir: Path,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> Callable[[str, list[str]], set[str]]:
     """Return the function that can be used as `copytree()` ignore parameter.
 
@@ -193,6 +535,8 @@ def _ignore_patterns(
                 ignored_names.extend([Path(i).name for i in res])
             else:
                 ignored_names.extend(fnmatch.filter(strnames, pattern))
+        if ignore_matcher is not None:
+            ignored_names.extend(ignore_matcher.filter_names(strpath, strnames))
         return set(ignored_names)
 
     return __ignore_patterns
@@ -206,6 +550,7 @@ def copy_recursive(  # pylint: disable=R0913, R0917 # noqa: PLR0913
     strict: bool = False,
     symlinks: bool = False,
     exists_ok: bool = False,
+    ignore_matcher: IgnoreMatcher | None = None,
 ) -> None:
     """Copy a file or directory recursively.
 
@@ -216,6 +561,8 @@ def copy_recursive(  # pylint: disable=R0913, R0917 # noqa: PLR0913
         ignore (list[str] | None): The list of files to ignore.
         symlinks (bool): Copy symlinks as symlinks.
         exists_ok (bool): Do not raise an exception if the destination exists.
+        ignore_matcher (IgnoreMatcher | None, optional): Skip the ignored
+            paths. Defaults to None.
 
     Raises:
         OSError: If strict is True and an error occurs.
@@ -226,6 +573,8 @@ def copy_recursive(  # pylint: disable=R0913, R0917 # noqa: PLR0913
 
     src = src.absolute()
     dst = dst.absolute()
+    if ignore_matcher is not None and ignore_matcher.match(src):
+        return
     try:
         if src.is_dir():
             shutil.copytree(
@@ -233,7 +582,7 @@ def copy_recursive(  # pylint: disable=R0913, R0917 # noqa: PLR0913
                 dst,
                 symlinks=symlinks,
                 dirs_exist_ok=exists_ok,
-                ignore=_ignore_patterns(ignore, src),
+                ignore=_ignore_patterns(ignore, src, ignore_matcher),
             )
         else:
             if dst.is_dir():
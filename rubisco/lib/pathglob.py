@@ -0,0 +1,721 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Glob many patterns with a single directory walk.
+
+`glob.glob` walks the tree once per pattern. Here, all the include and
+exclude patterns are split into per-component matchers, and the tree is
+walked once with `os.scandir`, tracking the position in every pattern at the
+same time. Literal components are looked up with `lstat` instead of listing
+their parent directory.
+
+The pattern syntax is the same as `glob.glob`.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import stat
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+__all__ = ["FileEntry", "PathEntry", "glob_files"]
+
+
+class FileEntry(Protocol):
+    """The interface of `os.DirEntry` used by the glob callbacks."""
+
+    @property
+    def name(self) -> str:
+        """The base name of the entry."""
+        ...
+
+    @property
+    def path(self) -> str:
+        """The path of the entry."""
+        ...
+
+    def is_symlink(self) -> bool:
+        """Check if the entry is a symlink."""
+        ...
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        """Check if the entry is a directory."""
+        ...
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        """Check if the entry is a regular file."""
+        ...
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        """Get the stat result of the entry."""
+        ...
+
+
+class PathEntry:
+    """A `FileEntry` of a path which is not listed by `os.scandir`.
+
+    Like `os.DirEntry` on Windows, it calls `lstat` at most once, and
+    `stat` only for symlinks.
+    """
+
+    name: str
+    path: str
+    _lstat: os.stat_result | None
+    _stat: os.stat_result | None
+
+    def __init__(self, path: str, lstat: os.stat_result | None = None) -> None:
+        """Initialize the entry.
+
+        Args:
+            path (str): The path.
+            lstat (os.stat_result | None, optional): The known `lstat`
+                result of the path. Defaults to None.
+
+        """
+        self.path = path
+        self.name = os.path.basename(path)  # noqa: PTH119
+        self._lstat = lstat
+        self._stat = None
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        """Get the stat result of the entry.
+
+        Args:
+            follow_symlinks (bool, optional): Follow symlinks. Defaults to
+                True.
+
+        Returns:
+            os.stat_result: The stat result.
+
+        Raises:
+            OSError: If the file is not found.
+
+        """
+        if self._lstat is None:
+            self._lstat = os.lstat(self.path)
+        if not follow_symlinks or not stat.S_ISLNK(self._lstat.st_mode):
+            return self._lstat
+        if self._stat is None:
+            self._stat = os.stat(self.path)  # noqa: PTH116
+        return self._stat
+
+    def _test_mode(
+        self,
+        test: Callable[[int], bool],
+        *,
+        follow_symlinks: bool,
+    ) -> bool:
+        try:
+            return test(self.stat(follow_symlinks=follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        """Check if the entry is a symlink.
+
+        Returns:
+            bool: True if it's a symlink.
+
+        """
+        return self._test_mode(stat.S_ISLNK, follow_symlinks=False)
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        """Check if the entry is a directory.
+
+        Args:
+            follow_symlinks (bool, optional): Follow symlinks. Defaults to
+                True.
+
+        Returns:
+            bool: True if it's a directory.
+
+        """
+        return self._test_mode(stat.S_ISDIR, follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        """Check if the entry is a regular file.
+
+        Args:
+            follow_symlinks (bool, optional): Follow symlinks. Defaults to
+                True.
+
+        Returns:
+            bool: True if it's a regular file.
+
+        """
+        return self._test_mode(stat.S_ISREG, follow_symlinks=follow_symlinks)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the entry.
+
+        Returns:
+            str: The string representation.
+
+        """
+        return f"<PathEntry {self.path!r}>"
+
+
+_LITERAL = 0
+_WILDCARD = 1
+_RECURSIVE = 2
+
+_IGNORE_CASE = os.path.normcase("A") != "A"
+_MAGIC = re.compile(r"[*?[]")
+
+
+@dataclass(eq=False)
+class _Part:
+    """A component of a pattern."""
+
+    kind: int
+    # The literal name.
+    name: str = ""
+    match: Callable[[str], re.Match[str] | None] | None = None
+    # Match the names starting with ".".
+    hidden: bool = True
+
+
+@dataclass(eq=False)
+class _Pattern:
+    """A compiled pattern."""
+
+    parts: tuple[_Part, ...]
+    # The index of the include pattern. -1 for the exclude patterns.
+    index: int
+    # The pattern ends with a separator.
+    dironly: bool
+    # The index of the last ".." part. -1 if there is none.
+    parent: int = -1
+
+
+# (pattern, the index of the next part to match)
+_State = tuple[_Pattern, int]
+
+
+@dataclass(eq=False)
+class _Node:  # pylint: disable=R0902
+    """A set of states, after following the zero-length `**` matches."""
+
+    # Normalized literal name -> (literal name, states).
+    literals: dict[str, tuple[str, list[_State]]] = field(
+        default_factory=dict,
+    )
+    # The states of wildcard and `**` parts. They need a directory listing.
+    scanners: list[_State] = field(default_factory=list)
+    # The min index of the matched include patterns.
+    include: int | None = None
+    # Same as `include`, but the patterns only match directories.
+    include_dir: int | None = None
+    exclude: bool = False
+    exclude_dir: bool = False
+    # Every descendant is excluded. Don't walk into it.
+    prune: bool = False
+    # A wildcard or `**` state can walk out of the directory by "..".
+    escape: bool = False
+    recursive: bool = False
+
+
+def _normcase(name: str) -> str:
+    return os.path.normcase(name) if _IGNORE_CASE else name
+
+
+def _compile_part(
+    name: str,
+    *,
+    recursive: bool,
+    include_hidden: bool,
+) -> _Part:
+    if recursive and name == "**":
+        return _Part(_RECURSIVE, hidden=include_hidden)
+    if _MAGIC.search(name) is None:
+        return _Part(_LITERAL, name)
+    return _Part(
+        _WILDCARD,
+        match=re.compile(fnmatch.translate(_normcase(name))).match,
+        hidden=include_hidden or name.startswith("."),
+    )
+
+
+def _split_pattern(pattern: str) -> tuple[str, list[str], bool]:
+    """Split the pattern to its anchor, components and the trailing sep."""
+    seps = os.sep + (os.altsep or "")
+    drive, rest = os.path.splitdrive(pattern)
+    stripped = rest.lstrip(seps)
+    anchor = drive + rest[: len(rest) - len(stripped)]
+    if os.altsep:
+        stripped = stripped.replace(os.altsep, os.sep)
+    names = [
+        name
+        for name in stripped.split(os.sep)  # noqa: PTH206
+        if name not in {"", "."}
+    ]
+    return anchor, names, bool(names) and stripped.endswith(os.sep)
+
+
+def _last_parent(names: list[str]) -> int:
+    for idx in range(len(names) - 1, -1, -1):
+        if names[idx] == "..":
+            return idx
+    return -1
+
+
+def _can_escape(state: _State) -> bool:
+    """Check if an include state can walk out of the directory by ".."."""
+    pattern, idx = state
+    return pattern.index >= 0 and pattern.parent >= idx
+
+
+def _is_hidden(name: str) -> bool:
+    return name.startswith(".") and name != ".."
+
+
+class _CompiledPatterns:
+    """The patterns grouped by their anchor directories."""
+
+    root: str
+    recursive: bool
+    include_hidden: bool
+    anchors: dict[str, list[_Pattern]]
+    # The patterns matching their anchors, like "." or "/".
+    anchor_includes: dict[str, int]
+    anchor_excludes: set[str]
+    # An include pattern can match hidden files.
+    match_hidden: bool
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        recursive: bool,
+        include_hidden: bool,
+    ) -> None:
+        self.root = root
+        self.recursive = recursive
+        self.include_hidden = include_hidden
+        self.anchors = {}
+        self.anchor_includes = {}
+        self.anchor_excludes = set()
+        self.match_hidden = False
+
+    def add(self, pattern: str, index: int) -> None:
+        """Add a pattern.
+
+        Args:
+            pattern (str): The pattern.
+            index (int): The index of the include pattern. -1 for the
+                exclude patterns.
+
+        """
+        if not pattern:
+            return
+        anchor, names, dironly = _split_pattern(pattern)
+        base = str(Path(anchor).absolute()) if anchor else self.root
+        if not names:
+            if index < 0:
+                self.anchor_excludes.add(base)
+            else:
+                self.anchor_includes.setdefault(base, index)
+            return
+        parts = tuple(
+            _compile_part(
+                name,
+                recursive=self.recursive,
+                include_hidden=self.include_hidden,
+            )
+            for name in names
+        )
+        if index >= 0 and any(
+            part.hidden if part.kind != _LITERAL else _is_hidden(part.name)
+            for part in parts
+        ):
+            self.match_hidden = True
+        self.anchors.setdefault(base, []).append(
+            _Pattern(parts, index, dironly, _last_parent(names)),
+        )
+
+
+class _Globber:
+    """Walk the directories and collect the matched paths."""
+
+    # Skip the directories whose descendants are all excluded.
+    prune: bool
+    accept: Callable[[FileEntry], bool] | None
+    skip: Callable[[FileEntry], bool] | None
+    results: list[list[str]]
+    _nodes: dict[frozenset[_State], _Node]
+    # The symlinked directories walked by `**`. To avoid infinite loops.
+    _visited: set[tuple[int, int]]
+
+    def __init__(
+        self,
+        count: int,
+        *,
+        prune: bool,
+        accept: Callable[[FileEntry], bool] | None,
+        skip: Callable[[FileEntry], bool] | None,
+    ) -> None:
+        self.prune = prune
+        self.accept = accept
+        self.skip = skip
+        self.results = [[] for _ in range(count)]
+        self._nodes = {}
+        self._visited = set()
+
+    def get_node(self, states: Iterable[_State]) -> _Node | None:
+        key = frozenset(states)
+        if not key:
+            return None
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._build_node(key)
+            self._nodes[key] = node
+        return node
+
+    def _build_node(self, states: frozenset[_State]) -> _Node:
+        closure, dir_matches = _follow_recursive(states)
+        node = _Node()
+        for pattern in dir_matches:
+            self._add_match(node, pattern, dironly=True)
+        for pattern, idx in closure:
+            if idx == len(pattern.parts):
+                self._add_match(node, pattern)
+                continue
+            part = pattern.parts[idx]
+            if part.kind == _LITERAL:
+                key = _normcase(part.name)
+                node.literals.setdefault(key, (part.name, []))[1].append(
+                    (pattern, idx),
+                )
+                continue
+            node.scanners.append((pattern, idx))
+            if _can_escape((pattern, idx)):
+                node.escape = True
+            if part.kind == _RECURSIVE:
+                node.recursive = True
+                if (
+                    pattern.index < 0
+                    and not pattern.dironly
+                    and idx == len(pattern.parts) - 1
+                    and self.prune
+                ):
+                    node.prune = True
+        return node
+
+    @staticmethod
+    def _add_match(
+        node: _Node,
+        pattern: _Pattern,
+        *,
+        dironly: bool = False,
+    ) -> None:
+        dironly = dironly or pattern.dironly
+        if pattern.index < 0:
+            if dironly:
+                node.exclude_dir = True
+            else:
+                node.exclude = True
+        elif dironly:
+            if node.include_dir is None or pattern.index < node.include_dir:
+                node.include_dir = pattern.index
+        elif node.include is None or pattern.index < node.include:
+            node.include = pattern.index
+
+    def walk(self, prefix: str, node: _Node) -> None:
+        """Match the children of a directory.
+
+        Args:
+            prefix (str): The path of the directory, ends with a separator.
+            node (_Node): The states of the directory.
+
+        """
+        if (node.prune and not node.escape) or not node.scanners:
+            self._lookup_literals(prefix, node)
+            return
+
+        try:
+            with os.scandir(prefix) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        literals = node.literals
+        found: set[str] = set()
+        for entry in entries:
+            name = entry.name
+            key = _normcase(name)
+            nexts = _match_name(node.scanners, name, key)
+            if literals:
+                literal = literals.get(key)
+                if literal is not None:
+                    found.add(key)
+                    nexts.extend(
+                        (pattern, idx + 1) for pattern, idx in literal[1]
+                    )
+            child = self.get_node(nexts)
+            if child is not None:
+                self.visit(entry, prefix + name, child)
+
+        # "..", or a name in another case on case-insensitive filesystems.
+        for key, (name, states) in literals.items():
+            if key not in found:
+                self._lookup(prefix, name, states)
+
+    def _lookup_literals(self, prefix: str, node: _Node) -> None:
+        for key, (name, states) in node.literals.items():
+            # ".." is the only way out of the excluded directory.
+            if not node.prune or any(_can_escape(state) for state in states):
+                # The excluded `**` still matches the other names.
+                nexts = []
+                if name != "..":
+                    nexts = _match_name(node.scanners, name, key)
+                self._lookup(prefix, name, states, nexts)
+
+    def _lookup(
+        self,
+        prefix: str,
+        name: str,
+        states: list[_State],
+        nexts: list[_State] | None = None,
+    ) -> None:
+        path = prefix + name
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return
+        nexts = nexts or []
+        nexts.extend((pattern, idx + 1) for pattern, idx in states)
+        child = self.get_node(nexts)
+        if child is not None:
+            self.visit(PathEntry(path, st), path, child)
+
+    def visit(self, entry: FileEntry, path: str, node: _Node) -> None:
+        """Collect the entry if it's matched, then walk into it.
+
+        Args:
+            entry (FileEntry): The entry.
+            path (str): The path of the entry.
+            node (_Node): The states of the entry.
+
+        """
+        if self.skip is not None and self.skip(entry):
+            return
+        index = node.include
+        if (
+            node.include_dir is not None
+            and (index is None or node.include_dir < index)
+            and _is_dir(entry)
+        ):
+            index = node.include_dir
+        if (
+            index is not None
+            and not node.exclude
+            and not (node.exclude_dir and _is_dir(entry))
+            and (self.accept is None or self.accept(entry))
+        ):
+            self.results[index].append(path)
+
+        if not (node.scanners or node.literals):
+            return
+        if not _is_dir(entry):
+            return
+        if node.recursive and entry.is_symlink():
+            try:
+                st = entry.stat()
+            except OSError:
+                return
+            key = (st.st_dev, st.st_ino)
+            if key in self._visited:
+                return
+            self._visited.add(key)
+        self.walk(path + os.sep, node)
+
+    def get_paths(self) -> list[Path]:
+        """Get the matched paths, ordered by the patterns.
+
+        Returns:
+            list[Path]: The paths.
+
+        """
+        res: list[Path] = []
+        seen: set[str] = set()
+        for paths in self.results:
+            for path in paths:
+                if path not in seen:
+                    seen.add(path)
+                    res.append(Path(path))
+        return res
+
+
+def _follow_recursive(
+    states: Iterable[_State],
+) -> tuple[set[_State], list[_Pattern]]:
+    """Follow the zero-length `**` matches.
+
+    Args:
+        states (Iterable[_State]): The states.
+
+    Returns:
+        tuple[set[_State], list[_Pattern]]: The states, and the patterns
+            fully matched by a trailing `**` matching zero directories.
+            Like `glob.glob`, they only match the directories.
+
+    """
+    closure: set[_State] = set()
+    dir_matches: list[_Pattern] = []
+    stack = list(states)
+    while stack:
+        state = stack.pop()
+        if state in closure:
+            continue
+        closure.add(state)
+        pattern, idx = state
+        if idx < len(pattern.parts) and pattern.parts[idx].kind == _RECURSIVE:
+            if idx + 1 < len(pattern.parts):
+                stack.append((pattern, idx + 1))
+            else:
+                dir_matches.append(pattern)
+    return closure, dir_matches
+
+
+def _match_name(scanners: list[_State], name: str, key: str) -> list[_State]:
+    hidden = name.startswith(".")
+    nexts: list[_State] = []
+    for state in scanners:
+        pattern, idx = state
+        part = pattern.parts[idx]
+        if hidden and not part.hidden:
+            continue
+        if part.kind == _RECURSIVE:
+            nexts.append(state)
+            if idx + 1 == len(pattern.parts):
+                # A trailing `**` matches any files.
+                nexts.append((pattern, idx + 1))
+        elif part.match(key):  # type: ignore[misc]
+            nexts.append((pattern, idx + 1))
+    return nexts
+
+
+def _is_dir(entry: FileEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def glob_files(  # pylint: disable=R0913 # noqa: PLR0913
+    patterns: Iterable[str],
+    excludes: Iterable[str] = (),
+    *,
+    root_dir: str | os.PathLike[str] | None = None,
+    recursive: bool = False,
+    include_hidden: bool = False,
+    accept: Callable[[FileEntry], bool] | None = None,
+    skip: Callable[[FileEntry], bool] | None = None,
+) -> list[Path]:
+    """Glob the paths matched by any pattern and not matched by excludes.
+
+    The tree is walked once for all patterns. A path matched by many
+    patterns is returned once, ordered by the first pattern it matches.
+
+    Excludes with ".." are compared with the normalized paths, so
+    "../root/*" excludes "root/a" when the root is "root". They are
+    matched by another walk.
+
+    Args:
+        patterns (Iterable[str]): The glob patterns.
+        excludes (Iterable[str], optional): The glob patterns of the paths
+            to exclude. Defaults to ().
+        root_dir (str | os.PathLike[str] | None, optional): The directory of
+            the relative patterns. Defaults to the current directory.
+        recursive (bool, optional): `**` matches any files and zero or more
+            directories. Defaults to False.
+        include_hidden (bool, optional): Wildcards match hidden files.
+            Defaults to False.
+        accept (Callable[[FileEntry], bool] | None, optional): Filter the
+            matched entries. Defaults to None.
+        skip (Callable[[FileEntry], bool] | None, optional): Skip the
+            entries before matching them, and don't walk into them.
+            Defaults to None.
+
+    Returns:
+        list[Path]: The absolute paths.
+
+    """
+    patterns = list(patterns)
+    excludes = list(excludes)
+    root = str(Path(root_dir or ".").absolute())
+    compiled = _CompiledPatterns(
+        root,
+        recursive=recursive,
+        include_hidden=include_hidden,
+    )
+    for index, pattern in enumerate(patterns):
+        compiled.add(pattern, index)
+    for pattern in excludes:
+        compiled.add(pattern, -1)
+
+    globber = _Globber(
+        len(patterns),
+        # Excluded `**` doesn't match the hidden files, unless they can't
+        # be matched by the include patterns.
+        prune=include_hidden or not compiled.match_hidden,
+        accept=accept,
+        skip=skip,
+    )
+    for base, index in compiled.anchor_includes.items():
+        if base in compiled.anchor_excludes or not os.path.lexists(base):
+            continue
+        entry = PathEntry(base)
+        if (skip is None or not skip(entry)) and (
+            accept is None or accept(entry)
+        ):
+            globber.results[index].append(base)
+    for base, base_patterns in compiled.anchors.items():
+        node = globber.get_node((pattern, 0) for pattern in base_patterns)
+        if node is not None:
+            prefix = base if base.endswith(os.sep) else base + os.sep
+            globber.walk(prefix, node)
+
+    paths = globber.get_paths()
+    # The paths matched by them are spelled with "..", like "root/../root/a".
+    parent_excludes = [
+        pattern for pattern in excludes if ".." in _split_pattern(pattern)[1]
+    ]
+    if parent_excludes and paths:
+        excluded = {
+            os.path.normpath(path)
+            for path in glob_files(
+                parent_excludes,
+                root_dir=root,
+                recursive=recursive,
+                include_hidden=include_hidden or compiled.match_hidden,
+                skip=skip,
+            )
+        }
+        paths = [
+            path for path in paths if os.path.normpath(path) not in excluded
+        ]
+    return paths
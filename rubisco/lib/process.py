@@ -23,8 +23,9 @@ from __future__ import annotations
 
 import os
 import sys
+from contextlib import suppress
 from pathlib import Path
-from subprocess import PIPE, STDOUT, Popen
+from subprocess import DEVNULL, PIPE, STDOUT, Popen
 
 import psutil
 
@@ -34,7 +35,11 @@ from rubisco.lib.exceptions import RUShellExecutionError
 from rubisco.lib.fileutil import TemporaryObject
 from rubisco.lib.l10n import _
 from rubisco.lib.log import logger
-from rubisco.shared.ktrigger import IKernelTrigger, call_ktrigger
+from rubisco.shared.ktrigger import (
+    IKernelTrigger,
+    call_ktrigger,
+    get_ktrigger_buffer,
+)
 
 __all__ = ["Process", "is_valid_pid"]
 
@@ -57,6 +62,9 @@ class Process:
     Process's stdin/stdout/stderr will be direct to
     parent process's stdin/stdout/stderr. We will allocate a new console for
     non-console application on Windows.
+
+    If the KTriggers are buffered (see `buffer_ktriggers`), the output is
+    captured to the buffer instead, and stdin is not available.
     """
 
     origin_cmd: str  # For UCI's output.
@@ -113,14 +121,18 @@ class Process:
             self.origin_cmd,
         )
         call_ktrigger(IKernelTrigger.pre_exec_process, proc=self)
+        buffer = get_ktrigger_buffer()
         with Popen(  # noqa: S602
             self.cmd,  # The executed command should be output.
             shell=True,  # We are not responsible for security.
             cwd=str(self.cwd),
-            stdin=sys.stdin,
-            stdout=sys.stdout,
-            stderr=sys.stderr,
+            stdin=sys.stdin if buffer is None else DEVNULL,
+            stdout=sys.stdout if buffer is None else PIPE,
+            stderr=sys.stderr if buffer is None else STDOUT,
         ) as self.process:
+            if buffer is not None:
+                output, _stderr = self.process.communicate()
+                buffer.write(output.decode(DEFAULT_CHARSET, errors="replace"))
             ret = self.process.wait()
             raise_exc = ret != 0 and fail_on_error
             call_ktrigger(
@@ -167,19 +179,31 @@ class Process:
         """
         if show_step:
             call_ktrigger(IKernelTrigger.pre_exec_process, proc=self)
+        # Output which is not returned goes to the KTrigger buffer if any.
+        buffer = get_ktrigger_buffer()
         with Popen(  # noqa: S602
             self.cmd,
             shell=True,
             cwd=str(self.cwd),
-            stdin=sys.stdin,
-            stdout=PIPE if stdout else sys.stdout,
+            stdin=sys.stdin if buffer is None else DEVNULL,
+            stdout=PIPE if stdout or buffer is not None else sys.stdout,
             stderr=(
                 PIPE
-                if stderr == 1
+                if stderr == 1 or (stderr == 0 and buffer is not None)
                 else (STDOUT if stderr == 2 else sys.stderr)  # noqa: PLR2004
             ),
         ) as self.process:
+            stdout_bytes, stderr_bytes = self.process.communicate()
             ret = self.process.wait()
+            stdout_data = (stdout_bytes or b"").decode(DEFAULT_CHARSET)
+            stderr_data = (stderr_bytes or b"").decode(DEFAULT_CHARSET)
+            if buffer is not None:
+                if not stdout:
+                    buffer.write(stdout_data)
+                    stdout_data = ""
+                if stderr == 0:
+                    buffer.write(stderr_data)
+                    stderr_data = ""
             raise_exc = ret != 0 and fail_on_error
             if show_step:
                 call_ktrigger(
@@ -193,22 +217,34 @@ class Process:
                     _("Shell execution error."),  # type: ignore[arg-type]
                     retcode=ret,
                 )
-            if stdout and self.process.stdout:
-                stdout_data = self.process.stdout.read()
-                stdout_data = stdout_data.decode(DEFAULT_CHARSET)
-            else:
-                stdout_data = ""
-            if stderr == 1 and self.process.stderr:
-                stderr_data = self.process.stderr.read()
-                stderr_data = stderr_data.decode(DEFAULT_CHARSET)
-            else:
-                stderr_data = ""
             return stdout_data, stderr_data, ret
 
     def terminate(self) -> None:
-        """Terminate the process."""
-        self.process.terminate()
-        self.process.wait()
+        """Terminate the process and its child processes.
+
+        The shell may not exec the command, so the children are terminated
+        too. Do nothing if the process is not started or has exited.
+        """
+        process = getattr(self, "process", None)
+        if process is None or process.poll() is not None:
+            return
+        shell = None
+        children = []
+        with suppress(psutil.NoSuchProcess):
+            shell = psutil.Process(process.pid)
+            # Suspend it first, or it may start a child after we listed
+            # them. The child would keep the output pipe open.
+            shell.suspend()
+            children = shell.children(recursive=True)
+        for child in children:
+            with suppress(psutil.NoSuchProcess):
+                child.terminate()
+        process.terminate()
+        if shell is not None:
+            # The signal is delivered when it's resumed.
+            with suppress(psutil.NoSuchProcess):
+                shell.resume()
+        process.wait()
 
     def __repr__(self) -> str:
         """Return the string representation of the object.
@@ -27,14 +27,23 @@ from rubisco.lib.variable.autoformatdict import AFTypeError, AutoFormatDict
 from rubisco.lib.variable.autoformatlist import AutoFormatList
 from rubisco.lib.variable.builtin_vars import init_builtin_vars
 from rubisco.lib.variable.callbacks import add_undefined_var_callback
-from rubisco.lib.variable.format import format_str
+from rubisco.lib.variable.format import format_many, format_str
+from rubisco.lib.variable.references import (
+    VariableReferences,
+    get_variable_references,
+)
 from rubisco.lib.variable.utils import (
     assert_iter_types,
     iter_assert,
     make_pretty,
 )
 from rubisco.lib.variable.variable import (
+    VariableScope,
+    current_scope,
+    enter_scope,
+    fork_scope,
     get_variable,
+    join_scope,
     pop_variables,
     push_variables,
     variables,
@@ -44,11 +53,19 @@ __all__ = [
     "AFTypeError",
     "AutoFormatDict",
     "AutoFormatList",
+    "VariableReferences",
+    "VariableScope",
     "add_undefined_var_callback",
     "assert_iter_types",
+    "current_scope",
+    "enter_scope",
+    "fork_scope",
+    "format_many",
     "format_str",
     "get_variable",
+    "get_variable_references",
     "iter_assert",
+    "join_scope",
     "make_pretty",
     "pop_variables",
     "push_variables",
@@ -19,16 +19,18 @@
 
 """AutoFormatDict implementation."""
 
+import itertools
 from collections.abc import Generator, Iterator
 from os import PathLike
 from types import GenericAlias, UnionType
-from typing import Any, ClassVar, cast
+from typing import Any, ClassVar, Self, cast
 
 from rubisco.lib.exceptions import RUError
 from rubisco.lib.l10n import _
 from rubisco.lib.variable.autoformatlist import AutoFormatList
 from rubisco.lib.variable.fast_format_str import fast_format_str
-from rubisco.lib.variable.format import format_str
+from rubisco.lib.variable.format import format_str, format_str_memoized
+from rubisco.lib.variable.template_cache import has_template_syntax
 from rubisco.lib.variable.to_autotype import to_autotype
 from rubisco.lib.variable.typecheck import is_instance
 
@@ -39,17 +41,46 @@ class AFTypeError(RUError, TypeError):
     """AutoFormatDict valtype error."""
 
 
+_MISSING = object()
+
+# Insertion positions of the keys. They are only compared in the same dict,
+# so one monotonic counter is shared by all of them.
+_positions = itertools.count()
+
+
+def _is_template_key(key: object) -> bool:
+    return isinstance(key, str) and has_template_syntax(key)
+
+
 class AutoFormatDict(dict[str, Any]):
     """A dictionary that can format value automatically with variables.
 
     We will replace all the elements which are lists or dicts to
     AutoFormatList or AutoFormatDict recursively.
     The elements will be formatted when we get them.
-    Python's built-in list and dict will NEVER appear here.
+    Python's built-in list and dict will NEVER be returned by its methods,
+    including the `orig_*` ones.
+
+    Nested lists and dicts are wrapped when they are read for the first
+    time, so a large document which is only partly read will not be copied
+    entirely. The object we are initialized with is never changed, but the
+    nested lists and dicts which are not read yet are shared with it. So
+    don't change them after that. Reading the raw storage with `dict`'s
+    methods (e.g. `dict.items(afd)`) may also return them.
+
+    Keys without variable syntax are looked up directly. Keys with variable
+    syntax are indexed separately, with the insertion positions of the keys.
+    Formatted keys and values are memoized until a variable they reference is
+    changed.
     """
 
     raise_if_not_found: ClassVar[object] = object()
 
+    # Raw keys which need to be formatted, in insertion order.
+    _template_keys: dict[str, None]
+    # Raw key -> insertion position. Only built if there are template keys.
+    _key_positions: dict[str, int] | None
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
         """Initialize the AutoFormatDict.
 
@@ -59,13 +90,130 @@ class AutoFormatDict(dict[str, Any]):
 
         """
         super().__init__(*args, **kwargs)
-        # Use orig_items to avoid undefined variable error.
-        # Cauclate the variable expression later.
-        for key, value in super().items():
-            # Replace the value with AutoFormatList or AutoFormatDict.
-            self[key] = value
+        # Values are wrapped lazily in `_get_raw`. Only index the keys here.
+        self._template_keys = {
+            key: None for key in self.orig_keys() if _is_template_key(key)
+        }
+        self._key_positions = None
+
+    def orig_get(self, key: str, default: Any = None) -> Any:  # noqa: ANN401
+        """Get the unformatted value of the raw key.
+
+        Args:
+            key (str): The raw key.
+            default (Any): The value to return if the key is not found.
+                Defaults to None.
 
-    orig_get = dict[str, Any].get
+        Returns:
+            Any: The unformatted value.
+
+        """
+        if not dict.__contains__(self, key):
+            return default
+        return self._get_raw(key)
+
+    def _template_key_index(self) -> dict[str, None]:
+        # Unpickling sets items before the instance dict is restored.
+        index = self.__dict__.get("_template_keys")
+        if index is None:
+            index = {k: None for k in self.orig_keys() if _is_template_key(k)}
+            self.__dict__["_template_keys"] = index
+        return index
+
+    def _position_index(self) -> dict[str, int]:
+        index = self.__dict__.get("_key_positions")
+        if index is None:
+            index = {key: next(_positions) for key in self.orig_keys()}
+            self.__dict__["_key_positions"] = index
+        return index
+
+    def _rebuild_position_index(self) -> dict[str, int]:
+        self.__dict__["_key_positions"] = None
+        return self._position_index()
+
+    def _forget_key(self, key: object) -> None:
+        self._template_key_index().pop(cast("str", key), None)
+        positions = self.__dict__.get("_key_positions")
+        if positions is not None:
+            positions.pop(cast("str", key), None)
+
+    def _get_raw(self, raw_key: Any) -> Any:  # noqa: ANN401
+        """Get the unformatted value, wrap it if it's a list or dict.
+
+        Args:
+            raw_key (Any): The raw key. It must be in the dict.
+
+        Returns:
+            Any: The unformatted value.
+
+        """
+        value = dict.__getitem__(self, raw_key)
+        wrapped = to_autotype()(value)
+        if wrapped is not value:
+            dict.__setitem__(self, raw_key, wrapped)
+        return wrapped
+
+    def _find_key(self, key: object) -> Any:  # noqa: ANN401
+        """Find the raw key whose formatted value equals to the given key.
+
+        Args:
+            key (object): The formatted key.
+
+        Returns:
+            Any: The raw key. `_MISSING` if not found.
+
+        """
+        index = self._template_key_index()
+        try:
+            is_literal = dict.__contains__(self, key) and key not in index
+        except TypeError:  # Unhashable.
+            is_literal = False
+
+        if is_literal:
+            if index and isinstance(key, str):
+                return self._find_key_before(key, index)
+            return key
+
+        for raw_key in list(index):
+            if not dict.__contains__(self, raw_key):  # Removed by orig_pop.
+                continue
+            if format_str_memoized(raw_key) == key:
+                return raw_key
+        return _MISSING
+
+    def _find_key_before(self, key: str, index: dict[str, None]) -> str:
+        """Find the first raw key matching a literal key of the dict.
+
+        A template key before the literal key may format to the same key,
+        and the first one wins. Keys after it are never formatted, and
+        template keys which cannot be formatted are skipped.
+
+        Args:
+            key (str): The literal key.
+            index (dict[str, None]): The template key index.
+
+        Returns:
+            str: The raw key.
+
+        """
+        positions = self._position_index()
+        if key not in positions:  # Added by a method of dict.
+            positions = self._rebuild_position_index()
+        position = positions[key]
+        for raw_key in index:
+            if not dict.__contains__(self, raw_key):  # Removed by orig_pop.
+                continue
+            if raw_key not in positions:
+                positions = self._rebuild_position_index()
+                position = positions[key]
+            if positions[raw_key] > position:
+                break
+            try:
+                if format_str_memoized(raw_key) == key:
+                    return raw_key
+            except RUError:
+                continue
+        return key
 
     def get(  # pylint: disable=R0913
         self,
@@ -99,10 +247,9 @@ class AutoFormatDict(dict[str, Any]):
         """
         key = format_str(key, fmt=fmt)
         res = default
-        for k in self.orig_keys():
-            if format_str(k) == key:
-                res = format_str(self.orig_get(k, self.raise_if_not_found))
-                break
+        raw_key = self._find_key(key)
+        if raw_key is not _MISSING:
+            res = format_str_memoized(self._get_raw(raw_key))
 
         if res is self.raise_if_not_found:
             raise KeyError(repr(key))
@@ -139,18 +286,24 @@ class AutoFormatDict(dict[str, Any]):
 
         """
         for key in self.orig_keys():
-            yield format_str(key)
+            yield format_str_memoized(key)
 
-    orig_values = dict[str, Any].values
+    def orig_values(self) -> Generator[Any]:
+        """Get the unformatted values of the dict."""
+        for key in list(self.orig_keys()):
+            yield self._get_raw(key)
 
     def values(  # type: ignore[signature-mismatch]
         self,
     ) -> Generator[Any]:
         """Get the values of the dict."""
-        for value in super().values():
-            yield format_str(value)
+        for key in list(self.orig_keys()):
+            yield format_str_memoized(self._get_raw(key))
 
-    orig_items = dict[str, Any].items
+    def orig_items(self) -> Generator[tuple[str, Any]]:
+        """Get the raw keys and the unformatted values of the dict."""
+        for key in list(self.orig_keys()):
+            yield key, self._get_raw(key)
 
     def items(  # type: ignore[signature-mismatch]
         self,
@@ -224,8 +377,33 @@ class AutoFormatDict(dict[str, Any]):
             AutoFormatDict: The copy of the dict.
 
         """
+        # Wrap the children first, so they are shared with the copy.
+        for key in self.orig_keys():
+            self._get_raw(key)
         return AutoFormatDict(self)
 
+    def raw_copy(self) -> "AutoFormatDict":
+        """Get a shallow copy of the dict without formatting it.
+
+        Returns:
+            AutoFormatDict: The copy of the dict. Nested lists and dicts are
+                shared with it.
+
+        """
+        for key in self.orig_keys():
+            self._get_raw(key)
+        return AutoFormatDict(dict.items(self))
+
+    def __reduce__(self) -> tuple[type["AutoFormatDict"], tuple[Any, ...]]:
+        """Pickle the dict without formatting it.
+
+        Returns:
+            tuple[type[AutoFormatDict], tuple[Any, ...]]: The constructor and
+                the raw items.
+
+        """
+        return AutoFormatDict, (dict(dict.items(self)),)
+
     def popitem(self) -> tuple[str, Any]:
         """Pop the item of the dict.
 
@@ -234,7 +412,33 @@ class AutoFormatDict(dict[str, Any]):
 
         """
         key, value = super().popitem()
-        return format_str(key), format_str(value)
+        self._forget_key(key)
+        return format_str(key), format_str(to_autotype()(value))
+
+    def setdefault(  # type: ignore[override]
+        self,
+        key: str,
+        default: Any = None,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        """Insert the key with the default value if the key is not in the dict.
+
+        Args:
+            key (str): The raw key.
+            default (Any): The value to set if the key is not in the dict.
+
+        Returns:
+            Any: The raw value of the key.
+
+        """
+        if not dict.__contains__(self, key):
+            self[key] = default
+        return self._get_raw(key)
+
+    def clear(self) -> None:
+        """Remove all items from the dict."""
+        super().clear()
+        self._template_key_index().clear()
+        self.__dict__["_key_positions"] = None
 
     def merge(
         self,
@@ -280,7 +484,42 @@ class AutoFormatDict(dict[str, Any]):
             value (Any): The value to set.
 
         """
+        is_new = not dict.__contains__(self, key)
         super().__setitem__(key, to_autotype()(value))
+        if is_new:
+            positions = self.__dict__.get("_key_positions")
+            if positions is not None:
+                positions[key] = next(_positions)
+        if _is_template_key(key):
+            index = self._template_key_index()
+            if is_new:
+                # Keep the index in insertion order if it's removed by
+                # orig_pop before.
+                index.pop(key, None)
+            index[key] = None
+
+    def __delitem__(self, key: str) -> None:
+        """Delete the given raw key.
+
+        Args:
+            key (str): The raw key to delete.
+
+        """
+        super().__delitem__(key)
+        self._forget_key(key)
+
+    def __ior__(self, other: Any) -> Self:  # type: ignore[override]  # noqa: ANN401
+        """Update the dict with the other mapping.
+
+        Args:
+            other (Any): The mapping to update.
+
+        Returns:
+            Self: The dict itself.
+
+        """
+        self.update(other)
+        return self
 
     def __getitem__(
         self,
@@ -295,7 +534,7 @@ class AutoFormatDict(dict[str, Any]):
             Any | AutoFormatDict: The value of the given key.
 
         """
-        return format_str(self.get(format_str(key)))
+        return format_str_memoized(self.get(format_str(key)))
 
     def __iter__(self) -> Iterator[str]:
         """Get the keys iterator of the dict."""
@@ -362,4 +601,4 @@ class AutoFormatDict(dict[str, Any]):
             bool: If the dict contains the given key.
 
         """
-        return any(k == format_str(key) for k in self.keys())
+        return self._find_key(format_str(key)) is not _MISSING
@@ -23,7 +23,7 @@ import sys
 from collections.abc import Generator, Iterable
 from typing import Any, Generic, Self, SupportsIndex, TypeVar, cast
 
-from rubisco.lib.variable.format import format_str
+from rubisco.lib.variable.format import format_str_memoized
 from rubisco.lib.variable.to_autotype import to_autotype
 
 T = TypeVar("T")
@@ -35,7 +35,12 @@ class AutoFormatList(list[T], Generic[T]):
     We will replace all the elements which are lists or dicts to
     AutoFormatList or AutoFormatDict recursively.
     The elements will be formatted when we get them.
-    Python's built-in list and dict will NEVER appear here.
+    Python's built-in list and dict will NEVER be returned by its methods,
+    including the `orig_*` ones.
+
+    Like AutoFormatDict, nested lists and dicts are wrapped when they are
+    read for the first time. Until then, they are shared with the iterable
+    we are initialized with.
     """
 
     def __init__(self, iterable: Iterable[T] = ()) -> None:
@@ -46,7 +51,23 @@ class AutoFormatList(list[T], Generic[T]):
                 list. Defaults to ().
 
         """
-        super().__init__([to_autotype()(item) for item in iterable])
+        super().__init__(iterable)
+
+    def _get_raw(self, index: SupportsIndex) -> T:
+        """Get the unformatted item, wrap it if it's a list or dict.
+
+        Args:
+            index (SupportsIndex): The index of the item.
+
+        Returns:
+            T: The unformatted item.
+
+        """
+        value = list.__getitem__(self, index)
+        wrapped = to_autotype()(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
 
     def append(self, value: T) -> None:
         """Append the value to the list.
@@ -71,7 +92,7 @@ class AutoFormatList(list[T], Generic[T]):
         """
         counts = 0
         for item in self:
-            if format_str(item) == format_str(value):
+            if format_str_memoized(item) == format_str_memoized(value):
                 counts += 1
 
         return counts
@@ -112,7 +133,7 @@ class AutoFormatList(list[T], Generic[T]):
 
         """
         for index, item in enumerate(cast("list[T]", self[start:stop])):
-            if format_str(item) == format_str(value):
+            if format_str_memoized(item) == format_str_memoized(value):
                 return index
 
         raise ValueError(value)
@@ -142,7 +163,7 @@ class AutoFormatList(list[T], Generic[T]):
             T: The value of the given index.
 
         """
-        return format_str(super().pop(index))
+        return format_str_memoized(to_autotype()(super().pop(index)))
 
     def __setitem__(
         self,
@@ -163,7 +184,17 @@ class AutoFormatList(list[T], Generic[T]):
             return
         super().__setitem__(index, to_autotype()(value))
 
-    orig_getitem = list[T].__getitem__
+    def orig_getitem(self, index: SupportsIndex) -> T:
+        """Get the unformatted item.
+
+        Args:
+            index (SupportsIndex): The index of the item.
+
+        Returns:
+            T: The unformatted item.
+
+        """
+        return self._get_raw(index)
 
     def __getitem__(  # type: ignore[valid-type]
         self,
@@ -179,7 +210,7 @@ class AutoFormatList(list[T], Generic[T]):
 
         """
         if isinstance(index, int):
-            return format_str(super().__getitem__(index))
+            return format_str_memoized(self._get_raw(index))
         return AutoFormatList(super().__getitem__(index))
 
     def __contains__(self, value: object) -> bool:
@@ -192,7 +223,10 @@ class AutoFormatList(list[T], Generic[T]):
             bool: True if the value is in the list, False otherwise.
 
         """
-        return any(format_str(item) == format_str(value) for item in self)
+        return any(
+            format_str_memoized(item) == format_str_memoized(value)
+            for item in self
+        )
 
     def __add__(self, other: Iterable[Any]) -> "AutoFormatList[Any]":
         """Add the other iterable to the list.
@@ -243,18 +277,36 @@ class AutoFormatList(list[T], Generic[T]):
             return False
 
         for item1, item2 in zip(self, cast("list[Any]", other), strict=False):
-            if format_str(item1) != format_str(item2):
+            if format_str_memoized(item1) != format_str_memoized(item2):
                 return False
         return True
 
-    orig_iter = list[T].__iter__
+    def orig_iter(self) -> Generator[T]:
+        """Get the iterator of the unformatted items."""
+        index = 0
+        while index < len(self):
+            yield self._get_raw(index)
+            index += 1
+
+    def __reduce__(self) -> tuple[type["AutoFormatList[Any]"], tuple[Any, ...]]:
+        """Pickle the list without formatting it.
+
+        Returns:
+            tuple[type[AutoFormatList], tuple[Any, ...]]: The constructor and
+                the raw items.
+
+        """
+        return AutoFormatList, (list(list.__iter__(self)),)
 
     def __iter__(
         self,
     ) -> Generator[T]:
         """Get the iterator of the list."""
-        for item in super().__iter__():
-            yield format_str(item)
+        # Check the length every time like list iterator.
+        index = 0
+        while index < len(self):
+            yield format_str_memoized(self._get_raw(index))
+            index += 1
 
     orig_repr = list[T].__repr__
 
@@ -44,6 +44,9 @@ def add_undefined_var_callback(callback: Callable[[str], None]) -> None:
 def on_undefined_var(name: str) -> None:
     """Call the callbacks when a variable is undefined.
 
+    The callbacks are always called. `variable.notify_undefined_var` skips
+    the names they could not resolve before.
+
     Args:
         name (str): The name of the variable.
 
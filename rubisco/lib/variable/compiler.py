@@ -0,0 +1,126 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Compile Rubisco variable expression to Python closures.
+
+The compiled closure has the same behavior as `execute_expression`, but the
+expression tree is only walked once, when it's compiled.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.l10n import _
+from rubisco.lib.variable.pyexpr_sandbox import eval_pyexpr
+from rubisco.lib.variable.ru_ast import Expression, ExpressionType
+from rubisco.lib.variable.variable import (
+    current_scope,
+    notify_undefined_var,
+)
+
+__all__ = ["CompiledExpression", "compile_expression"]
+
+CompiledExpression = Callable[[], Any]
+
+
+def _compile_root(expr: Expression) -> CompiledExpression:
+    children = expr.children or []
+    if not children:
+        return lambda: ""
+    if len(children) == 1:
+        return compile_expression(children[0])
+
+    # Constants are kept in place. Only the placeholders are evaluated
+    # when rendering.
+    parts: list[str] = []
+    slots: list[tuple[int, CompiledExpression]] = []
+    for child in children:
+        if child.type == ExpressionType.CONSTANT:
+            parts.append(str(child.value))
+        else:
+            slots.append((len(parts), compile_expression(child)))
+            parts.append("")
+
+    def _render() -> str:
+        buf = parts.copy()
+        for idx, func in slots:
+            buf[idx] = str(func())
+        return "".join(buf)
+
+    return _render
+
+
+def _compile_variable(expr: Expression) -> CompiledExpression:
+    name = expr.value
+    if name is None:
+        msg = "Variable's value is None."
+        raise ValueError(msg)
+    decoration = (
+        compile_expression(expr.decoration) if expr.decoration else None
+    )
+
+    def _variable() -> Any:  # noqa: ANN401
+        stack = current_scope().get(name)
+        if stack is not None:
+            return stack[-1]
+
+        notify_undefined_var(name)
+
+        if decoration is not None:
+            return decoration()
+
+        raise RUValueError(
+            _("Undefined variable: ${{var}}").replace("${{var}}", name),
+        )
+
+    return _variable
+
+
+def _compile_pyexpr(expr: Expression) -> CompiledExpression:
+    source = expr.value
+    if source is None:
+        msg = "Python expression's value is None."
+        raise ValueError(msg)
+    return lambda: eval_pyexpr(source)
+
+
+def compile_expression(expr: Expression) -> CompiledExpression:
+    """Compile the expression to a closure.
+
+    Args:
+        expr (Expression): The expression to compile.
+
+    Returns:
+        CompiledExpression: A function without arguments. Calling it has
+            the same result as `execute_expression(expr)`.
+
+    """
+    if expr.type == ExpressionType.ROOT:
+        return _compile_root(expr)
+    if expr.type == ExpressionType.CONSTANT:
+        value = expr.value
+        return lambda: value
+    if expr.type == ExpressionType.VARIABLE:
+        return _compile_variable(expr)
+    if expr.type == ExpressionType.PYTHON_EXPRESSION:
+        return _compile_pyexpr(expr)
+
+    msg = f"Unknown expression type: {expr.type}"
+    raise ValueError(msg)
@@ -23,7 +23,6 @@ from typing import Any
 
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
-from rubisco.lib.variable.callbacks import on_undefined_var
 from rubisco.lib.variable.pyexpr_sandbox import eval_pyexpr
 from rubisco.lib.variable.ru_ast import (
     Expression,
@@ -32,6 +31,7 @@ from rubisco.lib.variable.ru_ast import (
 from rubisco.lib.variable.variable import (
     get_variable,
     has_variable,
+    notify_undefined_var,
 )
 
 __all__ = ["execute_expression"]
@@ -44,7 +44,7 @@ def _exec_variable_type(expr: Expression) -> str | Any:  # noqa: ANN401
     if has_variable(expr.value):
         return get_variable(expr.value)
 
-    on_undefined_var(expr.value)
+    notify_undefined_var(expr.value)
 
     if expr.decoration:
         return execute_expression(expr.decoration)
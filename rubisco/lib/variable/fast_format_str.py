@@ -24,20 +24,71 @@ python expression or decoration.
 
 e.g. "Hello ${{name}}!" is a simple variable expression."
 Because the expression only contains literal text and simple variable without
-decoration, it can be formatted with str.replace().
+decoration, it can be split into literal parts and variable names once, and
+then formatted by joining them.
 It is faster than the full format_str() function.
 """
 
 import re
+from functools import lru_cache
 from typing import Any
 
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
-from rubisco.lib.variable.var_container import VariableContainer
 from rubisco.lib.variable.variable import get_variable
 
 __all__ = ["fast_format_str"]
 
+FAST_FORMAT_CACHE_SIZE = 1024
+
+_PYEXPR = re.compile(r"\$\&\{\{.*\}\}")
+_DECORATION = re.compile(r"\$\{\{([^{}]+?):([^{}]+?)\}\}")
+_SIMPLE_VARIABLE = re.compile(r"\$\{\{\s*([a-zA-Z_][a-zA-Z0-9_.-]*)\s*\}\}")
+
+# Errors of the parsed template.
+_E_PYEXPR = 1
+_E_DECORATION = 2
+
+
+@lru_cache(maxsize=FAST_FORMAT_CACHE_SIZE)
+def _parse(string: str) -> tuple[int, str | None, tuple[str, ...]]:
+    """Split the string into literal parts and variable names.
+
+    Args:
+        string (str): The string to parse.
+
+    Returns:
+        tuple[int, str | None, tuple[str, ...]]: The error code (0 if it's
+            valid), the variable name if the string only contains a
+            variable, and the parts. Literal parts are at even indexes and
+            variable names are at odd indexes.
+
+    """
+    if _PYEXPR.search(string):
+        return _E_PYEXPR, None, ()
+    if _DECORATION.search(string):
+        return _E_DECORATION, None, ()
+
+    parts: list[str] = []
+    pos = 0
+    for match in _SIMPLE_VARIABLE.finditer(string):
+        parts.append(string[pos : match.start()])
+        parts.append(match.group(1))
+        pos = match.end()
+    parts.append(string[pos:])
+
+    # A trailing newline is allowed, like "$" in regular expressions.
+    single = None
+    if len(parts) == 3 and not parts[0] and parts[2] in ("", "\n"):  # noqa: PLR2004
+        single = parts[1]
+    return 0, single, tuple(parts)
+
+
+def _lookup(name: str, fmt: dict[str, Any] | None) -> Any:  # noqa: ANN401
+    if fmt is not None and name in fmt:
+        return fmt[name]
+    return get_variable(name)
+
 
 def fast_format_str(
     string: str | Any,  # noqa: ANN401
@@ -51,6 +102,9 @@ def fast_format_str(
     It's not recommended to use this function to format a string that from
     user input. Suggest to use this function when formatting a message.
 
+    Variables are looked up in `fmt` first, then in the global variables.
+    The global variables are not changed.
+
     Args:
         string (str): The string to format.
         fmt (dict[str, Any] | None): The format dictionary.
@@ -74,36 +128,27 @@ def fast_format_str(
     if not isinstance(string, str):
         return string
 
-    if re.search(r"\$\&\{\{.*\}\}", string):
+    error, single, parts = _parse(string)
+    if error == _E_PYEXPR:
         msg = _("fast_format_str() only supports simple variable expressions.")
         raise RUValueError(
             msg,
         )
-
-    if re.search(r"\$\{\{([^{}]+?):([^{}]+?)\}\}", string):
+    if error == _E_DECORATION:
         msg = _("fast_format_str() does not support default value.")
         raise RUValueError(
             msg,
         )
 
-    matches = re.finditer(
-        r"\$\{\{\s*[a-zA-Z_][a-zA-Z0-9_.-]*\s*\}\}",
-        string,
-    )
-
-    if not matches:
+    if len(parts) == 1:  # Literal text only.
         return string
 
-    with VariableContainer(fmt):
-        # If the string only contains a variable, return the variable value
-        # without converting to a string.
-        m = re.match(r"^\$\{\{\s*[a-zA-Z_][a-zA-Z0-9_.-]*\s*\}\}$", string)
-        if m:
-            varname = m.group()[3:-2].strip()
-            return get_variable(varname)
-
-        for match in matches:
-            varname = match.group()[3:-2].strip()
-            val = get_variable(varname)
-            string = string.replace(match.group(), str(val))
-    return string
+    # If the string only contains a variable, return the variable value
+    # without converting to a string.
+    if single is not None:
+        return _lookup(single, fmt)
+
+    buf = list(parts)
+    for idx in range(1, len(buf), 2):
+        buf[idx] = str(_lookup(buf[idx], fmt))
+    return "".join(buf)
@@ -19,14 +19,19 @@
 
 """Rubisco string formatter with variable."""
 
+from collections.abc import Iterable
 from typing import Any, TypeVar
 
-from rubisco.lib.variable.execute import execute_expression
-from rubisco.lib.variable.lexer import get_token
-from rubisco.lib.variable.ru_ast import parse_expression
+from rubisco.lib.variable.template_cache import (
+    Template,
+    get_template,
+    has_template_syntax,
+    render_template,
+)
 from rubisco.lib.variable.var_container import VariableContainer
+from rubisco.lib.variable.variable import enter_scope, snapshot_scope
 
-__all__ = ["format_str"]
+__all__ = ["format_many", "format_str", "format_str_memoized"]
 
 
 T = TypeVar("T")
@@ -39,6 +44,9 @@ def format_str(
 ) -> T | Any:  # noqa: ANN401
     """Format the string with variables.
 
+    The parsed template is cached by `template_cache`. Strings without
+    variable or python expression are returned directly.
+
     Args:
         string (T): The string to format.
         fmt (dict[str, Any] | None): The format dictionary.
@@ -49,8 +57,85 @@ def format_str(
             return itself.
 
     """
-    if not isinstance(string, str):
+    if not isinstance(string, str) or not has_template_syntax(string):
         return string
 
+    render = get_template(string).render
+    if not fmt:
+        return render()
     with VariableContainer(fmt):
-        return execute_expression(parse_expression(get_token(string)))
+        return render()
+
+
+def format_str_memoized(string: T) -> T | Any:  # noqa: ANN401
+    """Format the string with the current variables, without format dict.
+
+    The result is reused until a variable referenced by the string is
+    pushed or popped. See `template_cache.render_template`.
+
+    Args:
+        string (T): The string to format.
+
+    Returns:
+        T | Any: The formatted string. If the input is not a string,
+            return itself.
+
+    """
+    if not isinstance(string, str) or not has_template_syntax(string):
+        return string
+
+    return render_template(get_template(string))
+
+
+def format_many(
+    strings: Iterable[T],
+    *,
+    fmt: dict[str, Any] | None = None,
+) -> list[T | Any]:
+    """Format many strings with the same variables.
+
+    The variables referenced by the strings are resolved once into a flat
+    snapshot (see `variable.snapshot_scope`), and all the templates are
+    rendered against it. So `fmt` is never pushed to the variable stacks,
+    and a template which appears more than once is rendered only once.
+
+    If a string contains a python expression, the snapshot has all the
+    variables of the current scope.
+
+    Args:
+        strings (Iterable[T]): The strings to format.
+        fmt (dict[str, Any] | None): The format dictionary.
+            Defaults to None.
+
+    Returns:
+        list[T | Any]: The formatted strings, in the same order. Items which
+            are not strings are returned as is.
+
+    """
+    items = list(strings)
+    templates: dict[str, Template] = {}
+    for item in items:
+        if (
+            isinstance(item, str)
+            and item not in templates
+            and has_template_syntax(item)
+        ):
+            templates[item] = get_template(item)
+    if not templates:
+        return items
+
+    names: set[str] | None = set()
+    for template in templates.values():
+        if template.references is None:
+            names = None
+            break
+        names |= template.references
+
+    with enter_scope(snapshot_scope(names, fmt)):
+        rendered = {
+            source: template.render() for source, template in templates.items()
+        }
+    return [
+        rendered.get(item, item) if isinstance(item, str) else item
+        for item in items
+    ]
@@ -25,7 +25,6 @@ from dataclasses import dataclass
 
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
-from rubisco.lib.stack import Stack
 
 __all__ = ["Token", "TokenType", "get_token"]
 
@@ -63,11 +62,56 @@ class TS(enum.Enum):
     PYTHONEXPR_EXPRESSION = 9  # <expression>
 
 
+_DECORATE_CONSTANT_STOP = re.compile(r"[$}]")
+_VARIABLE_NAME_STOP = re.compile(r"[:}]")
+_VARIABLE_NAME = re.compile(r"^[a-zA-Z0-9_.-]*$")
+
+
+# Enum attribute lookup is slow, so the hot loop uses these aliases.
+_S_CONSTANT = TS.CONSTANT
+_S_VARIABLE_IDENTIFIER_START = TS.VARIABLE_IDENTIFIER_START
+_S_VARIABLE_NAME = TS.VARIABLE_NAME
+_S_VARIABLE_DECORATE = TS.VARIABLE_DECORATE
+_S_DECORATE_CONSTANT = TS.DECORATE_CONSTANT
+_S_PYTHONEXPR_IDENTIFIER_START = TS.PYTHONEXPR_IDENTIFIER_START
+_S_PYTHONEXPR_EXPRESSION = TS.PYTHONEXPR_EXPRESSION
+_T_CONSTANT = TokenType.CONSTANT
+_T_VARIABLE_IDENTIFIER_START = TokenType.VARIABLE_IDENTIFIER_START
+_T_VARIABLE_NAME = TokenType.VARIABLE_NAME
+_T_VARIABLE_DECORATE = TokenType.VARIABLE_DECORATE
+_T_VARIABLE_IDENTIFIER_END = TokenType.VARIABLE_IDENTIFIER_END
+_T_PYTHONEXPR_IDENTIFIER_START = TokenType.PYTHONEXPR_IDENTIFIER_START
+_T_PYTHONEXPR_EXPRESSION = TokenType.PYTHONEXPR_EXPRESSION
+_T_PYTHONEXPR_IDENTIFIER_END = TokenType.PYTHONEXPR_IDENTIFIER_END
+
+
+def _check_variable_names(tokens: list[Token]) -> None:
+    for token in tokens:
+        if token.token_type is _T_VARIABLE_NAME:
+            token.value = token.value.strip()
+            if not _VARIABLE_NAME.match(token.value):
+                msg = _("Invalid variable name.")
+                raise RUValueError(
+                    msg,
+                    hint=_(
+                        "Variable name must only contain letters,"
+                        " numbers, and '-', '.', '_'.",
+                    ),
+                )
+
+
 def get_token(  # pylint: disable=R0912, R0915 # noqa: C901, PLR0912, PLR0915
     expression: str,
 ) -> list[Token]:
     """Get the token list of the expression.
 
+    The lexer jumps between the special characters of the current state with
+    `str.find` and compiled regexes, and slices the token values out of the
+    expression. So it's linear in the length of the expression.
+
+    A '$' which doesn't start "${{" or "$&{{" is a constant. It consumes the
+    next two characters (three if they are "&{"), so "$${{a}}" is a constant.
+
     Args:
         expression (str): The expression to parse.
 
@@ -75,148 +119,108 @@ def get_token(  # pylint: disable=R0912, R0915 # noqa: C901, PLR0912, PLR0915
         list[Token]: The token list of the expression.
 
     """
-    current_state: Stack[TS] = Stack()
-    current_state.put(TS.CONSTANT)
-    cur_token_value = ""
-    cur_ignored_token_value = ""
-
+    states: list[TS] = [_S_CONSTANT]
     res: list[Token] = []
-
+    length = len(expression)
     idx = 0
+    const_start = 0  # The start of the current constant.
 
-    def _read(size: int) -> str:
-        nonlocal idx
-        res = expression[idx : idx + size]
-        idx += size
-        return res
-
-    def _flush(tt: TokenType) -> None:
-        nonlocal cur_token_value
-        if cur_token_value:
-            res.append(
-                Token(
-                    tt,
-                    cur_token_value,
-                ),
-            )
-            cur_token_value = ""
-
-    def _push(tt: TokenType) -> None:
-        nonlocal cur_token_value
-        res.append(
-            Token(
-                tt,
-                cur_token_value,
-            ),
-        )
-        cur_token_value = ""
-
-    while idx < len(expression):
-        c = _read(1)
-        if current_state.top() in (
-            TS.CONSTANT,
-            TS.DECORATE_CONSTANT,
-        ):
-            dont_save_char = False
-            if c == "}" and current_state.top() == TS.DECORATE_CONSTANT:
-                if _read(1) != "}":
-                    msg = _("Invalid variable expression.")
-                    raise RUValueError(msg)
-                _flush(TokenType.CONSTANT)
-                current_state.get()  # Pop DECORATE_CONSTANT.
-                current_state.get()  # Pop VARIABLE_DECORATE.
-                current_state.get()  # Pop VARIABLE_IDENTIFIER_START
-                _push(TokenType.VARIABLE_IDENTIFIER_END)
-                dont_save_char = True
-
-            if c == "$":
-                cur_ignored_token_value += c
-                next_str = _read(2)
-                cur_ignored_token_value += next_str
-                if next_str == "{{":
-                    _flush(TokenType.CONSTANT)
-                    current_state.put(TS.VARIABLE_IDENTIFIER_START)
-                    _push(TokenType.VARIABLE_IDENTIFIER_START)
-                    cur_ignored_token_value = ""
-                    current_state.put(TS.VARIABLE_NAME)
-                elif next_str == "&{":
-                    next_c = _read(1)
-                    cur_ignored_token_value += next_c
-                    if next_c == "{":
-                        _flush(TokenType.CONSTANT)
-                        current_state.put(TS.PYTHONEXPR_IDENTIFIER_START)
-                        _push(TokenType.PYTHONEXPR_IDENTIFIER_START)
-                        cur_ignored_token_value = ""
-                        current_state.put(TS.PYTHONEXPR_EXPRESSION)
-                else:
-                    cur_token_value += cur_ignored_token_value
-            elif not dont_save_char:
-                cur_token_value += c
-        elif current_state.top() == TS.VARIABLE_NAME:
-            if c == ":":
-                _flush(TokenType.VARIABLE_NAME)
-                current_state.get()  # Pop VARIABLE_NAME.
-                current_state.put(TS.VARIABLE_DECORATE)
-            elif c == "}":
-                if _read(1) != "}":
+    def _flush_constant(end: int) -> None:
+        if end > const_start:
+            res.append(Token(_T_CONSTANT, expression[const_start:end]))
+
+    while idx < length:
+        state = states[-1]
+        if state is _S_CONSTANT or state is _S_DECORATE_CONSTANT:
+            if state is _S_CONSTANT:
+                pos = expression.find("$", idx)
+            else:
+                match = _DECORATE_CONSTANT_STOP.search(expression, idx)
+                pos = match.start() if match else -1
+            if pos < 0:
+                idx = length
+                break
+
+            if expression[pos] == "}":  # Only in DECORATE_CONSTANT.
+                if expression[pos + 1 : pos + 2] != "}":
                     msg = _("Invalid variable expression.")
                     raise RUValueError(msg)
-                _flush(TokenType.VARIABLE_NAME)
-                _push(TokenType.VARIABLE_IDENTIFIER_END)
-                current_state.get()  # Pop VARIABLE_NAME.
-                current_state.get()  # Pop VARIABLE_IDENTIFIER_START
+                _flush_constant(pos)
+                states.pop()  # Pop DECORATE_CONSTANT.
+                states.pop()  # Pop VARIABLE_DECORATE.
+                states.pop()  # Pop VARIABLE_IDENTIFIER_START.
+                res.append(Token(_T_VARIABLE_IDENTIFIER_END))
+                idx = const_start = pos + 2
+                continue
+
+            next_str = expression[pos + 1 : pos + 3]
+            if next_str == "{{":
+                _flush_constant(pos)
+                states.append(_S_VARIABLE_IDENTIFIER_START)
+                states.append(_S_VARIABLE_NAME)
+                res.append(Token(_T_VARIABLE_IDENTIFIER_START))
+                idx = pos + 3
+            elif next_str == "&{" and expression[pos + 3 : pos + 4] == "{":
+                _flush_constant(pos)
+                states.append(_S_PYTHONEXPR_IDENTIFIER_START)
+                states.append(_S_PYTHONEXPR_EXPRESSION)
+                res.append(Token(_T_PYTHONEXPR_IDENTIFIER_START))
+                idx = pos + 4
+            elif next_str == "&{":
+                idx = pos + 4  # "$&{" and the next character are constant.
             else:
-                cur_token_value += c
-        elif current_state.top() == TS.PYTHONEXPR_EXPRESSION:
-            if c == "}":
-                cur_ignored_token_value += c
-                next_c = _read(1)
-                cur_ignored_token_value += next_c
-                if next_c == "}":
-                    # The expression is ended.
-                    _flush(TokenType.PYTHONEXPR_EXPRESSION)
-                    current_state.get()  # Pop PYTHONEXPR_EXPRESSION.
-                    current_state.get()  # Pop PYTHONEXPR_IDENTIFIER_START
-                    _push(TokenType.PYTHONEXPR_IDENTIFIER_END)
-                else:
-                    cur_token_value += cur_ignored_token_value
-                    cur_ignored_token_value = ""
+                idx = pos + 3  # '$' and the next two characters are constant.
+        elif state is _S_VARIABLE_NAME:
+            match = _VARIABLE_NAME_STOP.search(expression, idx)
+            if match is None:
+                idx = length
+                break
+            pos = match.start()
+            if pos > idx:
+                res.append(Token(_T_VARIABLE_NAME, expression[idx:pos]))
+            if expression[pos] == ":":
+                states[-1] = _S_VARIABLE_DECORATE
+                idx = pos + 1
             else:
-                cur_token_value += c
-        elif current_state.top() == TS.VARIABLE_DECORATE:
-            idx -= 1  # Unget possible '$'.
-            if c in (":", "}"):
+                if expression[pos + 1 : pos + 2] != "}":
+                    msg = _("Invalid variable expression.")
+                    raise RUValueError(msg)
+                res.append(Token(_T_VARIABLE_IDENTIFIER_END))
+                states.pop()  # Pop VARIABLE_NAME.
+                states.pop()  # Pop VARIABLE_IDENTIFIER_START.
+                idx = const_start = pos + 2
+        elif state is _S_VARIABLE_DECORATE:
+            if expression[idx] in (":", "}"):
                 msg = _("Invalid variable decorate expression.")
                 raise RUValueError(msg)
-            _push(TokenType.VARIABLE_DECORATE)
-            current_state.put(TS.DECORATE_CONSTANT)
+            res.append(Token(_T_VARIABLE_DECORATE))
+            states.append(_S_DECORATE_CONSTANT)
+            const_start = idx
+        elif state is _S_PYTHONEXPR_EXPRESSION:
+            pos = expression.find("}}", idx)
+            if pos < 0:
+                idx = length
+                break
+            if pos > idx:
+                res.append(
+                    Token(
+                        _T_PYTHONEXPR_EXPRESSION,
+                        expression[idx:pos],
+                    ),
+                )
+            res.append(Token(_T_PYTHONEXPR_IDENTIFIER_END))
+            states.pop()  # Pop PYTHONEXPR_EXPRESSION.
+            states.pop()  # Pop PYTHONEXPR_IDENTIFIER_START.
+            idx = const_start = pos + 2
         else:
-            msg = f"Unknown state: {current_state}"
+            msg = f"Unknown state: {states}"
             raise ValueError(msg)
 
-    if cur_token_value:
-        res.append(
-            Token(
-                TokenType.CONSTANT,
-                cur_token_value,
-            ),
-        )
-
-    if current_state.get() != TS.CONSTANT or not current_state.empty():
+    if states != [_S_CONSTANT]:
         msg = _("Invalid variable expression.")
         raise RUValueError(msg)
 
-    for token in res:
-        if token.token_type == TokenType.VARIABLE_NAME:
-            token.value = token.value.strip()
-            if not re.match(r"^[a-zA-Z0-9_.-]*$", token.value):
-                msg = _("Invalid variable name.")
-                raise RUValueError(
-                    msg,
-                    hint=_(
-                        "Variable name must only contain letters,"
-                        " numbers, and '-', '.', '_'.",
-                    ),
-                )
+    _flush_constant(length)
+    _check_variable_names(res)
 
     return res
@@ -21,13 +21,18 @@
 
 import builtins
 from collections.abc import Callable
-from types import ModuleType
+from functools import lru_cache
+from types import CodeType, MappingProxyType
 from typing import Any, NoReturn
 
 from rubisco.lib.exceptions import RUError
 from rubisco.lib.l10n import _
 from rubisco.lib.log import logger
-from rubisco.lib.variable.variable import get_variable, has_variable, variables
+from rubisco.lib.variable.variable import (
+    current_scope,
+    get_variable,
+    has_variable,
+)
 
 __all__ = [
     "RUEvalError",
@@ -35,6 +40,22 @@ __all__ = [
     "eval_pyexpr",
 ]
 
+PYEXPR_CODE_CACHE_SIZE = 1024
+
+# These names can't be overridden by variables.
+_DISALLOWED_NAMES = frozenset(
+    {
+        "__import__",
+        "open",
+        "exec",
+        "eval",
+        "compile",
+        "__spec__",
+        "__name__",
+        "SystemExit",
+    },
+)
+
 
 class RUFunctionDisallowedError(RUError):
     """Raise when a function is disallowed in a python expression."""
@@ -44,15 +65,6 @@ class RUEvalError(RUError):
     """Raise when a python expression eval failed."""
 
 
-def _copy_builtins() -> object:
-    res = ModuleType(_("<rubisco inline python expression>"))
-    for name in dir(builtins):
-        setattr(res, name, getattr(builtins, name))
-    for name, val in variables.items():
-        setattr(res, name, val.top())
-    return res
-
-
 def get_disabled_function(name: str) -> Callable[..., NoReturn]:
     """Get a disabled function.
 
@@ -74,6 +86,64 @@ def get_disabled_function(name: str) -> Callable[..., NoReturn]:
     return _disabled
 
 
+# Read-only, because it's shared by all the expressions.
+_builtins: MappingProxyType[str, Any] | None = None
+
+
+def _get_builtins() -> MappingProxyType[str, Any]:
+    global _builtins  # pylint: disable=W0603  # noqa: PLW0603
+
+    if _builtins is not None:
+        return _builtins
+
+    res = dict(vars(builtins))
+
+    # Variables functions.
+    res["get_variable"] = get_variable
+    res["get"] = get_variable
+    res["g"] = get_variable
+    res["has_variable"] = has_variable
+    res["has"] = has_variable
+    res["h"] = has_variable
+
+    # Disable some built-in functions.
+    res["__import__"] = get_disabled_function("__import__")
+    res["open"] = get_disabled_function("open")
+    res["exec"] = get_disabled_function("exec")
+    res["eval"] = get_disabled_function("eval")
+    res["compile"] = get_disabled_function("compile")
+    res["__spec__"] = None
+    res["__name__"] = _("<rubisco inline python expression>")
+    res["SystemExit"] = None
+
+    _builtins = MappingProxyType(res)
+    return _builtins
+
+
+class _Namespace(dict[str, Any]):
+    """The globals of a python expression.
+
+    Variables are resolved when they are used instead of being copied in.
+    A name which is not a variable falls back to the builtins.
+    """
+
+    def __missing__(self, key: str) -> Any:  # noqa: ANN401
+        if key not in _DISALLOWED_NAMES:
+            stack = current_scope().get(key)
+            if stack is not None:
+                return stack[-1]
+        raise KeyError(key)
+
+
+@lru_cache(maxsize=PYEXPR_CODE_CACHE_SIZE)
+def _compile_pyexpr(expr: str) -> CodeType:
+    return compile(
+        expr,
+        "<rubisco inline python expression>",
+        "eval",
+    )
+
+
 def eval_pyexpr(expr: str) -> Any:  # noqa: ANN401
     """Eval a python expression in a relatively safe container.
 
@@ -88,35 +158,11 @@ def eval_pyexpr(expr: str) -> Any:  # noqa: ANN401
         Rubisco is a tool for cppp developer(s).
 
     """
-    builtins_ = _copy_builtins()
-
-    # Variables functions.
-    builtins_.get_variable = get_variable  # type: ignore[attr-defined]
-    builtins_.get = get_variable  # type: ignore[attr-defined]
-    builtins_.g = get_variable  # type: ignore[attr-defined]
-    builtins_.has_variable = has_variable  # type: ignore[attr-defined]
-    builtins_.has = has_variable  # type: ignore[attr-defined]
-    builtins_.h = has_variable  # type: ignore[attr-defined]
-
-    # Variables.
-    for name, val in variables.items():
-        setattr(builtins_, name, val.top())
-
-    # Disable some built-in functions.
-    builtins_.__import__ = get_disabled_function("__import__")  # type: ignore[attr-defined]
-    builtins_.open = get_disabled_function("open")  # type: ignore[attr-defined]
-    builtins_.exec = get_disabled_function("exec")  # type: ignore[attr-defined]
-    builtins_.eval = get_disabled_function("eval")  # type: ignore[attr-defined]
-    builtins_.compile = get_disabled_function("compile")  # type: ignore[attr-defined]
-    builtins_.__spec__ = None  # type: ignore[attr-defined]
-    builtins_.__name__ = _("<rubisco inline python expression>")  # type: ignore[attr-defined]
-    builtins_.SystemExit = None  # type: ignore[attr-defined]
-
     try:
         logger.info("Eval python expression: %s", expr)
         return eval(  # pylint: disable=W0123 # noqa: S307
-            expr,
-            {"__builtins__": builtins_},
+            _compile_pyexpr(expr.strip()),
+            _Namespace(__builtins__=_get_builtins()),
         )
     except RUFunctionDisallowedError:
         raise
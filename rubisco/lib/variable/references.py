@@ -0,0 +1,137 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Static analysis of the variables referenced by templates.
+
+The templates are parsed but never executed. A python expression may read
+any variable, so it is reported as opaque instead of being analyzed.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from rubisco.lib.variable.ru_ast import Expression, collect_references
+from rubisco.lib.variable.template_cache import (
+    get_template,
+    has_template_syntax,
+)
+
+__all__ = [
+    "VariableReferences",
+    "get_expression_references",
+    "get_variable_references",
+]
+
+
+@dataclass(frozen=True)
+class VariableReferences:
+    """Variables referenced by a template or a data tree."""
+
+    names: frozenset[str] = frozenset()
+    # Source of the python expressions ("$&{{ ... }}"), in appearance order.
+    opaque: tuple[str, ...] = ()
+
+    @property
+    def is_opaque(self) -> bool:
+        """Check if the references are incomplete.
+
+        Returns:
+            bool: True if there is any python expression, which may
+                reference any variable.
+
+        """
+        return bool(self.opaque)
+
+    def __or__(self, other: "VariableReferences") -> "VariableReferences":
+        """Merge the references.
+
+        Args:
+            other (VariableReferences): The other references.
+
+        Returns:
+            VariableReferences: The merged references.
+
+        """
+        return _merge((self, other))
+
+
+_EMPTY = VariableReferences()
+
+
+def get_expression_references(expr: Expression) -> VariableReferences:
+    """Get the variables referenced by a parsed expression.
+
+    Variables used in decorations (default values) are included.
+
+    Args:
+        expr (Expression): The expression.
+
+    Returns:
+        VariableReferences: The references.
+
+    """
+    return VariableReferences(*collect_references(expr))
+
+
+def _collect_tree(obj: Any, res: list[VariableReferences]) -> None:  # noqa: ANN401
+    if isinstance(obj, str):
+        if has_template_syntax(obj):
+            res.append(get_expression_references(get_template(obj).expression))
+        return
+    if isinstance(obj, dict):
+        # Use the raw items, formatting them would execute the templates.
+        for key, value in dict.items(obj):  # type: ignore[arg-type]
+            _collect_tree(key, res)
+            _collect_tree(value, res)
+        return
+    if isinstance(obj, list):
+        # The raw items of AutoFormatList.
+        for item in list.__iter__(obj):  # type: ignore[arg-type]
+            _collect_tree(item, res)
+
+
+def _merge(refs: Iterable[VariableReferences]) -> VariableReferences:
+    names: set[str] = set()
+    opaque: list[str] = []
+    for ref in refs:
+        names.update(ref.names)
+        opaque.extend(ref.opaque)
+    return VariableReferences(frozenset(names), tuple(opaque))
+
+
+def get_variable_references(obj: Any) -> VariableReferences:  # noqa: ANN401
+    """Get the variables referenced by a template or a data tree.
+
+    Args:
+        obj (Any): A template string, or a dict (AutoFormatDict) or list
+            (AutoFormatList) whose keys and values may contain templates.
+            Other objects reference nothing.
+
+    Returns:
+        VariableReferences: The references.
+
+    Raises:
+        RUValueError: If a template is invalid.
+
+    """
+    res: list[VariableReferences] = []
+    _collect_tree(obj, res)
+    if not res:
+        return _EMPTY
+    return _merge(res)
@@ -24,7 +24,13 @@ from dataclasses import dataclass
 
 from rubisco.lib.variable.lexer import Token, TokenType
 
-__all__ = ["Expression", "ExpressionType", "parse_expression"]
+__all__ = [
+    "Expression",
+    "ExpressionType",
+    "collect_references",
+    "get_references",
+    "parse_expression",
+]
 
 
 class ExpressionType(enum.Enum):
@@ -151,3 +157,58 @@ def parse_expression(tokens: list[Token]) -> Expression:
     _parse_expression(tokens, root)
 
     return root
+
+
+def _collect_references(
+    expr: Expression,
+    names: set[str],
+    opaque: list[str],
+) -> None:
+    if expr.type == ExpressionType.PYTHON_EXPRESSION:
+        opaque.append(expr.value or "")
+        return
+    if expr.type == ExpressionType.VARIABLE and expr.value is not None:
+        names.add(expr.value)
+    if expr.decoration is not None:
+        _collect_references(expr.decoration, names, opaque)
+    for child in expr.children or []:
+        _collect_references(child, names, opaque)
+
+
+def collect_references(
+    expr: Expression,
+) -> tuple[frozenset[str], tuple[str, ...]]:
+    """Collect the variables referenced by the expression.
+
+    Variables used in decorations (default values) are included.
+
+    Args:
+        expr (Expression): The expression.
+
+    Returns:
+        tuple[frozenset[str], tuple[str, ...]]: The variable names, and the
+            sources of the python expressions in appearance order. A python
+            expression may reference any variable.
+
+    """
+    names: set[str] = set()
+    opaque: list[str] = []
+    _collect_references(expr, names, opaque)
+    return frozenset(names), tuple(opaque)
+
+
+def get_references(expr: Expression) -> frozenset[str] | None:
+    """Get the names of the variables referenced by the expression.
+
+    Args:
+        expr (Expression): The expression.
+
+    Returns:
+        frozenset[str] | None: The variable names. None if the expression
+            contains a python expression, which may reference any variable.
+
+    """
+    names, opaque = collect_references(expr)
+    if opaque:
+        return None
+    return names
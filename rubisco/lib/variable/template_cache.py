@@ -0,0 +1,244 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Parsed template cache.
+
+Lexing and parsing a template is much slower than executing it, and the same
+templates (keys and values of repo.json, workflow steps, ...) are formatted
+again and again. So we keep a bounded LRU cache from the raw string to its
+parsed expression and the compiled closure of it.
+
+A template also memoizes its last rendered value with the generation stamps
+of the variables it references (see `render_template`). The value is reused
+until one of those variables is pushed or popped. Mutating a variable's value
+in place is not tracked.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from rubisco.lib.variable.compiler import CompiledExpression, compile_expression
+from rubisco.lib.variable.lexer import get_token
+from rubisco.lib.variable.ru_ast import (
+    Expression,
+    get_references,
+    parse_expression,
+)
+from rubisco.lib.variable.variable import get_generations
+
+__all__ = [
+    "DEFAULT_TEMPLATE_CACHE_SIZE",
+    "RenderMemoInfo",
+    "Template",
+    "TemplateCacheInfo",
+    "clear_template_cache",
+    "get_template",
+    "has_template_syntax",
+    "render_memo_info",
+    "render_template",
+    "set_template_cache_size",
+    "template_cache_info",
+]
+
+DEFAULT_TEMPLATE_CACHE_SIZE = 4096
+
+
+@dataclass(eq=False)
+class Template:
+    """A parsed and compiled template."""
+
+    source: str
+    expression: Expression
+    render: CompiledExpression
+    # Variables referenced by the template. None if it contains a python
+    # expression.
+    references: frozenset[str] | None
+    # (generations of the references, rendered value) of the last rendering.
+    memo: tuple[tuple[int, ...], Any] | None = None
+
+
+@dataclass(frozen=True)
+class TemplateCacheInfo:
+    """Statistics of the template cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+@dataclass(frozen=True)
+class RenderMemoInfo:
+    """Statistics of the memoized rendering."""
+
+    hits: int
+    misses: int
+    # Templates with python expression can't be memoized.
+    uncacheable: int
+
+
+_cache: OrderedDict[str, Template] = OrderedDict()
+_cache_lock = threading.Lock()
+_maxsize = DEFAULT_TEMPLATE_CACHE_SIZE
+_hits = 0
+_misses = 0
+_memo_hits = 0
+_memo_misses = 0
+_memo_uncacheable = 0
+
+
+def has_template_syntax(string: str) -> bool:
+    """Check if the string contains a variable or python expression.
+
+    A string without "${{" and "$&{{" is always a constant, so it's
+    unnecessary to lex it.
+
+    Args:
+        string (str): The string to check.
+
+    Returns:
+        bool: True if the string needs to be parsed.
+
+    """
+    return "${{" in string or "$&{{" in string
+
+
+def get_template(string: str) -> Template:
+    """Get the parsed and compiled template.
+
+    The returned template is shared between callers. Don't modify its
+    expression.
+
+    Args:
+        string (str): The template string.
+
+    Returns:
+        Template: The template.
+
+    """
+    global _hits, _misses  # pylint: disable=W0603  # noqa: PLW0603
+
+    with _cache_lock:
+        template = _cache.get(string)
+        if template is not None:
+            _cache.move_to_end(string)
+            _hits += 1
+            return template
+        _misses += 1
+
+    # Parse it without lock. Parse errors are not cached.
+    expr = parse_expression(get_token(string))
+    template = Template(
+        string,
+        expr,
+        compile_expression(expr),
+        get_references(expr),
+    )
+
+    with _cache_lock:
+        if _maxsize > 0:
+            _cache[string] = template
+            while len(_cache) > _maxsize:
+                _cache.popitem(last=False)
+    return template
+
+
+def render_template(template: Template) -> Any:  # noqa: ANN401
+    """Render the template, reuse the last value if it's still valid.
+
+    Args:
+        template (Template): The template to render.
+
+    Returns:
+        Any: The rendered value.
+
+    """
+    # Statistics don't need to be exact, so they are not locked.
+    global _memo_hits, _memo_misses, _memo_uncacheable  # pylint: disable=W0603  # noqa: PLW0603
+
+    if template.references is None:
+        _memo_uncacheable += 1
+        return template.render()
+
+    generations = get_generations(template.references)
+    memo = template.memo
+    if memo is not None and memo[0] == generations:
+        _memo_hits += 1
+        return memo[1]
+
+    _memo_misses += 1
+    res = template.render()
+    template.memo = (generations, res)
+    return res
+
+
+def render_memo_info() -> RenderMemoInfo:
+    """Get the statistics of the memoized rendering.
+
+    Returns:
+        RenderMemoInfo: The statistics.
+
+    """
+    return RenderMemoInfo(_memo_hits, _memo_misses, _memo_uncacheable)
+
+
+def template_cache_info() -> TemplateCacheInfo:
+    """Get the statistics of the template cache.
+
+    Returns:
+        TemplateCacheInfo: The statistics.
+
+    """
+    with _cache_lock:
+        return TemplateCacheInfo(_hits, _misses, _maxsize, len(_cache))
+
+
+def clear_template_cache() -> None:
+    """Clear the template cache and reset the statistics."""
+    global _hits, _misses, _memo_hits, _memo_misses, _memo_uncacheable  # pylint: disable=W0603  # noqa: PLW0603
+
+    with _cache_lock:
+        _cache.clear()
+        _hits = 0
+        _misses = 0
+        _memo_hits = 0
+        _memo_misses = 0
+        _memo_uncacheable = 0
+
+
+def set_template_cache_size(maxsize: int) -> None:
+    """Set the max size of the template cache.
+
+    Args:
+        maxsize (int): The max count of cached templates. 0 disables the
+            cache.
+
+    """
+    global _maxsize  # pylint: disable=W0603  # noqa: PLW0603
+
+    if maxsize < 0:
+        msg = "'maxsize' must be a non-negative number"
+        raise ValueError(msg)
+
+    with _cache_lock:
+        _maxsize = maxsize
+        while len(_cache) > _maxsize:
+            _cache.popitem(last=False)
@@ -16,17 +16,24 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Check types of variables with substitution support.
 
-"""Check types of variables with substitution support."""
+A type is compiled to a predicate function the first time it's checked, and
+the predicate is cached. Element types of containers are checked once for
+every distinct type instead of once for every element.
+"""
 
 import warnings
+from collections.abc import Callable, Iterable
 from types import EllipsisType, GenericAlias, UnionType
 from typing import Any, Generic, TypeVar, cast, get_args, get_origin
 
-__all__ = ["is_instance"]
+__all__ = ["TypeChecker", "compile_type_checker", "is_instance"]
 
 T = TypeVar("T")
 
+TypeChecker = Callable[[Any], bool]
+
 
 class AutoFormatDict(dict[str, Any]):
     """AutoFormatDict type for TESTING."""
@@ -65,83 +72,218 @@ def rubisco_isinstance(obj: Any, objtype: type | UnionType) -> bool:  # noqa: AN
     return isinstance(obj, objtype)
 
 
-def _is_instance_generic_alias_dict(
-    obj: dict[Any, Any],
+def _plain_classes(objtype: object) -> tuple[type, ...] | None:
+    """Get the classes if the type is a plain class or a union of them.
+
+    Instance check of a plain class only depends on the type of the object.
+    ABCs and typing special forms are not plain classes.
+
+    Returns:
+        tuple[type, ...] | None: The classes, or None if any of them is not
+            a plain class.
+
+    """
+    if get_origin(objtype) is UnionType:
+        classes: list[type] = []
+        for arg in get_args(objtype):
+            sub = _plain_classes(arg)
+            if sub is None:
+                return None
+            classes.extend(sub)
+        return tuple(classes)
+    if type(objtype) is not type:
+        return None
+    name = getattr(objtype, "__name__", None)
+    if name == "AutoFormatList":
+        return (list,)
+    if name == "AutoFormatDict":
+        return (dict,)
+    return (cast("type", objtype),)
+
+
+def _compile_classes(classes: tuple[type, ...]) -> TypeChecker:
+    if object in classes:
+        return lambda _obj: True
+    names = tuple(
+        name
+        for cls, name in ((list, "AutoFormatList"), (dict, "AutoFormatDict"))
+        if cls in classes
+    )
+    if not names:
+        return lambda obj: isinstance(obj, classes)
+    return lambda obj: isinstance(obj, classes) or type(obj).__name__ in names
+
+
+def _compile_class(objtype: type | UnionType) -> TypeChecker:
+    """Compile `rubisco_isinstance(obj, objtype)`."""
+    classes = _plain_classes(objtype)
+    if classes is not None:
+        return _compile_classes(classes)
+    return lambda obj: rubisco_isinstance(obj, objtype)
+
+
+def _compile_all(
+    objtype: type | GenericAlias | UnionType | None,
+) -> Callable[[Iterable[Any]], bool]:
+    """Compile a checker which checks all the items of an iterable."""
+    check = compile_type_checker(objtype)
+    classes = None if objtype is None else _plain_classes(objtype)
+    if classes is None:
+        return lambda items: all(map(check, items))
+    if object in classes:
+        return lambda _items: True
+
+    def _check_all(items: Iterable[Any]) -> bool:
+        items = items if isinstance(items, list | tuple) else list(items)
+        types = set(map(type, items))
+        if types == {str} and str in classes:  # Fast path.
+            return True
+        if all(issubclass(t, classes) for t in types):
+            return True
+        # `isinstance` also respects `__class__`, so check items one by one.
+        return all(map(check, items))
+
+    return _check_all
+
+
+def _compile_dict(
     args: tuple[Any, ...],
-) -> bool:
+    check_container: TypeChecker,
+) -> TypeChecker:
     if len(args) != 2:  # noqa: PLR2004
-        msg = "Invalid generic type"
-        raise TypeError(msg)
-    keytype, valtype = args
-    keytype: type | GenericAlias | UnionType | None
-    valtype: type | GenericAlias | UnionType | None
-    if type(obj).__name__ == "AutoFormatDict":
-        return all(
-            is_instance(key, keytype) and is_instance(val, valtype)
-            for key, val in cast("AutoFormatDict", obj).orig_items()
-        )
-    return all(
-        is_instance(key, keytype) and is_instance(val, valtype)
-        for key, val in obj.items()
-    )
 
+        def _invalid(obj: Any) -> bool:  # noqa: ANN401
+            if not check_container(obj):
+                return False
+            msg = "Invalid generic type"
+            raise TypeError(msg)
 
-def _is_instance_generic_alias_tuple(
-    obj: Any,  # noqa: ANN401
+        return _invalid
+
+    check_keys = _compile_all(args[0])
+    check_values = _compile_all(args[1])
+
+    def _check(obj: Any) -> bool:  # noqa: ANN401
+        if not check_container(obj):
+            return False
+        if type(obj).__name__ == "AutoFormatDict":
+            items = cast("AutoFormatDict", obj).orig_items()
+        else:
+            items = obj.items()
+        keys: list[Any] = []
+        values: list[Any] = []
+        for key, value in items:
+            keys.append(key)
+            values.append(value)
+        return check_keys(keys) and check_values(values)
+
+    return _check
+
+
+def _compile_tuple(
     args: tuple[Any, ...],
-) -> bool:
-    if len(args) == 1:
-        argstype = (args[0], ...)
-    argstype = args
-
-    if argstype[-1] is Ellipsis:
-        argtype = args[0]
-        argtype: type | GenericAlias | UnionType | None
-        return all(is_instance(item, argtype) for item in obj)
-    for i, argtype in enumerate(args):
-        if i >= len(obj):
-            break
-        if not is_instance(obj[i], argtype):
+    check_container: TypeChecker,
+) -> TypeChecker:
+    if args[-1] is Ellipsis:
+        check_items = _compile_all(args[0])
+        return lambda obj: check_container(obj) and check_items(obj)
+
+    checks = [compile_type_checker(arg) for arg in args]
+
+    def _check(obj: Any) -> bool:  # noqa: ANN401
+        if not check_container(obj):
             return False
-    return True
+        # Only the existing items are checked.
+        return all(check(obj[i]) for i, check in enumerate(checks[: len(obj)]))
 
+    return _check
 
-def _is_instance_generic_alias(  # pylint: disable=R0911  # noqa: PLR0911
-    obj: Any,  # noqa: ANN401
+
+def _compile_generic_alias(  # pylint: disable=R0911  # noqa: PLR0911
     objtype: GenericAlias,
-) -> bool:
+) -> TypeChecker:
     orig = get_origin(objtype)
     # get_origin will return None, but type checker thinks it
     # returns a type always.
     if orig is None:  # type: ignore[arg-type]
-        msg = "Invalid generic type"
-        raise TypeError(msg)
 
-    if not rubisco_isinstance(obj, orig):
-        return False
+        def _invalid(_obj: Any) -> bool:  # noqa: ANN401
+            msg = "Invalid generic type"
+            raise TypeError(msg)
+
+        return _invalid
 
+    check_container = _compile_class(orig)
     args = get_args(objtype)
     if not args:
-        return True
+        return check_container
 
     if orig in (list, set, AutoFormatList):
-        argtype = args[0]
-        argtype: type | GenericAlias | UnionType | None
-        return all(is_instance(item, argtype) for item in obj)
+        check_items = _compile_all(args[0])
+        return lambda obj: check_container(obj) and check_items(obj)
     if orig is dict or orig.__name__ == "AutoFormatDict":
-        return _is_instance_generic_alias_dict(obj, args)
+        return _compile_dict(args, check_container)
     if orig is tuple:
-        return _is_instance_generic_alias_tuple(obj, args)
+        return _compile_tuple(args, check_container)
     if orig is EllipsisType:
         # Ellipsis is a valid type for all objects.
-        return True
+        return check_container
+
+    def _unsupported(obj: Any) -> bool:  # noqa: ANN401
+        if not check_container(obj):
+            return False
+        warnings.warn(
+            f"Unsupported generic type: {orig}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return check_container(obj)
+
+    return _unsupported
+
+
+def _compile(objtype: type | GenericAlias | UnionType | None) -> TypeChecker:
+    if objtype is None:
+        return lambda obj: obj is None
+
+    if get_origin(objtype) is UnionType:
+        classes = _plain_classes(objtype)
+        if classes is not None:
+            return _compile_classes(classes)
+        checks = [compile_type_checker(arg) for arg in get_args(objtype)]
+        return lambda obj: any(check(obj) for check in checks)
+
+    if isinstance(objtype, GenericAlias):
+        return _compile_generic_alias(objtype)
+
+    return _compile_class(cast("type", objtype))
+
+
+_checkers: dict[Any, TypeChecker] = {}
 
-    warnings.warn(
-        f"Unsupported generic type: {orig}",
-        RuntimeWarning,
-        stacklevel=2,
-    )
-    return rubisco_isinstance(obj, orig)
+
+def compile_type_checker(
+    objtype: type | GenericAlias | UnionType | None,
+) -> TypeChecker:
+    """Get the cached predicate function of a type.
+
+    Args:
+        objtype (type | GenericAlias | UnionType | None): Type or union of types
+            to check against.
+
+    Returns:
+        TypeChecker: A function which returns `is_instance(obj, objtype)`.
+
+    """
+    try:
+        return _checkers[objtype]
+    except KeyError:
+        pass
+    except TypeError:  # Unhashable.
+        return _compile(objtype)
+    checker = _compile(objtype)
+    _checkers[objtype] = checker
+    return checker
 
 
 def is_instance(
@@ -158,14 +300,4 @@ def is_instance(
             to check against.
 
     """
-    if objtype is None:
-        return obj is None
-
-    if get_origin(objtype) is UnionType:
-        return any(is_instance(obj, t) for t in get_args(objtype))
-
-    if rubisco_isinstance(objtype, GenericAlias):
-        ot = cast("GenericAlias", objtype)
-        return _is_instance_generic_alias(obj, ot)
-
-    return rubisco_isinstance(obj, cast("type", objtype))
+    return compile_type_checker(objtype)(obj)
@@ -28,7 +28,11 @@ original values when the context is exited.
 from types import TracebackType
 from typing import Any
 
-from rubisco.lib.variable.variable import pop_variables, push_variables
+from rubisco.lib.variable.variable import (
+    VariableFrame,
+    pop_frame,
+    push_frame,
+)
 
 __all__ = ["VariableContainer"]
 
@@ -45,6 +49,8 @@ class VariableContainer:
 
         """
         self._fmt = fmt or {}
+        # The same container can be entered again before it's exited.
+        self._frames: list[VariableFrame] = []
 
     def __enter__(self) -> "VariableContainer":
         """Enter the variable container.
@@ -53,8 +59,7 @@ class VariableContainer:
             VariableContainer: The variable container.
 
         """
-        for key, value in self._fmt.items():
-            push_variables(key, value)
+        self._frames.append(push_frame(self._fmt))
         return self
 
     def __exit__(
@@ -71,5 +76,4 @@ class VariableContainer:
             traceback (Any): The traceback.
 
         """
-        for key in self._fmt:
-            pop_variables(key)
+        pop_frame(self._frames.pop())
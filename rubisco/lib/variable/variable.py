@@ -17,23 +17,546 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-"""Rubisco variable system."""
+"""Rubisco variable system.
 
-from typing import Any
+Each variable has a stack of values, the last one is the current value. The
+stacks are plain lists, so reading a variable is a dict lookup and an index,
+without any lock.
+
+A frame is a group of variables pushed and popped together, e.g. the format
+dictionary of `format_str` or the variables of a matrix combination.
+
+Every push or pop of a variable gives it a new generation stamp. Caches of
+formatted templates compare the stamps of the variables they reference to
+know if they are still valid.
+
+The variables live in a `VariableScope`, and the current scope is a context
+variable. By default, everything shares the root scope. A thread or an
+asyncio task can run in a forked scope (see `fork_scope` and `enter_scope`)
+to have its own pushes. A forked scope shares the stacks of its parent and
+copies a stack when it's changed for the first time (copy-on-write).
+
+`variables` gives `VariableStackView`s instead of the stacks, so a stack
+changed through it is copied and stamped like `push_variables` does.
+"""
+
+import itertools
+from collections.abc import (
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+)
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, cast
 
-from rubisco.lib.stack import Stack
 from rubisco.lib.variable.callbacks import undefined_var_callbacks
 
 __all__ = [
+    "VariableFrame",
+    "VariableScope",
+    "VariableStack",
+    "VariableStackView",
+    "current_scope",
+    "enter_scope",
+    "fork_scope",
+    "get_generations",
     "get_variable",
     "has_variable",
+    "join_scope",
+    "notify_undefined_var",
+    "pop_frame",
     "pop_variables",
+    "push_frame",
     "push_variables",
+    "snapshot_scope",
     "variables",
 ]
 
-# The global variable container.
-variables: dict[str, Stack[Any]] = {}
+
+class VariableStack(list[Any]):
+    """The value stack of a variable.
+
+    `top`, `put`, `get` and `empty` are the same as `rubisco.lib.stack.Stack`
+    but never block.
+    """
+
+    def top(self) -> Any:  # noqa: ANN401
+        """Get the current value.
+
+        Returns:
+            Any: The top value of the stack.
+
+        """
+        return self[-1]
+
+    def put(self, value: Any) -> None:  # noqa: ANN401
+        """Push a value.
+
+        Args:
+            value (Any): The value to push.
+
+        """
+        self.append(value)
+
+    def get(self) -> Any:  # noqa: ANN401
+        """Pop the top value.
+
+        Returns:
+            Any: The top value of the stack.
+
+        """
+        return self.pop()
+
+    def empty(self) -> bool:
+        """Check if the stack is empty.
+
+        Returns:
+            bool: True if the stack is empty.
+
+        """
+        return not self
+
+
+# The names pushed by `push_frame`, in push order.
+VariableFrame = tuple[str, ...]
+
+# Global monotonic stamps, so a stamp is never reused for another value,
+# even in another scope.
+_stamps = itertools.count(1)
+
+
+class VariableScope(dict[str, VariableStack]):
+    """A variable container, maps the names to the stacks.
+
+    A scope should only be changed by one thread at the same time.
+    """
+
+    # The generation stamp of each variable which has been changed.
+    generations: dict[str, int]
+    # The names whose stacks are not shared with other scopes.
+    owned: set[str]
+    # The names which undefined variable callbacks could not resolve:
+    # name -> (generation, count of callbacks) when they were called.
+    unresolved: dict[str, tuple[int, int]]
+    # The stamp when it was forked. Variables changed after that have greater
+    # generation stamps.
+    forked_at: int
+
+    def __init__(self, parent: "VariableScope | None" = None) -> None:
+        """Initialize the scope.
+
+        Args:
+            parent (VariableScope | None): The scope to fork from. The
+                stacks are shared until they are changed. Defaults to None.
+
+        """
+        if parent is None:
+            super().__init__()
+            self.generations = {}
+            self.unresolved = {}
+            self.forked_at = 0
+        else:
+            super().__init__(parent)
+            self.generations = parent.generations.copy()
+            self.unresolved = parent.unresolved.copy()
+            # The parent must not change the shared stacks in place either.
+            parent.owned.clear()
+            self.forked_at = next(_stamps)
+        self.owned = set()
+
+    def own(self, name: str) -> VariableStack | None:
+        """Get the stack which can be changed in place.
+
+        Args:
+            name (str): The name of the variable.
+
+        Returns:
+            VariableStack | None: The stack. None if it doesn't exist.
+
+        """
+        stack = self.get(name)
+        if stack is None or name in self.owned:
+            return stack
+        stack = VariableStack(stack)
+        self[name] = stack
+        self.owned.add(name)
+        return stack
+
+    def __delitem__(self, name: str) -> None:
+        """Remove the variable.
+
+        Args:
+            name (str): The name of the variable.
+
+        """
+        super().__delitem__(name)
+        self.owned.discard(name)
+        self.generations[name] = next(_stamps)
+
+    def clear(self) -> None:
+        """Remove all the variables."""
+        for name in self:
+            self.generations[name] = next(_stamps)
+        super().clear()
+        self.owned.clear()
+
+
+_root_scope = VariableScope()
+_current_scope: ContextVar[VariableScope] = ContextVar(
+    "rubisco_variable_scope",
+    default=_root_scope,
+)
+
+
+def current_scope() -> VariableScope:
+    """Get the variable scope of the current context.
+
+    Returns:
+        VariableScope: The current scope.
+
+    """
+    return _current_scope.get()
+
+
+def fork_scope() -> VariableScope:
+    """Fork the current scope.
+
+    Fork it in the thread or task which owns the current scope, then pass
+    it to `enter_scope` in another one.
+
+    Returns:
+        VariableScope: The new scope, it has the same variables as the
+            current scope.
+
+    """
+    return VariableScope(current_scope())
+
+
+def join_scope(scope: VariableScope) -> None:
+    """Apply the variables changed in a forked scope to the current scope.
+
+    The stacks of the changed variables replace the current ones, variables
+    removed in the forked scope are removed too. The forked scope should not
+    be used after that.
+
+    Args:
+        scope (VariableScope): The scope forked from the current scope.
+
+    """
+    target = current_scope()
+    for name, generation in scope.generations.items():
+        if generation < scope.forked_at:
+            continue
+        stack = scope.get(name)
+        if stack is None:
+            if name in target:
+                del target[name]
+            continue
+        target[name] = stack
+        target.owned.discard(name)
+        target.generations[name] = next(_stamps)
+
+
+@contextmanager
+def enter_scope(
+    scope: VariableScope | None = None,
+) -> Generator[VariableScope]:
+    """Use the scope as the current scope in this context.
+
+    Args:
+        scope (VariableScope | None): The scope to use. Defaults to a
+            forked current scope.
+
+    Yields:
+        VariableScope: The scope.
+
+    """
+    if scope is None:
+        scope = fork_scope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+class VariableStackView(MutableSequence[Any]):
+    """The stack of a variable in a scope, which can be changed in place.
+
+    It reads the current stack of the variable every time. Changes are
+    applied to a stack owned by the scope and give the variable a new
+    generation stamp, like `push_variables` and `pop_variables`.
+    """
+
+    __slots__ = ("name", "scope")
+
+    def __init__(self, scope: VariableScope, name: str) -> None:
+        """Initialize the view.
+
+        Args:
+            scope (VariableScope): The scope of the variable.
+            name (str): The name of the variable.
+
+        """
+        self.scope = scope
+        self.name = name
+
+    def _stack(self) -> VariableStack:
+        return self.scope.get(self.name, VariableStack())
+
+    def _own(self) -> VariableStack:
+        stack = self.scope.own(self.name)
+        if stack is None:
+            stack = VariableStack()
+            self.scope[self.name] = stack
+            self.scope.owned.add(self.name)
+        return stack
+
+    def _changed(self, stack: VariableStack) -> None:
+        if not stack:
+            # Like `pop_variables`, an empty stack is removed.
+            dict.pop(self.scope, self.name, None)
+        self.scope.generations[self.name] = next(_stamps)
+
+    def __getitem__(self, index: Any) -> Any:  # noqa: ANN401
+        """Get the values at the index.
+
+        Args:
+            index (Any): The index or slice.
+
+        Returns:
+            Any: The value or the list of values.
+
+        """
+        return self._stack()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:  # noqa: ANN401
+        """Set the values at the index.
+
+        Args:
+            index (Any): The index or slice.
+            value (Any): The value or the values.
+
+        """
+        stack = self._own()
+        stack[index] = value
+        self._changed(stack)
+
+    def __delitem__(self, index: Any) -> None:  # noqa: ANN401
+        """Remove the values at the index.
+
+        Args:
+            index (Any): The index or slice.
+
+        """
+        stack = self._own()
+        del stack[index]
+        self._changed(stack)
+
+    def __len__(self) -> int:
+        """Get the count of the values.
+
+        Returns:
+            int: The count of the values.
+
+        """
+        return len(self._stack())
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the values with a list or another view.
+
+        Args:
+            other (object): The other object.
+
+        Returns:
+            bool: True if the values are equal.
+
+        """
+        if isinstance(other, VariableStackView):
+            other = other._stack()
+        return self._stack() == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the representation of the values.
+
+        Returns:
+            str: The repr of the values.
+
+        """
+        return repr(self._stack())
+
+    def insert(self, index: int, value: Any) -> None:  # noqa: ANN401
+        """Insert a value before the index.
+
+        Args:
+            index (int): The index.
+            value (Any): The value to insert.
+
+        """
+        if index >= len(self):
+            _push(self.scope, self.name, value)
+            return
+        stack = self._own()
+        stack.insert(index, value)
+        self._changed(stack)
+
+    def pop(self, index: int = -1) -> Any:  # noqa: ANN401
+        """Remove the value at the index.
+
+        Args:
+            index (int): The index. Defaults to the top value.
+
+        Returns:
+            Any: The removed value.
+
+        """
+        size = len(self)
+        if index in (-1, size - 1) and size:
+            return _pop(self.scope, self.name, None)
+        stack = self._own()
+        res = stack.pop(index)
+        self._changed(stack)
+        return res
+
+    def top(self) -> Any:  # noqa: ANN401
+        """Get the current value.
+
+        Returns:
+            Any: The top value of the stack.
+
+        """
+        return self._stack()[-1]
+
+    def put(self, value: Any) -> None:  # noqa: ANN401
+        """Push a value.
+
+        Args:
+            value (Any): The value to push.
+
+        """
+        _push(self.scope, self.name, value)
+
+    def get(self) -> Any:  # noqa: ANN401
+        """Pop the top value.
+
+        Returns:
+            Any: The top value of the stack.
+
+        """
+        return self.pop()
+
+    def empty(self) -> bool:
+        """Check if the stack is empty.
+
+        Returns:
+            bool: True if the stack is empty.
+
+        """
+        return not self._stack()
+
+
+class _ScopeProxy(MutableMapping[str, VariableStackView]):
+    """The variables of the current scope."""
+
+    def __getitem__(self, name: str) -> VariableStackView:
+        scope = current_scope()
+        if name not in scope:
+            raise KeyError(name)
+        return VariableStackView(scope, name)
+
+    def __setitem__(self, name: str, stack: Iterable[Any]) -> None:
+        scope = current_scope()
+        # Copied, so changing the given list will not change the variable.
+        scope[name] = VariableStack(stack)
+        scope.owned.add(name)
+        scope.generations[name] = next(_stamps)
+
+    def __delitem__(self, name: str) -> None:
+        del current_scope()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(current_scope())
+
+    def __len__(self) -> int:
+        return len(current_scope())
+
+    def __contains__(self, name: object) -> bool:
+        return name in current_scope()
+
+    def __repr__(self) -> str:
+        return repr(current_scope())
+
+    def get(self, name: str, default: Any = None) -> Any:  # noqa: ANN401
+        """Get the stack of the variable.
+
+        Args:
+            name (str): The name of the variable.
+            default (Any): The value to return if it's undefined.
+
+        Returns:
+            Any: The stack view or the default value.
+
+        """
+        scope = current_scope()
+        if name not in scope:
+            return default
+        return VariableStackView(scope, name)
+
+    def clear(self) -> None:
+        """Remove all the variables of the current scope."""
+        current_scope().clear()
+
+
+# The variables of the current scope.
+variables: MutableMapping[str, VariableStackView] = _ScopeProxy()
+
+
+def get_generations(names: Iterable[str]) -> tuple[int, ...]:
+    """Get the generation stamps of the given variables.
+
+    The stamp of a variable changes every time it is pushed or popped.
+
+    Args:
+        names (Iterable[str]): The names of the variables.
+
+    Returns:
+        tuple[int, ...]: The stamps. 0 if the variable never changed.
+
+    """
+    generations = current_scope().generations
+    return tuple(generations.get(name, 0) for name in names)
+
+
+def _push(scope: VariableScope, name: str, value: Any) -> None:  # noqa: ANN401
+    stack = scope.get(name)
+    if stack is None:
+        scope[name] = VariableStack((value,))
+        scope.owned.add(name)
+    elif name in scope.owned:
+        stack.append(value)
+    else:
+        cast("VariableStack", scope.own(name)).append(value)
+    scope.generations[name] = next(_stamps)
+
+
+def _pop(scope: VariableScope, name: str, default: Any) -> Any:  # noqa: ANN401
+    stack = scope.get(name)
+    if stack is None:
+        return default
+    if name not in scope.owned:
+        stack = cast("VariableStack", scope.own(name))
+    res = stack.pop()
+    if not stack:
+        # A stale name in `owned` is harmless, a new stack will be owned.
+        dict.__delitem__(scope, name)
+    scope.generations[name] = next(_stamps)
+    return res
 
 
 def push_variables(
@@ -47,11 +570,7 @@ def push_variables(
         value (Any): The value of the variable.
 
     """
-    if name in variables:
-        variables[name].put(value)
-    else:
-        variables[name] = Stack()
-        variables[name].put(value)
+    _push(current_scope(), name, value)
 
 
 def pop_variables(
@@ -72,12 +591,35 @@ def pop_variables(
         Any: The top value of the given variable.
 
     """
-    if name in variables:
-        res = variables[name].get()
-        if variables[name].empty():
-            del variables[name]
-        return res
-    return default
+    return _pop(current_scope(), name, default)
+
+
+def push_frame(values: Mapping[str, Any]) -> VariableFrame:
+    """Push all the variables in the mapping as a frame.
+
+    Args:
+        values (Mapping[str, Any]): The names and values of the variables.
+
+    Returns:
+        VariableFrame: The frame. Pass it to `pop_frame` to pop it.
+
+    """
+    scope = current_scope()
+    for name, value in values.items():
+        _push(scope, name, value)
+    return tuple(values)
+
+
+def pop_frame(frame: VariableFrame) -> None:
+    """Pop the variables pushed by `push_frame`.
+
+    Args:
+        frame (VariableFrame): The frame returned by `push_frame`.
+
+    """
+    scope = current_scope()
+    for name in reversed(frame):
+        _pop(scope, name, None)
 
 
 def has_variable(
@@ -92,7 +634,76 @@ def has_variable(
         bool: True if the variable exists, False otherwise.
 
     """
-    return name in variables
+    return name in current_scope()
+
+
+def notify_undefined_var(name: str) -> VariableStack | None:
+    """Call the undefined variable callbacks for a missing variable.
+
+    If the callbacks could not define it, they will not be called again for
+    this name until it's pushed or popped, or a new callback is added.
+
+    Args:
+        name (str): The name of the variable.
+
+    Returns:
+        VariableStack | None: The stack of the variable if the callbacks
+            defined it.
+
+    """
+    scope = current_scope()
+    key = (scope.generations.get(name, 0), len(undefined_var_callbacks))
+    if scope.unresolved.get(name) == key:
+        return None
+
+    for callback in undefined_var_callbacks:
+        callback(name)
+
+    stack = scope.get(name)
+    if stack is None:
+        # Callbacks may change the variables, so get the key again.
+        key = (scope.generations.get(name, 0), len(undefined_var_callbacks))
+        scope.unresolved[name] = key
+    return stack
+
+
+def snapshot_scope(
+    names: Iterable[str] | None = None,
+    values: Mapping[str, Any] | None = None,
+) -> VariableScope:
+    """Flatten the current variables to a new scope.
+
+    Only the top value of each variable is kept. Missing variables are
+    resolved by the undefined variable callbacks now, and the callbacks are
+    not called again for them in the snapshot.
+
+    Args:
+        names (Iterable[str] | None): The variables to keep. Defaults to
+            all the variables of the current scope.
+        values (Mapping[str, Any] | None): Extra variables, they hide the
+            current ones. Defaults to None.
+
+    Returns:
+        VariableScope: The snapshot. Use it with `enter_scope`.
+
+    """
+    scope = current_scope()
+    values = values or {}
+    snapshot = VariableScope()
+    for name in scope if names is None else names:
+        if name in values:
+            continue
+        stack = scope.get(name)
+        if stack is None:
+            stack = notify_undefined_var(name)
+        if stack is None:
+            snapshot.unresolved[name] = (0, len(undefined_var_callbacks))
+            continue
+        snapshot[name] = VariableStack((stack[-1],))
+    for name, value in values.items():
+        snapshot[name] = VariableStack((value,))
+    snapshot.owned.update(snapshot)
+    return snapshot
 
 
 def get_variable(
@@ -107,8 +718,6 @@ def get_variable(
         default (Any): The default value of the variable.
             Defaults to None. If it is None and the variable is not found,
             raise KeyError.
-        src_ref (dict[str, Stack]): The source dictionary.
-            Defaults to `variables`, the global variable container.
 
     Returns:
         Any: The value of the given variable.
@@ -117,15 +726,14 @@ def get_variable(
         KeyError: If the variable is not found.
 
     """
-    if name in variables:
-        return variables[name].top()
+    stack = current_scope().get(name)
+    if stack is not None:
+        return stack[-1]
 
     # If the variable is not found, call the callbacks.
-    for callback in undefined_var_callbacks:
-        callback(name)
-
-    if name in variables:
-        return variables[name].top()
+    stack = notify_undefined_var(name)
+    if stack is not None:
+        return stack[-1]
 
     if default is None:
         raise KeyError(name)
@@ -19,9 +19,9 @@
 
 """Rubisco variable system."""
 
+from collections.abc import MutableMapping
 from typing import Any
 
-from rubisco.lib.stack import Stack
 from rubisco.lib.variable import (
     AutoFormatDict,
     AutoFormatList,
@@ -34,10 +34,12 @@ from rubisco.lib.variable import (
     pop_variables,
     push_variables,
 )
-from rubisco.lib.variable import (
-    variables as _variables,
-)
 from rubisco.lib.variable.fast_format_str import fast_format_str
+from rubisco.lib.variable.variable import (
+    VariableStackView,
+    current_scope,
+    variables,
+)
 
 __all__ = [
     "AutoFormatDict",
@@ -57,18 +59,20 @@ __all__ = [
 ]
 
 
-def get_orig_variables() -> dict[str, Stack[Any]]:
+def get_orig_variables() -> MutableMapping[str, VariableStackView]:
     """Get original variables list with stack info.
 
     Warning:
         This function will return the original variables list, if you update
-        the returned dictionary, it will update the original variables list.
+        the returned dictionary or its stacks, it will update the original
+        variables list of the current variable scope.
 
     Returns:
-        dict[str, Stack[Any]]: The original variables list with stack info.
+        MutableMapping[str, VariableStackView]: The original variables list
+            with stack info, of the current variable scope.
 
     """
-    return _variables
+    return variables
 
 
 def get_variables() -> dict[str, Any]:
@@ -78,4 +82,4 @@ def get_variables() -> dict[str, Any]:
         dict[str, Any]: The variables list.
 
     """
-    return {k: v.top() for k, v in _variables.items()}
+    return {k: v[-1] for k, v in current_scope().items()}
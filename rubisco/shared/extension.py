@@ -285,6 +285,10 @@ def load_extension(
             )
 
         logger.info("Loading extension '%s'...", ext_info.name)
+        call_ktrigger(
+            IKernelTrigger.pre_load_extension,
+            ext_name=ext_info.name,
+        )
 
         # Get the extension instance.
         instance = _get_extension_instance(path / ext_info.name)
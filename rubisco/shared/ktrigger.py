@@ -25,9 +25,13 @@ Interface can do something before or after kernel operations.
 
 from __future__ import annotations
 
+import sys
+import threading
 from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import partial
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.l10n import _
@@ -35,12 +39,14 @@ from rubisco.lib.log import logger
 from rubisco.lib.variable import format_str
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
     from pathlib import Path
 
     from rubisco.envutils.env import RUEnvironment
     from rubisco.envutils.packages import ExtensionPackageInfo
     from rubisco.kernel.project_config import ProjectConfigration
     from rubisco.kernel.workflow.step import Step, Workflow
+    from rubisco.kernel.workflow.steps.matrix import MatrixJobResult
     from rubisco.lib.process import Process
     from rubisco.lib.variable.autoformatdict import AutoFormatDict
     from rubisco.lib.version import Version
@@ -48,8 +54,11 @@ if TYPE_CHECKING:
 
 __all__ = [
     "IKernelTrigger",
+    "KTriggerBuffer",
     "bind_ktrigger_interface",
+    "buffer_ktriggers",
     "call_ktrigger",
+    "get_ktrigger_buffer",
 ]
 
 
@@ -69,6 +78,11 @@ def _null_trigger(
 class IKernelTrigger:  # pylint: disable=too-many-public-methods
     """Kernel trigger interface."""
 
+    # False if the KTrigger is called immediately even in buffered contexts,
+    # e.g. profilers. Then it's called from the worker threads, and it must
+    # be thread-safe.
+    buffered: ClassVar[bool] = True
+
     def pre_exec_process(self, *, proc: Process) -> None:
         """Pre-exec process.
 
@@ -309,6 +323,15 @@ class IKernelTrigger:  # pylint: disable=too-many-public-methods
         """
         _null_trigger("post_run_workflow_step", step=step)
 
+    def on_step_up_to_date(self, *, step: Step) -> None:
+        """When a step is skipped because its fingerprint is unchanged.
+
+        Args:
+            step (Step): The step instance.
+
+        """
+        _null_trigger("on_step_up_to_date", step=step)
+
     def pre_run_workflow(self, *, workflow: Workflow) -> None:
         """When a workflow is started.
 
@@ -337,7 +360,7 @@ class IKernelTrigger:  # pylint: disable=too-many-public-methods
         _null_trigger("pre_run_matrix", variables=variables)
 
     def post_run_matrix(self, *, variables: AutoFormatDict) -> None:
-        """When a matrix job is finished.
+        """When a matrix job is finished, even if it failed.
 
         Args:
             variables (AutoFormatDict): The variables.
@@ -345,6 +368,15 @@ class IKernelTrigger:  # pylint: disable=too-many-public-methods
         """
         _null_trigger("post_run_matrix", variables=variables)
 
+    def on_matrix_summary(self, *, results: list[MatrixJobResult]) -> None:
+        """When all jobs of a parallel matrix are finished.
+
+        Args:
+            results (list[MatrixJobResult]): The results of the jobs.
+
+        """
+        _null_trigger("on_matrix_summary", results=results)
+
     def on_mkdir(self, *, path: Path) -> None:
         """On we are creating directories.
 
@@ -403,6 +435,15 @@ class IKernelTrigger:  # pylint: disable=too-many-public-methods
         """
         _null_trigger("on_remove", path=path)
 
+    def pre_load_extension(self, *, ext_name: str) -> None:
+        """Before loading a extension.
+
+        Args:
+            ext_name (str): Extension name.
+
+        """
+        _null_trigger("pre_load_extension", ext_name=ext_name)
+
     def on_extension_loaded(
         self,
         *,
@@ -634,6 +675,133 @@ class IKernelTrigger:  # pylint: disable=too-many-public-methods
 # KTrigger instances.
 ktriggers: dict[str, IKernelTrigger] = {}
 
+# KTriggers which ask the user or abort the operation. They can't be deferred.
+_INTERACTIVE_KTRIGGERS = frozenset(
+    {
+        "file_exists",
+        "on_syspkg_installation_skip",
+        "on_verify_uninstall_extension",
+    },
+)
+
+# Serializes the terminal output of buffered contexts.
+_output_lock = threading.RLock()
+
+
+class KTriggerBuffer:
+    """Deferred KTrigger calls and process output.
+
+    Jobs running in parallel write their output here instead of the terminal.
+    `flush` replays it in one piece, so the outputs of different jobs are not
+    interleaved.
+
+    A nested buffer, like the one of a matrix job in a parallel workflow
+    step, is flushed to its parent buffer instead of the terminal.
+    """
+
+    parent: KTriggerBuffer | None
+    _items: list[tuple[str, dict[str, Any]] | str]
+
+    def __init__(self, parent: KTriggerBuffer | None = None) -> None:
+        """Create an empty buffer.
+
+        Args:
+            parent (KTriggerBuffer | None, optional): The buffer to flush to.
+                Defaults to None. If it's None, flush to the buffer of the
+                current context when flushing, or the terminal.
+
+        """
+        self.parent = parent
+        self._items = []
+
+    def add_call(self, name: str, kwargs: dict[str, Any]) -> None:
+        """Defer a KTrigger call.
+
+        Args:
+            name (str): KTrigger's name.
+            kwargs (dict[str, Any]): Keyword arguments.
+
+        """
+        self._items.append((name, kwargs))
+
+    def write(self, data: str) -> None:
+        """Defer the raw output of a process.
+
+        Args:
+            data (str): The output.
+
+        """
+        if data:
+            self._items.append(data)
+
+    def flush(self) -> None:
+        """Replay the deferred calls and output, then clear the buffer.
+
+        They are moved to the parent buffer if any, otherwise replayed to
+        the terminal.
+        """
+        parent = self.parent
+        if parent is None:
+            parent = _ktrigger_buffer.get()
+        with _output_lock:
+            items, self._items = self._items, []
+            if parent is not None and parent is not self:
+                parent._items.extend(items)  # noqa: SLF001
+                return
+            for item in items:
+                if isinstance(item, str):
+                    sys.stdout.write(item)
+                    sys.stdout.flush()
+                else:
+                    _dispatch_ktrigger(*item, buffered=True)
+
+
+_ktrigger_buffer: ContextVar[KTriggerBuffer | None] = ContextVar(
+    "rubisco_ktrigger_buffer",
+    default=None,
+)
+
+
+@contextmanager
+def buffer_ktriggers(
+    parent: KTriggerBuffer | None = None,
+) -> Generator[KTriggerBuffer]:
+    """Defer the KTrigger calls in this context to a new buffer.
+
+    Interactive KTriggers are still called immediately, after flushing the
+    buffer and its parents. The caller should flush the buffer when the
+    context exits.
+
+    Args:
+        parent (KTriggerBuffer | None, optional): The buffer to flush to.
+            Defaults to the buffer of the current context. Context variables
+            are not inherited by threads, so pass it to the buffers created
+            in worker threads.
+
+    Yields:
+        KTriggerBuffer: The buffer.
+
+    """
+    if parent is None:
+        parent = _ktrigger_buffer.get()
+    buffer = KTriggerBuffer(parent)
+    token = _ktrigger_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _ktrigger_buffer.reset(token)
+
+
+def get_ktrigger_buffer() -> KTriggerBuffer | None:
+    """Get the KTrigger buffer of the current context.
+
+    Returns:
+        KTriggerBuffer | None: The buffer. None if the KTriggers are called
+            immediately.
+
+    """
+    return _ktrigger_buffer.get()
+
 
 def bind_ktrigger_interface(kid: str, instance: IKernelTrigger) -> None:
     """Bind a KTrigger instance with a id.
@@ -682,7 +850,32 @@ def call_ktrigger(
         repr(kwargs),
         repr(list(ktriggers.keys())),
     )
-    for instance in ktriggers.values():
+    buffer = _ktrigger_buffer.get()
+    if buffer is None:
+        _dispatch_ktrigger(name, kwargs)
+    elif name not in _INTERACTIVE_KTRIGGERS:
+        _dispatch_ktrigger(name, kwargs, buffered=False)
+        buffer.add_call(name, kwargs)
+    else:
+        with _output_lock:
+            while buffer is not None:
+                buffer.flush()
+                buffer = buffer.parent
+            _dispatch_ktrigger(name, kwargs)
+
+
+def _dispatch_ktrigger(
+    name: str,
+    kwargs: dict[str, Any],
+    *,
+    buffered: bool | None = None,
+) -> None:
+    # Only call the (un)buffered KTriggers if `buffered` is given.
+    for instance in list(ktriggers.values()):
+        if buffered is not None and (
+            getattr(instance, "buffered", True) != buffered
+        ):
+            continue
         getattr(instance, name, partial(_null_trigger, name))(**kwargs)
 
 
@@ -0,0 +1,383 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Trace the kernel operations as Chrome trace events.
+
+`TraceKTrigger` records the wall time and the thread CPU time of workflows,
+steps, matrix jobs, processes, extension loads, progressive tasks (archives,
+downloads, ...) and speed tests through the `pre_*`/`post_*` KTriggers. The
+trace can be saved as Chrome Trace Event JSON, and opened in Perfetto
+(https://ui.perfetto.dev) or chrome://tracing.
+
+The CPU time of the child processes is not recorded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from rubisco.config import APP_VERSION, DEFAULT_CHARSET
+from rubisco.shared.ktrigger import IKernelTrigger
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+    from pathlib import Path
+
+    from rubisco.envutils.packages import ExtensionPackageInfo
+    from rubisco.kernel.workflow.step import Step, Workflow
+    from rubisco.lib.process import Process
+    from rubisco.lib.variable.autoformatdict import AutoFormatDict
+    from rubisco.shared.extension import IRUExtension
+
+__all__ = ["TraceKTrigger"]
+
+
+@dataclass
+class _Span:
+    name: str
+    category: str
+    start: int  # Wall time in nanoseconds.
+    cpu_start: int  # Thread CPU time in nanoseconds.
+    tid: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class TraceKTrigger(IKernelTrigger):  # pylint: disable=R0904
+    """Record the time of kernel operations as Chrome trace events."""
+
+    # Record the time when the operations happen, not when their output
+    # is flushed.
+    buffered: ClassVar[bool] = False
+
+    _origin: int
+    _lock: threading.Lock
+    _spans: dict[tuple[str, Hashable, int], _Span]
+    _events: list[dict[str, Any]]
+    _threads: dict[int, str]
+
+    def __init__(self) -> None:
+        """Start tracing."""
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._events = []
+        self._threads = {}
+
+    def _now(self) -> int:
+        return time.perf_counter_ns() - self._origin
+
+    def _tid(self) -> int:
+        thread = threading.current_thread()
+        tid = threading.get_native_id()
+        self._threads.setdefault(tid, thread.name)
+        return tid
+
+    def _begin(
+        self,
+        category: str,
+        key: Hashable,
+        name: str,
+        **args: Any,  # noqa: ANN401
+    ) -> None:
+        with self._lock:
+            tid = self._tid()
+            self._spans[(category, key, tid)] = _Span(
+                name,
+                category,
+                self._now(),
+                time.thread_time_ns(),
+                tid,
+                args,
+            )
+
+    def _end(
+        self,
+        category: str,
+        key: Hashable,
+        **args: Any,  # noqa: ANN401
+    ) -> None:
+        end = self._now()
+        cpu_end = time.thread_time_ns()
+        with self._lock:
+            span = self._spans.pop((category, key, self._tid()), None)
+            if span is None:
+                return
+            span.args.update(args)
+            self._events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start / 1000,
+                    "dur": (end - span.start) / 1000,
+                    "tts": span.cpu_start / 1000,
+                    "tdur": (cpu_end - span.cpu_start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": span.tid,
+                    "args": span.args,
+                },
+            )
+
+    def _update(
+        self,
+        category: str,
+        key: Hashable,
+        **args: Any,  # noqa: ANN401
+    ) -> None:
+        with self._lock:
+            span = self._spans.get((category, key, self._tid()))
+            if span is not None:
+                span.args.update(args)
+
+    def get_events(self) -> list[dict[str, Any]]:
+        """Get the trace events recorded so far.
+
+        Returns:
+            list[dict[str, Any]]: The Chrome trace events. Unfinished
+                operations (e.g. a failed step) are begin events without
+                end.
+
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            events.extend(self._events)
+            events.extend(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "B",
+                    "ts": span.start / 1000,
+                    "pid": pid,
+                    "tid": span.tid,
+                    "args": {**span.args, "unfinished": True},
+                }
+                for span in self._spans.values()
+            )
+        return events
+
+    def save(self, file: Path) -> None:
+        """Save the trace as Chrome Trace Event JSON.
+
+        Args:
+            file (Path): The output file.
+
+        """
+        trace = {
+            "traceEvents": self.get_events(),
+            "displayTimeUnit": "ms",
+            "otherData": {"rubisco-version": str(APP_VERSION)},
+        }
+        with file.open("w", encoding=DEFAULT_CHARSET) as f:
+            json.dump(trace, f, default=str)
+
+    def pre_exec_process(self, *, proc: Process) -> None:
+        """Pre-exec process.
+
+        Args:
+            proc (Process): Process instance.
+
+        """
+        self._begin("process", id(proc), proc.origin_cmd, cwd=str(proc.cwd))
+
+    def post_exec_process(
+        self,
+        *,
+        proc: Process,
+        retcode: int,
+        raise_exc: bool,  # noqa: ARG002 # pylint: disable=W0613
+    ) -> None:
+        """Post-exec process.
+
+        Args:
+            proc (Process): Process instance.
+            retcode (int): Return code.
+            raise_exc (bool): If raise exception.
+
+        """
+        self._end("process", id(proc), retcode=retcode)
+
+    def on_new_task(
+        self,
+        *,
+        task_start_msg: str,
+        task_name: str,
+        total: float,
+    ) -> None:
+        """When a progressive task is created.
+
+        Args:
+            task_start_msg (str): Task start message.
+            task_name (str): Task name.
+            total (float): Total steps.
+
+        """
+        self._begin(
+            "task",
+            task_name,
+            task_name,
+            message=task_start_msg,
+            total=total,
+        )
+
+    def on_finish_task(self, *, task_name: str) -> None:
+        """When a progressive task is finished.
+
+        Args:
+            task_name (str): Task name.
+
+        """
+        self._end("task", task_name)
+
+    def pre_speedtest(self, *, host: str) -> None:
+        """When a speed test task is started.
+
+        Args:
+            host (str): Host of the task.
+
+        """
+        self._begin("speedtest", host, host)
+
+    def post_speedtest(self, *, host: str, speed: int) -> None:
+        """When a speed test task is finished.
+
+        Args:
+            host (str): Host of the task.
+            speed (int): Speed of the task.
+
+        """
+        self._end("speedtest", host, speed=speed)
+
+    def pre_run_workflow_step(self, *, step: Step) -> None:
+        """When a workflow step is started.
+
+        Args:
+            step (Step): The step.
+
+        """
+        self._begin(
+            "step",
+            id(step),
+            step.name or step.global_id,
+            id=step.global_id,
+            type=type(step).__name__,
+        )
+
+    def post_run_workflow_step(self, *, step: Step) -> None:
+        """When a workflow step is finished.
+
+        Args:
+            step (Step): The step.
+
+        """
+        self._end("step", id(step))
+
+    def on_step_up_to_date(self, *, step: Step) -> None:
+        """When a step is skipped because it's up to date.
+
+        Args:
+            step (Step): The step.
+
+        """
+        self._update("step", id(step), up_to_date=True)
+
+    def pre_run_workflow(self, *, workflow: Workflow) -> None:
+        """When a workflow is started.
+
+        Args:
+            workflow (Workflow): The workflow.
+
+        """
+        self._begin(
+            "workflow",
+            id(workflow),
+            workflow.name or workflow.id,
+            id=workflow.id,
+        )
+
+    def post_run_workflow(self, *, workflow: Workflow) -> None:
+        """When a workflow is finished.
+
+        Args:
+            workflow (Workflow): The workflow.
+
+        """
+        self._end("workflow", id(workflow))
+
+    def pre_run_matrix(self, *, variables: AutoFormatDict) -> None:
+        """When a matrix job is started.
+
+        Args:
+            variables (AutoFormatDict): The variables of the job.
+
+        """
+        values = {str(key): str(val) for key, val in variables.items()}
+        self._begin(
+            "matrix",
+            id(variables),
+            ", ".join(f"{key}={val}" for key, val in values.items()),
+            **values,
+        )
+
+    def post_run_matrix(self, *, variables: AutoFormatDict) -> None:
+        """When a matrix job is finished.
+
+        Args:
+            variables (AutoFormatDict): The variables of the job.
+
+        """
+        self._end("matrix", id(variables))
+
+    def pre_load_extension(self, *, ext_name: str) -> None:
+        """Before loading a extension.
+
+        Args:
+            ext_name (str): Extension name.
+
+        """
+        self._begin("extension", ext_name, ext_name)
+
+    def on_extension_loaded(
+        self,
+        *,
+        instance: IRUExtension,  # noqa: ARG002 # pylint: disable=W0613
+        ext_info: ExtensionPackageInfo,
+    ) -> None:
+        """On a extension loaded.
+
+        Args:
+            instance (IRUExtension): Extension instance.
+            ext_info (ExtensionPackageInfo): Extension information.
+
+        """
+        self._end("extension", ext_info.name)
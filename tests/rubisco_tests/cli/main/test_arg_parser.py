@@ -0,0 +1,78 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.cli.main.arg_parser module."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[4]
+
+
+def _run_cli(cwd: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")]),
+    )
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "rubisco", *args],
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=120,
+    )
+
+
+class TestArgParser:
+    """Test the options of the full argument parser."""
+
+    @pytest.mark.parametrize(
+        "args",
+        [["-j", "2"], ["-j2"], ["--jobs", "2"], ["--jobs=2"]],
+    )
+    def test_jobs(self, tmp_path: Path, args: list[str]) -> None:
+        """Test the value of '-j' is not taken as a command."""
+        res = _run_cli(tmp_path, *args, "version")
+        if res.returncode != 0:
+            pytest.fail(f"'{' '.join(args)}' failed: {res.stderr}")
+
+    def test_jobs_invalid(self, tmp_path: Path) -> None:
+        """Test '-j' needs an integer."""
+        res = _run_cli(tmp_path, "-j", "x", "version")
+        if res.returncode == 0 or "invalid int value" not in res.stderr:
+            pytest.fail(f"'-j x' should be rejected: {res.stderr}")
+
+    @pytest.mark.parametrize(
+        "args",
+        [["--trace", "out.json"], ["--trace=out.json"]],
+    )
+    def test_trace(self, tmp_path: Path, args: list[str]) -> None:
+        """Test the value of '--trace' is not taken as a command."""
+        res = _run_cli(tmp_path, *args, "version")
+        if res.returncode != 0:
+            pytest.fail(f"'{' '.join(args)}' failed: {res.stderr}")
+        if not (tmp_path / "out.json").is_file():
+            pytest.fail("The trace file should be saved.")
@@ -0,0 +1,52 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Fixtures of the workflow tests."""
+
+from collections.abc import Callable, Generator
+
+import pytest
+
+from rubisco.kernel.workflow import register_step_type
+from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.steps import step_contributes, step_types
+
+RegisterStep = Callable[[str, type[Step], list[str]], None]
+
+
+@pytest.fixture
+def register_step() -> Generator[RegisterStep]:
+    """Register step types for a test, and remove them after it.
+
+    Yields:
+        RegisterStep: A function like `register_step_type`.
+
+    """
+    registered: list[tuple[str, type[Step], bool]] = []
+
+    def _register(name: str, cls: type[Step], contributes: list[str]) -> None:
+        registered.append((name, cls, cls in step_contributes))
+        register_step_type(name, cls, contributes)
+
+    yield _register
+
+    for name, cls, existed in reversed(registered):
+        step_types.pop(name, None)
+        if not existed:
+            step_contributes.pop(cls, None)
@@ -0,0 +1,133 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.background module."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from rubisco.kernel.workflow import run_inline_workflow
+from rubisco.lib.exceptions import RUShellExecutionError, RUValueError
+from rubisco.lib.variable import AutoFormatDict
+from rubisco.shared.ktrigger import IKernelTrigger, bind_ktrigger_interface
+
+
+class _BackgroundKTrigger(IKernelTrigger):
+    outputs: list[str]
+    warnings: list[str]
+
+    def __init__(self) -> None:
+        self.outputs = []
+        self.warnings = []
+
+    def on_output(self, *, message: str, raw: bool = True) -> None:
+        _ = raw
+        self.outputs.append(message)
+
+    def on_warning(self, *, message: str) -> None:
+        self.warnings.append(message)
+
+
+class TestBackgroundStep:
+    """Test background steps and WaitStep."""
+
+    kt: _BackgroundKTrigger
+
+    @classmethod
+    def setup_class(cls) -> None:
+        """Init test suites."""
+        cls.kt = _BackgroundKTrigger()
+        bind_ktrigger_interface("test_background", cls.kt)
+
+    def setup_method(self) -> None:
+        """Clear the outputs."""
+        self.kt.outputs.clear()
+        self.kt.warnings.clear()
+
+    def _run(self, *steps: dict[str, object]) -> None:
+        run_inline_workflow(
+            [AutoFormatDict(step) for step in steps],
+            "test_bg",
+        )
+
+    def test_wait(self) -> None:
+        """Test waiting the background steps."""
+        self._run(
+            {"id": "a", "popen": "echo a", "background": True},
+            {
+                "id": "b",
+                "run": "exit 3",
+                "background": True,
+                "fail-on-error": False,
+            },
+            {"echo": "${{ test_bg.a.handle }}"},
+            {"wait": ["a", "b"]},
+            {"echo": "${{ test_bg.a.stdout }}|${{ test_bg.b.retcode }}"},
+        )
+        if self.kt.outputs != ["test_bg.a", "a\n|3"]:
+            pytest.fail(f"Wrong outputs: {self.kt.outputs}")
+
+    def test_fail(self) -> None:
+        """Test raising the error of a background step when it's waited."""
+        pytest.raises(
+            RUShellExecutionError,
+            self._run,
+            {"id": "a", "run": "exit 1", "background": True},
+            {"wait": "a"},
+        )
+        pytest.raises(
+            RUValueError,
+            self._run,
+            {"wait": "not-exists"},
+        )
+
+    def test_terminate(self) -> None:
+        """Test terminating the background steps."""
+        start = time.monotonic()
+        self._run(
+            {"id": "a", "run": "sleep 30", "background": True},
+            {"wait": "a", "terminate": True},
+            {"id": "b", "run": "sleep 30", "background": True},
+        )
+        if time.monotonic() - start > 10:  # noqa: PLR2004
+            pytest.fail("Background steps are not terminated.")
+        if len(self.kt.warnings) != 1 or "test_bg.b" not in self.kt.warnings[0]:
+            pytest.fail(f"Wrong warnings: {self.kt.warnings}")
+
+    def test_not_skipped(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test background steps are never skipped by their fingerprints."""
+        monkeypatch.chdir(tmp_path)
+        for _ in range(2):
+            pytest.raises(
+                RUShellExecutionError,
+                self._run,
+                {
+                    "id": "a",
+                    "run": "touch out.txt && exit 1",
+                    "background": True,
+                    "outputs": "out.txt",
+                },
+                {"wait": "a"},
+            )
@@ -0,0 +1,74 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.cache module."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from rubisco.kernel.workflow import load_workflow_file
+from rubisco.kernel.workflow.cache import WORKFLOW_CACHE_DIR
+
+
+class TestWorkflowCache:
+    """Test the parsed workflow file cache."""
+
+    def test_cache(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test loading the workflow from cache."""
+        monkeypatch.chdir(tmp_path)
+        file = Path("wf.yml")
+        file.write_text("name: Test\nsteps:\n  - echo: a\n")
+
+        data = load_workflow_file(file)
+        if data["name"] != "Test" or data["steps"][0]["echo"] != "a":
+            pytest.fail("Failed to load the workflow.")
+        if len(list(WORKFLOW_CACHE_DIR.glob("*.pickle"))) != 1:
+            pytest.fail("The cache is not written.")
+        if load_workflow_file(file) != data:
+            pytest.fail("The cached workflow is different.")
+
+        # Same size and mtime, only the hash is changed.
+        stat = file.stat()
+        file.write_text("name: Best\nsteps:\n  - echo: b\n")
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        data = load_workflow_file(file)
+        if data["name"] != "Best" or data["steps"][0]["echo"] != "b":
+            pytest.fail("The outdated cache is used.")
+
+    def test_broken_cache(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test ignoring the broken cache."""
+        monkeypatch.chdir(tmp_path)
+        file = Path("wf.json5")
+        file.write_text("{name: 'Test', steps: []}")
+        load_workflow_file(file)
+        for cache in WORKFLOW_CACHE_DIR.glob("*.pickle"):
+            cache.write_bytes(b"broken")
+
+        if load_workflow_file(file)["name"] != "Test":
+            pytest.fail("Failed to load the workflow.")
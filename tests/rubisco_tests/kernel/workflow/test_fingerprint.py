@@ -0,0 +1,174 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.fingerprint module."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from rubisco.kernel.workflow import run_inline_workflow
+from rubisco.kernel.workflow.step import Step
+from rubisco.lib.variable import AutoFormatDict, pop_variables, push_variables
+
+
+class _ConcatStep(Step):
+    """Concatenate the input files to the output file."""
+
+    runs: int = 0
+
+    def init(self) -> None:
+        """Initialize the step."""
+
+    def run(self) -> None:
+        """Run the step."""
+        type(self).runs += 1
+        dst = Path(self.raw_data.get("concat", valtype=str))
+        content = "".join(Path(src).read_text() for src in sorted(self.inputs))
+        dst.write_text(content)
+        push_variables(f"{self.global_id}.content", content)
+
+
+@pytest.fixture(autouse=True)
+def _register_steps(register_step: Callable[..., None]) -> None:
+    register_step("test-concat", _ConcatStep, ["concat"])
+
+
+class TestFingerprint:
+    """Test skipping the up-to-date steps."""
+
+    def _run(self) -> int:
+        runs = _ConcatStep.runs
+        run_inline_workflow(
+            [
+                AutoFormatDict(
+                    {
+                        "id": "concat",
+                        "concat": "out.txt",
+                        "name": "${{test_fp.name}}",
+                        "inputs": ["a.txt", "b.txt"],
+                        "outputs": "out.txt",
+                    },
+                ),
+            ],
+            "test_fp",
+        )
+        return _ConcatStep.runs - runs
+
+    def test_skip(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test skipping the step if nothing changed."""
+        monkeypatch.chdir(tmp_path)
+        push_variables("test_fp.name", "x")
+        try:
+            Path("a.txt").write_text("a")
+            Path("b.txt").write_text("b")
+            if self._run() != 1 or Path("out.txt").read_text() != "ab":
+                pytest.fail("The step should run at the first time.")
+            if self._run() != 0:
+                pytest.fail("The up-to-date step should be skipped.")
+
+            Path("b.txt").write_text("c")
+            if self._run() != 1 or Path("out.txt").read_text() != "ac":
+                pytest.fail("The step should run if an input changed.")
+
+            Path("out.txt").unlink()
+            if self._run() != 1:
+                pytest.fail("The step should run if an output is missing.")
+
+            push_variables("test_fp.name", "y")
+            if self._run() != 1:
+                pytest.fail("The step should run if a variable changed.")
+            if self._run() != 0:
+                pytest.fail("The up-to-date step should be skipped.")
+        finally:
+            pop_variables("test_fp.name")
+            pop_variables("test_fp.name")
+
+    def test_undefined_variable(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a step referencing an undefined variable."""
+        monkeypatch.chdir(tmp_path)
+        Path("a.txt").write_text("a")
+        step = AutoFormatDict(
+            {
+                "id": "concat",
+                "concat": "out.txt",
+                "name": "${{test_fp.undefined:fallback}}",
+                "inputs": "a.txt",
+                "outputs": "out.txt",
+            },
+        )
+        runs = _ConcatStep.runs
+        run_inline_workflow([step], "test_fp_undefined")
+        run_inline_workflow([step], "test_fp_undefined")
+        if _ConcatStep.runs - runs != 1:
+            pytest.fail("The up-to-date step should be skipped.")
+
+        push_variables("test_fp.undefined", "x")
+        try:
+            run_inline_workflow([step], "test_fp_undefined")
+        finally:
+            pop_variables("test_fp.undefined")
+        if _ConcatStep.runs - runs != 2:  # noqa: PLR2004
+            pytest.fail("The step should run if the variable is defined.")
+
+    def test_skipped_variables(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test the variables of a skipped step are pushed again."""
+        monkeypatch.chdir(tmp_path)
+        Path("a.txt").write_text("a")
+        Path("b.txt").write_text("b")
+        steps = [
+            AutoFormatDict(
+                {
+                    "id": "gen",
+                    "concat": "out.txt",
+                    "inputs": ["a.txt", "b.txt"],
+                    "outputs": "out.txt",
+                },
+            ),
+            AutoFormatDict(
+                {
+                    "id": "use",
+                    "concat": "${{test_fp_vars.gen.content}}.txt",
+                },
+            ),
+        ]
+        runs = _ConcatStep.runs
+        for _ in range(2):
+            run_inline_workflow(steps, "test_fp_vars")
+            if pop_variables("test_fp_vars.gen.content") != "ab":
+                pytest.fail("The step's variables should be pushed.")
+            pop_variables("test_fp_vars.use.content")
+            if not Path("ab.txt").is_file():
+                pytest.fail("The next step should read the variables.")
+            Path("ab.txt").unlink()
+        if _ConcatStep.runs - runs != 3:  # noqa: PLR2004
+            pytest.fail("The up-to-date step should be skipped.")
@@ -0,0 +1,274 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.steps.matrix module."""
+
+from collections.abc import Callable
+
+import pytest
+
+from rubisco.kernel.workflow import run_inline_workflow
+from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.steps.matrix import (
+    MatrixJobResult,
+    MatrixJobStatus,
+)
+from rubisco.lib.exceptions import RUShellExecutionError, RUValueError
+from rubisco.lib.variable import (
+    AutoFormatDict,
+    get_variable,
+    pop_variables,
+    push_variables,
+    variables,
+)
+from rubisco.shared.ktrigger import IKernelTrigger, bind_ktrigger_interface
+
+
+class _PushStep(Step):
+    """Push a variable."""
+
+    def init(self) -> None:
+        """Initialize the step."""
+        self.push = self.raw_data.get("push", valtype=dict)
+
+    def run(self) -> None:
+        """Run the step."""
+        for name, value in self.push.items():
+            push_variables(name, value)
+
+
+class _FailStep(Step):
+    """Fail if the value is not zero."""
+
+    def init(self) -> None:
+        """Initialize the step."""
+        self.code = self.raw_data.get("fail", valtype=int)
+
+    def run(self) -> None:
+        """Run the step."""
+        if self.code:
+            raise RUValueError(self.id)
+
+
+@pytest.fixture(autouse=True)
+def _register_steps(register_step: Callable[..., None]) -> None:
+    register_step("test-matrix-push", _PushStep, ["push"])
+    register_step("test-matrix-fail", _FailStep, ["fail"])
+
+
+class _MatrixKTrigger(IKernelTrigger):
+    outputs: list[str]
+    step_ids: list[str]
+    results: list[MatrixJobResult]
+    finished: list[AutoFormatDict]
+
+    def __init__(self) -> None:
+        self.outputs = []
+        self.step_ids = []
+        self.results = []
+        self.finished = []
+
+    def pre_run_workflow_step(self, *, step: Step) -> None:
+        self.step_ids.append(step.id)
+
+    def on_output(self, *, message: str, raw: bool = True) -> None:
+        _ = raw
+        self.outputs.append(message)
+
+    def post_run_matrix(self, *, variables: AutoFormatDict) -> None:
+        self.finished.append(variables)
+
+    def on_matrix_summary(self, *, results: list[MatrixJobResult]) -> None:
+        self.results = results
+
+
+class TestMatrixStep:
+    """Test MatrixStep."""
+
+    kt: _MatrixKTrigger
+
+    @classmethod
+    def setup_class(cls) -> None:
+        """Init test suites."""
+        cls.kt = _MatrixKTrigger()
+        bind_ktrigger_interface("test_matrix", cls.kt)
+
+    def setup_method(self) -> None:
+        """Clear the outputs."""
+        self.kt.outputs.clear()
+        self.kt.step_ids.clear()
+        self.kt.results = []
+        self.kt.finished.clear()
+
+    def _run(self, data: dict[str, object]) -> None:
+        run_inline_workflow(
+            [AutoFormatDict(data)],
+            "test_matrix",
+        )
+
+    def test_shared_steps(self) -> None:
+        """Test jobs sharing the steps without modifying them."""
+        step = AutoFormatDict({"echo": "${{n}}"})
+        self._run({"id": "m", "matrix": {"n": [1, 2]}, "steps": [step]})
+        if "id" in step:
+            pytest.fail("Shared step data is modified.")
+        if self.kt.outputs != ["1", "2"]:
+            pytest.fail(f"Unexpected outputs: {self.kt.outputs}")
+        if self.kt.step_ids != [
+            "m",
+            "m.matrix.0.steps.0",
+            "m.matrix.1.steps.0",
+        ]:
+            pytest.fail(f"Unexpected step ids: {self.kt.step_ids}")
+
+    def test_excludes(self) -> None:
+        """Test excluding the matrix variables."""
+        push_variables("test_matrix.excluded", "b")
+        try:
+            self._run(
+                {
+                    "matrix": {"x": ["a", "b"], "y": [1, 2]},
+                    "excludes": [
+                        {"x": "${{ test_matrix.excluded }}"},
+                        {"x": "a", "y": 2},
+                    ],
+                    "steps": [{"echo": "${{ x }}${{ y }}"}],
+                },
+            )
+        finally:
+            pop_variables("test_matrix.excluded")
+        if self.kt.outputs != ["a1"]:
+            pytest.fail(f"Wrong outputs: {self.kt.outputs}")
+
+    def test_parallel(self) -> None:
+        """Test running jobs in parallel."""
+        self._run(
+            {
+                "parallel": True,
+                "max-parallel": 4,
+                "matrix": {"n": list(range(8))},
+                "steps": [
+                    {"echo": "a${{n}}"},
+                    {"echo": "b${{n}}"},
+                ],
+            },
+        )
+        if [res.status for res in self.kt.results] != [
+            MatrixJobStatus.SUCCESS,
+        ] * 8:
+            pytest.fail("All jobs should succeed.")
+
+        # Outputs of a job are not interleaved with other jobs.
+        messages = self.kt.outputs
+        if len(messages) != 16:  # noqa: PLR2004
+            pytest.fail(f"Unexpected outputs: {messages}")
+        for idx in range(0, 16, 2):
+            if messages[idx][1:] != messages[idx + 1][1:]:
+                pytest.fail(f"Outputs are interleaved: {messages}")
+        if {msg for msg in messages if msg.startswith("a")} != {
+            f"a{n}" for n in range(8)
+        }:
+            pytest.fail(f"Unexpected outputs: {messages}")
+
+    def test_fail_fast(self) -> None:
+        """Test cancelling the jobs after the first failure."""
+        pytest.raises(
+            RUShellExecutionError,
+            self._run,
+            {
+                "parallel": True,
+                "max-parallel": 1,
+                "matrix": {"code": [0, 1, 0, 0]},
+                "steps": [{"run": "exit ${{code}}"}],
+            },
+        )
+        if [res.status for res in self.kt.results] != [
+            MatrixJobStatus.SUCCESS,
+            MatrixJobStatus.FAILURE,
+            MatrixJobStatus.CANCELLED,
+            MatrixJobStatus.CANCELLED,
+        ]:
+            pytest.fail(f"Unexpected results: {self.kt.results}")
+
+    def test_no_fail_fast(self) -> None:
+        """Test running all jobs even if one failed."""
+        pytest.raises(
+            RUShellExecutionError,
+            self._run,
+            {
+                "parallel": True,
+                "max-parallel": 2,
+                "fail-fast": False,
+                "matrix": {"code": [0, 1, 0, 0]},
+                "steps": [{"run": "exit ${{code}}"}],
+            },
+        )
+        if [res.status for res in self.kt.results] != [
+            MatrixJobStatus.SUCCESS,
+            MatrixJobStatus.FAILURE,
+            MatrixJobStatus.SUCCESS,
+            MatrixJobStatus.SUCCESS,
+        ]:
+            pytest.fail(f"Unexpected results: {self.kt.results}")
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_post_run_on_failure(self, *, parallel: bool) -> None:
+        """Test post_run_matrix is called for the failed jobs too."""
+        pytest.raises(
+            RUValueError,
+            self._run,
+            {
+                "parallel": parallel,
+                "max-parallel": 1,
+                "matrix": {"code": [0, 1]},
+                "steps": [{"fail": "${{code}}"}],
+            },
+        )
+        if [mvars["code"] for mvars in self.kt.finished] != [0, 1]:
+            pytest.fail(f"Unexpected finished jobs: {self.kt.finished}")
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_variables_kept(self, *, parallel: bool) -> None:
+        """Test the variables set by the jobs are visible after them."""
+        names = [f"test_matrix.n{n}" for n in range(4)]
+        try:
+            self._run(
+                {
+                    "parallel": parallel,
+                    "max-parallel": 4,
+                    "matrix": {"n": list(range(4))},
+                    "steps": [
+                        {
+                            "push": {
+                                "test_matrix.n${{n}}": "${{n}}",
+                                "test_matrix.last": "${{n}}",
+                            },
+                        },
+                    ],
+                },
+            )
+            if [get_variable(name) for name in names] != [0, 1, 2, 3]:
+                pytest.fail("Variables set by the jobs are lost.")
+            if get_variable("test_matrix.last") != 3:  # noqa: PLR2004
+                pytest.fail("The last job should win.")
+            if "n" in variables:
+                pytest.fail("Matrix variables should be popped.")
+        finally:
+            for name in [*names, "test_matrix.last"]:
+                variables.pop(name, None)
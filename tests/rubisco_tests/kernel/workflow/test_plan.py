@@ -0,0 +1,232 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.plan module."""
+
+import pickle
+from collections.abc import Callable
+
+import pytest
+
+from rubisco.kernel.workflow import (
+    compile_inline_workflow,
+    run_inline_workflow,
+)
+from rubisco.kernel.workflow.step import Step, create_step
+from rubisco.kernel.workflow.steps import EchoStep
+from rubisco.kernel.workflow.workflow import Workflow
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable import AutoFormatDict, pop_variables, push_variables
+
+
+class _PlanRecordStep(Step):
+    """Record the step id."""
+
+    records: list[str] = []  # noqa: RUF012
+
+    def init(self) -> None:
+        """Initialize the step."""
+
+    def run(self) -> None:
+        """Run the step."""
+        self.records.append(self.id)
+
+
+class _PlanPushStep(Step):
+    """Push the id of the next step."""
+
+    def init(self) -> None:
+        """Initialize the step."""
+        self.next_id = self.raw_data.get("plan-push", valtype=str)
+
+    def run(self) -> None:
+        """Run the step."""
+        push_variables("plan-next-id", self.next_id)
+
+
+@pytest.fixture(autouse=True)
+def _register_steps(register_step: Callable[..., None]) -> None:
+    register_step("test-plan-record", _PlanRecordStep, ["plan-record"])
+    register_step("test-plan-push", _PlanPushStep, ["plan-push"])
+
+
+class TestWorkflowPlan:
+    """Test compiling workflows."""
+
+    def test_compile(self) -> None:
+        """Test compiling a workflow without running it."""
+        _PlanRecordStep.records.clear()
+        plan = compile_inline_workflow(
+            [
+                AutoFormatDict({"id": "a", "plan-record": True}),
+                AutoFormatDict({"type": "echo", "echo": "${{ a.stdout }}"}),
+                AutoFormatDict({"type": "${{ t }}", "plan-record": True}),
+            ],
+            "test-plan",
+        )
+        if _PlanRecordStep.records:
+            pytest.fail("Steps are run when compiling.")
+        if [step.id for step in plan.steps] != [
+            "a",
+            "test-plan.steps.1",
+            "test-plan.steps.2",
+        ]:
+            pytest.fail("Step ids are wrong.")
+        if [step.cls for step in plan.steps] != [
+            _PlanRecordStep,
+            EchoStep,
+            None,
+        ]:
+            pytest.fail("Step classes are wrong.")
+
+    def test_pickle(self) -> None:
+        """Test pickling the plan without formatting it."""
+        plan = compile_inline_workflow(
+            [
+                AutoFormatDict({"id": "a", "plan-record": True}),
+                AutoFormatDict(
+                    {"id": "b", "needs": "a", "echo": ["${{ a.stdout }}"]},
+                ),
+            ],
+            "test-plan",
+        )
+        res = pickle.loads(pickle.dumps(plan))  # noqa: S301
+        if (res.id, res.graph) != (plan.id, plan.graph):
+            pytest.fail("The plan is changed after pickling.")
+        if [(step.id, step.cls, step.needs) for step in res.steps] != [
+            ("a", _PlanRecordStep, ()),
+            ("b", EchoStep, ("a",)),
+        ]:
+            pytest.fail("The steps are changed after pickling.")
+        echo = res.steps[1].data
+        if not isinstance(echo, AutoFormatDict):
+            pytest.fail("The step data is not an AutoFormatDict.")
+        if list(list.__iter__(dict.get(echo, "echo"))) != ["${{ a.stdout }}"]:
+            pytest.fail("The step data is formatted when pickling.")
+
+    def test_execute(self) -> None:
+        """Test steps are run by execute(), not when they are created."""
+        _PlanRecordStep.records.clear()
+        workflow = Workflow(
+            AutoFormatDict(
+                {
+                    "name": "",
+                    "steps": [{"id": "a", "plan-record": True}],
+                },
+            ),
+            "test-plan",
+        )
+        step_plan = workflow.plan.steps[0]
+        if step_plan.cls is None:
+            pytest.fail("The step class is not resolved.")
+        step = create_step(step_plan.cls, step_plan.data, workflow)
+        if _PlanRecordStep.records or step.suc:
+            pytest.fail("The step is run when it's created.")
+        step.execute()
+        if _PlanRecordStep.records != ["a"] or not step.suc:
+            pytest.fail("The step is not run by execute().")
+
+        # Creating a step directly still runs it, but it's deprecated.
+        _PlanRecordStep.records.clear()
+        with pytest.warns(DeprecationWarning, match="create_step"):
+            step = step_plan.cls(step_plan.data, workflow)
+        if _PlanRecordStep.records != ["a"] or not step.suc:
+            pytest.fail("The step is not run when it's created directly.")
+
+    def test_invalid(self) -> None:
+        """Test the invalid steps are found before running."""
+        invalid = [
+            AutoFormatDict({"typo": True}),
+            AutoFormatDict({"echo": "x", "strict": "no"}),
+            AutoFormatDict({"type": "unknown"}),
+            AutoFormatDict({"id": "a", "needs": "b", "echo": "x"}),
+            AutoFormatDict({"id": "plan-record", "echo": "x"}),
+            AutoFormatDict({"type": "glob", "recursive": False}),
+            AutoFormatDict({"glob": "*", "recursive": "no"}),
+            AutoFormatDict({"run": "true", "cwd": ["a"]}),
+        ]
+        for step in invalid:
+            _PlanRecordStep.records.clear()
+            pytest.raises(
+                RUValueError,
+                run_inline_workflow,
+                [
+                    AutoFormatDict({"id": "plan-record", "plan-record": True}),
+                    step,
+                ],
+                "test-plan",
+            )
+            if _PlanRecordStep.records:
+                pytest.fail("Steps are run before the invalid step is found.")
+
+    def test_templated_type(self) -> None:
+        """Test the templated type is resolved when running."""
+        _PlanRecordStep.records.clear()
+        push_variables("plan-type", "test-plan-record")
+        try:
+            run_inline_workflow(
+                [
+                    AutoFormatDict(
+                        {"id": "a", "type": "${{ plan-type }}", "echo": "x"},
+                    ),
+                ],
+                "test-plan",
+            )
+        finally:
+            pop_variables("plan-type")
+        if _PlanRecordStep.records != ["a"]:
+            pytest.fail("The templated type is not resolved.")
+
+    def test_templated_id(self) -> None:
+        """Test the templated id is resolved when running."""
+        steps = [
+            AutoFormatDict({"id": "a", "plan-push": "b"}),
+            AutoFormatDict({"id": "${{ plan-next-id }}", "plan-record": True}),
+        ]
+        _PlanRecordStep.records.clear()
+        try:
+            run_inline_workflow(steps, "test-plan")
+        finally:
+            pop_variables("plan-next-id")
+        if _PlanRecordStep.records != ["b"]:
+            pytest.fail("The templated id is not resolved when running.")
+
+        _PlanRecordStep.records.clear()
+        steps[0]["plan-push"] = "a"
+        try:
+            with pytest.raises(RUValueError):
+                run_inline_workflow(steps, "test-plan")
+        finally:
+            pop_variables("plan-next-id")
+        if _PlanRecordStep.records:
+            pytest.fail("The step with a duplicated id is run.")
+
+    def test_templated_fields(self) -> None:
+        """Test the templated fields are not checked when compiling."""
+        push_variables("plan-key", "glob")
+        try:
+            compile_inline_workflow(
+                [
+                    AutoFormatDict({"glob": "*", "recursive": "${{ r }}"}),
+                    AutoFormatDict({"type": "glob", "${{ plan-key }}": "*"}),
+                ],
+                "test-plan",
+            )
+        finally:
+            pop_variables("plan-key")
@@ -0,0 +1,184 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.scheduler module."""
+
+import threading
+from collections.abc import Callable
+
+import pytest
+
+from rubisco.kernel.workflow import run_inline_workflow
+from rubisco.kernel.workflow.scheduler import (
+    DEFAULT_MAX_JOBS,
+    StepNode,
+    set_max_jobs,
+    sort_step_graph,
+)
+from rubisco.kernel.workflow.step import Step
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable import AutoFormatDict, get_variable, push_variables
+
+_barrier = threading.Barrier(2, timeout=10)
+
+
+class _BarrierStep(Step):
+    """Wait until another step reaches the barrier too."""
+
+    def init(self) -> None:
+        """Initialize the step."""
+
+    def run(self) -> None:
+        """Run the step."""
+        _barrier.wait()
+
+
+class _RecordStep(Step):
+    """Record the step id, fail if the record is "fail"."""
+
+    records: list[str] = []  # noqa: RUF012
+
+    def init(self) -> None:
+        """Initialize the step."""
+
+    def run(self) -> None:
+        """Run the step."""
+        if self.raw_data.get("record") == "fail":
+            raise RUValueError(self.id)
+        self.records.append(self.id)
+
+
+@pytest.fixture(autouse=True)
+def _register_steps(register_step: Callable[..., None]) -> None:
+    register_step("test-barrier", _BarrierStep, ["barrier"])
+    register_step("test-record", _RecordStep, ["record"])
+
+
+def _nodes(graph: dict[str, list[str]]) -> list[StepNode]:
+    return [
+        StepNode(step_id, AutoFormatDict(), needs)
+        for step_id, needs in graph.items()
+    ]
+
+
+class TestScheduler:
+    """Test the workflow step scheduler."""
+
+    def teardown_method(self) -> None:
+        """Restore the max count of jobs."""
+        set_max_jobs(DEFAULT_MAX_JOBS)
+
+    def test_sort(self) -> None:
+        """Test sorting the steps by their dependencies."""
+        nodes = sort_step_graph(
+            _nodes({"c": ["a", "b"], "a": [], "d": ["c", "c"], "b": ["a"]}),
+        )
+        if [node.id for node in nodes] != ["a", "b", "c", "d"]:
+            pytest.fail(f"Unexpected order: {nodes}")
+
+    def test_invalid_graph(self) -> None:
+        """Test unknown dependencies and cycles."""
+        pytest.raises(RUValueError, sort_step_graph, _nodes({"a": ["x"]}))
+        pytest.raises(
+            RUValueError,
+            sort_step_graph,
+            _nodes({"a": ["c"], "b": ["a"], "c": ["b"], "d": []}),
+        )
+
+    def test_concurrent(self) -> None:
+        """Test running independent steps at the same time."""
+        set_max_jobs(2)
+        run_inline_workflow(
+            [
+                AutoFormatDict({"id": "a", "barrier": True, "needs": []}),
+                AutoFormatDict({"id": "b", "barrier": True}),
+                AutoFormatDict(
+                    {
+                        "id": "c",
+                        "needs": ["a", "b"],
+                        "popen": "echo ${{test_dag.a.suc:yes}}",
+                    },
+                ),
+            ],
+            "test_dag",
+        )
+        if get_variable("test_dag.c.stdout").strip() != "yes":
+            pytest.fail("Variables of the finished step should be kept.")
+
+    def test_needs_variables(self) -> None:
+        """Test using the variables of the needed steps."""
+        set_max_jobs(2)
+        push_variables("test_dag2.prefix", "x")
+        run_inline_workflow(
+            [
+                AutoFormatDict(
+                    {
+                        "id": "b",
+                        "needs": "a",
+                        "echo": "${{test_dag2.a.stdout}}",
+                    },
+                ),
+                AutoFormatDict({"id": "a", "popen": "echo hello"}),
+                AutoFormatDict(
+                    {
+                        "id": "c",
+                        "needs": ["b"],
+                        "popen": "echo ${{test_dag2.prefix}}",
+                    },
+                ),
+            ],
+            "test_dag2",
+        )
+        if get_variable("test_dag2.c.stdout").strip() != "x":
+            pytest.fail("Variables of the workflow should be visible.")
+
+    def test_fail(self) -> None:
+        """Test stopping when a strict step failed."""
+        for jobs in (1, 4):
+            set_max_jobs(jobs)
+            _RecordStep.records.clear()
+            pytest.raises(
+                RUValueError,
+                run_inline_workflow,
+                [
+                    AutoFormatDict({"id": "a", "echo": "${{test_dag_undef}}"}),
+                    AutoFormatDict({"id": "b", "needs": ["a"], "record": 1}),
+                    AutoFormatDict({"id": "c", "needs": ["b"], "record": 1}),
+                ],
+                "test_dag_fail",
+            )
+            if _RecordStep.records:
+                pytest.fail("Steps after the failure should not run.")
+
+    def test_non_strict(self) -> None:
+        """Test running the dependents of a failed non-strict step."""
+        for jobs in (1, 4):
+            set_max_jobs(jobs)
+            _RecordStep.records.clear()
+            run_inline_workflow(
+                [
+                    AutoFormatDict({"id": "b", "needs": ["a"], "record": 1}),
+                    AutoFormatDict(
+                        {"id": "a", "strict": False, "record": "fail"},
+                    ),
+                ],
+                "test_dag_non_strict",
+            )
+            if _RecordStep.records != ["b"]:
+                pytest.fail("Dependents of a non-strict step should run.")
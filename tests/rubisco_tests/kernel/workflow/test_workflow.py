@@ -0,0 +1,155 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.kernel.workflow.workflow module."""
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from rubisco.kernel.workflow import (
+    compile_inline_workflow,
+    run_inline_workflow,
+)
+from rubisco.kernel.workflow.step import Step
+from rubisco.kernel.workflow.steps import (
+    EchoStep,
+    OutputStep,
+    infer_step_types,
+    step_contributes,
+)
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable import AutoFormatDict
+
+
+class _InferAStep(Step):
+    """A step for testing type inference."""
+
+    def init(self) -> None:
+        """Initialize the step."""
+
+    def run(self) -> None:
+        """Run the step."""
+
+
+class _InferBStep(_InferAStep):
+    """Another step for testing type inference."""
+
+
+class _InferCStep(_InferAStep):
+    """A step which is not registered."""
+
+
+@pytest.fixture(autouse=True)
+def _register_steps(register_step: Callable[..., None]) -> None:
+    register_step("test-infer-a", _InferAStep, ["infer-a", "infer-to"])
+    register_step("test-infer-b", _InferBStep, ["infer-b", "infer-to"])
+
+
+def _get_classes(*steps: dict[str, Any]) -> list[type[Step] | None]:
+    plan = compile_inline_workflow(
+        [AutoFormatDict(step) for step in steps],
+        "test-infer",
+    )
+    return [step.cls for step in plan.steps]
+
+
+class TestStepTypeInference:
+    """Test inferring the step types."""
+
+    def test_infer(self) -> None:
+        """Test inferring the step types by their keys."""
+        if _get_classes(
+            {"output": "x"},
+            {"echo": "x"},
+            {"infer-a": "x", "infer-to": "y"},
+            {"infer-b": "${{ x }}", "infer-to": "y"},
+        ) != [OutputStep, EchoStep, _InferAStep, _InferBStep]:
+            pytest.fail("Inferred step types are wrong.")
+        if infer_step_types({"infer-a": "x", "infer-to": None}):
+            pytest.fail("Null values are counted.")
+        pytest.raises(
+            RUValueError,
+            _get_classes,
+            {"infer-to": "y"},
+        )
+
+    def test_ambiguous(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test warning the step matching multiple types."""
+        warnings: list[str] = []
+        monkeypatch.setattr(
+            "rubisco.kernel.workflow.workflow.call_ktrigger",
+            lambda _name, message: warnings.append(message),
+        )
+        step = {"infer-b": "x", "infer-a": "x", "infer-to": "y"}
+        if _get_classes(step, step) != [_InferAStep, _InferAStep]:
+            pytest.fail("The first registered type is not used.")
+        if len(warnings) != 1:
+            pytest.fail("Ambiguous step is not warned once.")
+        if "test-infer-a, test-infer-b" not in warnings[0]:
+            pytest.fail("Matched types are not warned.")
+
+    def test_step_contributes(self) -> None:
+        """Test changing the contributes of a step class directly."""
+        step_contributes[_InferCStep] = ["infer-c"]
+        try:
+            if _get_classes({"infer-c": "x"}) != [_InferCStep]:
+                pytest.fail("New contributes are not used.")
+            step_contributes[_InferCStep] = ["infer-c2"]
+            if _get_classes({"infer-c2": "x"}) != [_InferCStep]:
+                pytest.fail("Replaced contributes are not used.")
+        finally:
+            del step_contributes[_InferCStep]
+        pytest.raises(RUValueError, _get_classes, {"infer-c": "x"})
+
+    def test_empty_contributes(self) -> None:
+        """Test a step type without contributes matches all the steps."""
+        step_contributes[_InferCStep] = []
+        try:
+            if _get_classes({"echo": "x"}, {"infer-c": "x"}) != [
+                EchoStep,
+                _InferCStep,
+            ]:
+                pytest.fail("Type without contributes is not matched.")
+        finally:
+            del step_contributes[_InferCStep]
+
+
+class TestRunInlineWorkflow:
+    """Test running inline workflows."""
+
+    def test_compile_error_without_fail_fast(self) -> None:
+        """Test returning the compiling error without fail-fast."""
+        for step in (
+            {"type": "nope"},
+            {"id": "a", "needs": "b", "echo": "x"},
+        ):
+            exc = run_inline_workflow(
+                [AutoFormatDict(step)],
+                "test-inline",
+                fail_fast=False,
+            )
+            if not isinstance(exc, RUValueError):
+                pytest.fail("Compiling error is not returned.")
+        with pytest.raises(RUValueError):
+            run_inline_workflow(
+                [AutoFormatDict({"type": "nope"})],
+                "test-inline",
+            )
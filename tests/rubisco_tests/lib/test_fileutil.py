@@ -26,9 +26,12 @@ import pytest
 
 from rubisco.lib.exceptions import RUShellExecutionError
 from rubisco.lib.fileutil import (
+    IgnoreMatcher,
     TemporaryObject,
+    copy_recursive,
     find_command,
     human_readable_size,
+    rm_recursive,
 )
 
 
@@ -133,6 +136,23 @@ class TestFileUtil:
             raise AssertionError
         TemporaryObject.cleanup()
 
+    def test_rm_recursive_keep_paths(self, tmp_path: Path) -> None:
+        """Test keeping the given paths when removing."""
+        for name in ["build/keep/a", "build/b", "build/sub/c"]:
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        rm_recursive(
+            tmp_path / "build",
+            keep_paths=[tmp_path / "build" / "keep", tmp_path / "x/../build/b"],
+        )
+        remains = sorted(
+            path.relative_to(tmp_path).as_posix()
+            for path in tmp_path.rglob("*")
+        )
+        if remains != ["build", "build/b", "build/keep", "build/keep/a"]:
+            pytest.fail(f"Wrong remaining paths: {remains}")
+
     def test_human_readable_size(self) -> None:
         """Test human_readable_size."""
         if (
@@ -161,3 +181,95 @@ class TestFileUtil:
 
         if find_command("_Not_Exist_Command_", strict=False) is not None:
             raise AssertionError
+
+
+def _make_ignored_tree(root: Path) -> None:
+    for name in [
+        "a.py",
+        "a.pyc",
+        "build/b.o",
+        "src/keep.log",
+        "src/c.log",
+        "src/build/d",
+        "src/e.py",
+        ".git/config",
+    ]:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    (root / ".gitignore").write_text("*.pyc\n/build/\n*.log\n!keep.log\n")
+    (root / "src" / ".rubiscoignore").write_text("build\n")
+
+
+class TestIgnoreMatcher:
+    """Test IgnoreMatcher."""
+
+    def test_match(self, tmp_path: Path) -> None:
+        """Test matching the paths with the ignore files."""
+        _make_ignored_tree(tmp_path)
+        matcher = IgnoreMatcher(tmp_path)
+        for name, ignored in [
+            ("a.py", False),
+            ("a.pyc", True),
+            ("build", True),
+            ("build/b.o", True),
+            ("src/keep.log", False),
+            ("src/c.log", True),
+            ("src/build/d", True),
+            ("src/e.py", False),
+            (".git/config", True),
+        ]:
+            if matcher.match(tmp_path / name) != ignored:
+                pytest.fail(f"'{name}' should be ignored: {ignored}")
+        if matcher.match(tmp_path.parent / "a.pyc"):
+            pytest.fail("Paths not in the root are never ignored.")
+
+    def test_walk(self, tmp_path: Path) -> None:
+        """Test walking the paths which are not ignored."""
+        _make_ignored_tree(tmp_path)
+        res = {
+            path.relative_to(tmp_path).as_posix()
+            for path in IgnoreMatcher(tmp_path).walk(tmp_path)
+        }
+        if res != {
+            ".gitignore",
+            "a.py",
+            "src",
+            "src/.rubiscoignore",
+            "src/keep.log",
+            "src/e.py",
+        }:
+            pytest.fail(f"Wrong paths: {res}")
+
+    def test_copy_and_remove(self, tmp_path: Path) -> None:
+        """Test copying and removing with the ignore files."""
+        _make_ignored_tree(tmp_path / "src")
+        matcher = IgnoreMatcher(tmp_path)
+        copy_recursive(
+            tmp_path / "src",
+            tmp_path / "dst",
+            ignore_matcher=matcher,
+        )
+        if (
+            not (tmp_path / "dst" / "a.py").is_file()
+            or (tmp_path / "dst" / "build").exists()
+        ):
+            pytest.fail("Ignored paths are copied.")
+
+        rm_recursive(tmp_path / "src", ignore_matcher=matcher)
+        remains = sorted(
+            path.relative_to(tmp_path / "src").as_posix()
+            for path in (tmp_path / "src").rglob("*")
+        )
+        if remains != [
+            ".git",
+            ".git/config",
+            "a.pyc",
+            "build",
+            "build/b.o",
+            "src",
+            "src/build",
+            "src/build/d",
+            "src/c.log",
+        ]:
+            pytest.fail(f"Wrong remaining paths: {remains}")
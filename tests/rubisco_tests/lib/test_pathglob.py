@@ -0,0 +1,228 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.lib.pathglob module."""
+
+import glob
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from rubisco.lib.pathglob import glob_files
+
+
+def _make_tree(root: Path) -> None:
+    for name in [
+        "a.py",
+        "b.txt",
+        ".hidden.py",
+        "src/c.py",
+        "src/.d.py",
+        "src/sub/e.py",
+        "src/sub/f.txt",
+        ".git/config",
+        "build/g.py",
+        "build/obj/h.o",
+    ]:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+def _glob(pattern: str, root: Path, *, hidden: bool) -> set[Path]:
+    return {
+        (root / path).absolute()
+        for path in glob.glob(  # noqa: PTH207
+            pattern,
+            root_dir=root,
+            recursive=True,
+            include_hidden=hidden,
+        )
+        # `glob.glob` returns "x/" for "x/**" even if "x" is not a directory.
+        if not path.endswith(os.sep) or (root / path).is_dir()
+    }
+
+
+_PATTERN_NAMES = [
+    "*",
+    "?",
+    "**",
+    "*.py",
+    "?.*",
+    "[ab]*",
+    ".*",
+    "src",
+    "sub",
+    "build",
+    "a.py",
+    "..",
+]
+
+
+def _random_pattern(rand: random.Random) -> str:
+    names = rand.choices(_PATTERN_NAMES, k=rand.randint(1, 4))
+    return "/".join(names) + rand.choice(["", "", "/"])
+
+
+def _random_patterns(rand: random.Random, low: int, high: int) -> list[str]:
+    return [_random_pattern(rand) for _ in range(rand.randint(low, high))]
+
+
+class TestGlobFiles:
+    """Test glob_files."""
+
+    def test_same_as_glob(self, tmp_path: Path) -> None:
+        """Test matching the same paths as `glob.glob`."""
+        _make_tree(tmp_path)
+        for pattern in [
+            "*",
+            "**",
+            "**/*.py",
+            "src/**",
+            "*/",
+            "**/sub/*",
+            "src/*.p[y]",
+            ".git/*",
+            "src/../a.py",
+            "not-exists/*",
+            str(tmp_path / "*.py"),
+        ]:
+            for hidden in (True, False):
+                res = glob_files(
+                    [pattern],
+                    root_dir=tmp_path,
+                    recursive=True,
+                    include_hidden=hidden,
+                )
+                if set(res) != _glob(pattern, tmp_path, hidden=hidden):
+                    pytest.fail(f"Wrong result of '{pattern}': {res}")
+                if len(res) != len(set(res)):
+                    pytest.fail(f"Duplicated result of '{pattern}'.")
+
+    def test_random_patterns(self, tmp_path: Path) -> None:
+        """Test matching the same paths as `glob.glob` with random patterns."""
+        # Deep enough that ".." never walks out of `tmp_path`.
+        _make_tree(tmp_path / "x" / "y" / "root")
+        root = tmp_path / "x" / "y" / "root" / "src"
+        rand = random.Random(20241018)  # noqa: S311
+        for _ in range(500):
+            patterns = _random_patterns(rand, 1, 3)
+            excludes = _random_patterns(rand, 0, 2)
+            hidden = rand.random() < 0.5  # noqa: PLR2004
+            expected = set().union(
+                *(_glob(pattern, root, hidden=hidden) for pattern in patterns),
+            )
+            expected.difference_update(
+                *(
+                    _glob(pattern, root, hidden=hidden)
+                    for pattern in excludes
+                    if ".." not in pattern.split("/")
+                ),
+            )
+            # Excludes with ".." are compared with the normalized paths.
+            parent_excluded = {
+                os.path.normpath(path)
+                for pattern in excludes
+                if ".." in pattern.split("/")
+                for path in _glob(pattern, root, hidden=hidden)
+            }
+            expected = {
+                path
+                for path in expected
+                if os.path.normpath(path) not in parent_excluded
+            }
+            res = glob_files(
+                patterns,
+                excludes,
+                root_dir=root,
+                recursive=True,
+                include_hidden=hidden,
+            )
+            if set(res) != expected:
+                pytest.fail(
+                    f"Wrong result of {patterns} excluding {excludes}: "
+                    f"{sorted(set(res) ^ expected)}",
+                )
+
+    def test_excludes(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test walking the tree once for all patterns."""
+        _make_tree(tmp_path)
+        scanned: list[str] = []
+        scandir = os.scandir
+
+        def _scandir(path: str) -> "os._ScandirIterator[str]":
+            scanned.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", _scandir)
+        res = glob_files(
+            ["**/*.py", "**/*.o", "*.py"],
+            ["build/**", "src/sub/*"],
+            root_dir=tmp_path,
+            recursive=True,
+        )
+        if sorted(res) != [tmp_path / "a.py", tmp_path / "src" / "c.py"]:
+            pytest.fail(f"Wrong result: {res}")
+        # "build" is pruned, hidden directories are not walked.
+        if sorted(scanned) != sorted(
+            [
+                f"{tmp_path}{os.sep}",
+                f"{tmp_path / 'src'}{os.sep}",
+                f"{tmp_path / 'src' / 'sub'}{os.sep}",
+            ],
+        ):
+            pytest.fail(f"Wrong scanned directories: {scanned}")
+
+    def test_parent_excludes(self, tmp_path: Path) -> None:
+        """Test excluding the paths under the root by patterns with ".."."""
+        root = tmp_path / "root"
+        _make_tree(root)
+        for excludes, expected in [
+            (["../**"], []),
+            (["../root/*"], [root / "src" / "c.py"]),
+            (["src/../a.py"], [root / "src" / "c.py"]),
+            (["../root/src/"], [root / "a.py", root / "src" / "c.py"]),
+        ]:
+            res = glob_files(
+                ["*.py", "src/*.py"],
+                excludes,
+                root_dir=root,
+                recursive=True,
+            )
+            if sorted(res) != expected:
+                pytest.fail(f"Wrong result excluding {excludes}: {res}")
+
+    def test_accept(self, tmp_path: Path) -> None:
+        """Test filtering the entries."""
+        _make_tree(tmp_path)
+        res = glob_files(
+            ["src/**"],
+            root_dir=tmp_path,
+            recursive=True,
+            include_hidden=True,
+            accept=lambda entry: entry.is_dir(),
+        )
+        if set(res) != {tmp_path / "src", tmp_path / "src" / "sub"}:
+            pytest.fail(f"Wrong result: {res}")
@@ -244,3 +244,142 @@ class TestVariable:
             pytest.fail("Format dict is not set correctly.")
         if afd.get("k3", default={}, valtype=dict) != {"k4": True}:
             pytest.fail("Format dict is not set correctly.")
+
+    def test_autoformatdict_template_keys(self) -> None:
+        """Test the AutoFormatDict key index."""
+        self._clean_variables()
+        afd = AutoFormatDict({"${{k}}": "first", "a": "second", "b": 1})
+
+        push_variables("k", "a")
+        if afd.get("a") != "first":
+            pytest.fail("The first matched key should win.")
+        if afd.get("b") != 1 or "b" not in afd or "c" in afd:
+            pytest.fail("Literal key lookup failed.")
+
+        push_variables("k", "c")
+        if afd.get("c") != "first" or afd.get("a") != "second":
+            pytest.fail("Template key should be re-formatted.")
+
+        pop_variables("k")
+        del afd["${{k}}"]
+        if afd.get("a") != "second" or len(afd) != 2:  # noqa: PLR2004
+            pytest.fail("Deleted template key should be forgotten.")
+
+        afd.setdefault("x-${{k}}", "x")
+        if afd.get("x-a") != "x":
+            pytest.fail("setdefault() should index the template key.")
+        afd.clear()
+        if "x-a" in afd:
+            pytest.fail("clear() should clear the template key index.")
+
+    def test_autoformatdict_key_positions(self) -> None:
+        """Test the template keys are matched in insertion order."""
+        self._clean_variables()
+        push_variables("k", "a")
+        afd = AutoFormatDict({"a": "literal", "${{k}}": "template"})
+        if afd.get("a") != "literal":
+            pytest.fail("Template keys after the literal key should lose.")
+
+        del afd["a"]
+        afd["a"] = "literal"
+        if afd.get("a") != "template":
+            pytest.fail("The re-added literal key should be after.")
+
+        afd.orig_pop("${{k}}")
+        afd["${{k}}"] = "template"
+        if afd.get("a") != "literal":
+            pytest.fail("The re-added template key should be after.")
+        pop_variables("k")
+
+    def test_autoformatdict_undefined_template_key(self) -> None:
+        """Test an unresolvable template key after a literal key."""
+        self._clean_variables()
+        afd = AutoFormatDict({"a": 1, "${{undefined}}": 2})
+        if afd.get("a") != 1 or "a" not in afd:
+            pytest.fail("Literal key lookup should not format later keys.")
+        pytest.raises(RUValueError, afd.get, "b")
+
+        afd = AutoFormatDict({"${{undefined}}": 2, "a": 1})
+        if afd.get("a") != 1 or "a" not in afd:
+            pytest.fail("Unresolvable template keys should be skipped.")
+
+    def test_autoformat_lazy_wrap(self) -> None:
+        """Test nested lists and dicts are wrapped on first access."""
+        self._clean_variables()
+        data = {"a": {"b": ["${{v}}", {"c": 1}]}, "d": [[1]]}
+        afd = AutoFormatDict(data)
+        if type(dict.__getitem__(afd, "a")) is not dict:
+            pytest.fail("Nested dict should not be wrapped eagerly.")
+
+        push_variables("v", "value")
+        child = afd["a"]
+        if not isinstance(child, AutoFormatDict) or child is not afd["a"]:
+            pytest.fail("Nested dict should be wrapped once.")
+        if child["b"][0] != "value" or child["b"][1]["c"] != 1:
+            pytest.fail("Wrapped value should be formatted.")
+        if not all(
+            isinstance(item, AutoFormatList | AutoFormatDict | str)
+            for item in child["b"]
+        ):
+            pytest.fail("Iterated items should be wrapped.")
+        child["b"].append(2)
+        if afd["a"]["b"][-1] != 2:  # noqa: PLR2004
+            pytest.fail("Changes of wrapped value should be kept.")
+        if not isinstance(next(iter(afd.values())), AutoFormatDict):
+            pytest.fail("values() should wrap the values.")
+        if afd != {"a": {"b": ["${{v}}", {"c": 1}, 2]}, "d": [[1]]}:
+            pytest.fail("Lazy wrapped dict should be equal to the dict.")
+        if data != {"a": {"b": ["${{v}}", {"c": 1}]}, "d": [[1]]}:
+            pytest.fail("Changes of wrapped value should not change source.")
+
+    def test_autoformat_orig_accessors(self) -> None:
+        """Test the orig_* accessors wrap the values."""
+        self._clean_variables()
+        data = {"a": {"b": [{"c": "${{v}}"}]}, "d": [[1]]}
+        afd = AutoFormatDict(data)
+        if not isinstance(afd.orig_get("a"), AutoFormatDict):
+            pytest.fail("orig_get() should wrap the value.")
+        if afd.orig_get("x", 1) != 1:
+            pytest.fail("orig_get() should return the default.")
+        if not all(
+            isinstance(value, AutoFormatDict | AutoFormatList)
+            for value in afd.orig_values()
+        ):
+            pytest.fail("orig_values() should wrap the values.")
+        if not all(
+            isinstance(value, AutoFormatDict | AutoFormatList)
+            for _, value in afd.orig_items()
+        ):
+            pytest.fail("orig_items() should wrap the values.")
+        afl = afd.orig_get("a").orig_get("b")
+        if not isinstance(afl.orig_getitem(0), AutoFormatDict):
+            pytest.fail("orig_getitem() should wrap the item.")
+        if not all(
+            isinstance(item, AutoFormatDict) for item in afl.orig_iter()
+        ):
+            pytest.fail("orig_iter() should wrap the items.")
+        if afl.orig_getitem(0).orig_get("c") != "${{v}}":
+            pytest.fail("orig_* accessors should not format the values.")
+
+    def test_autoformat_source_changes(self) -> None:
+        """Test changing the source object doesn't change the dict."""
+        self._clean_variables()
+        data = {"a": {"b": 1}, "l": [1]}
+        afd = AutoFormatDict(data)
+        data["x"] = 1
+        del data["l"]
+        if "x" in afd or afd["l"] != [1]:
+            pytest.fail("Changes of source should not leak into the dict.")
+        data["a"] = {"b": 2}
+        if afd["a"]["b"] != 1:
+            pytest.fail("Changes of source should not leak into the dict.")
+
+        data = {"a": {"b": 1}}
+        afd = AutoFormatDict(data)
+        afd.orig_get("a")
+        data["a"]["b"] = 2
+        if afd["a"]["b"] != 1:
+            pytest.fail("Read values should not be shared with the source.")
+        afd["a"]["b"] = 3
+        if data["a"]["b"] != 2:  # noqa: PLR2004
+            pytest.fail("Changes of the dict should not leak into source.")
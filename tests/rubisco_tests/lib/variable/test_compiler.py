@@ -0,0 +1,82 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.lib.variable.compiler module."""
+
+from typing import Any
+
+import pytest
+
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable.compiler import compile_expression
+from rubisco.lib.variable.execute import execute_expression
+from rubisco.lib.variable.lexer import get_token
+from rubisco.lib.variable.ru_ast import parse_expression
+from rubisco.lib.variable.variable import (
+    pop_variables,
+    push_variables,
+    variables,
+)
+
+
+class TestCompileExpression:
+    """Test compile_expression."""
+
+    def _check(self, expr: str, res: str | Any) -> None:  # noqa: ANN401
+        ast = parse_expression(get_token(expr))
+        compiled_result = compile_expression(ast)()
+        if compiled_result != res:
+            pytest.fail(f"Expression {expr} should be {res}.")
+        if compiled_result != execute_expression(ast):
+            pytest.fail(f"Expression {expr} differs from execute_expression.")
+
+    def test_constant(self) -> None:
+        """Test constant expression."""
+        self._check("", "")
+        self._check("a", "a")
+
+    def test_variable(self) -> None:
+        """Test variable expression."""
+        variables.clear()
+        push_variables("a", 1)
+        self._check("${{a}}", 1)
+        self._check("x${{a}}y${{a}}", "x1y1")
+        self._check("${{_U:${{_U:${{a}}}}}}", 1)
+        self._check("${{_U: c}}", " c")
+
+    def test_pyexpr(self) -> None:
+        """Test python expression."""
+        variables.clear()
+        push_variables("a", 1)
+        self._check("$&{{a+1}}", 2)
+        self._check("a$&{{a+1}}", "a2")
+
+    def test_rebind(self) -> None:
+        """Test the compiled expression reads the current variables."""
+        variables.clear()
+        func = compile_expression(parse_expression(get_token("<${{a}}>")))
+        push_variables("a", 1)
+        if func() != "<1>":
+            pytest.fail("Compiled expression should read the variable.")
+        push_variables("a", 2)
+        if func() != "<2>":
+            pytest.fail("Compiled expression should read the top value.")
+        pop_variables("a")
+        pop_variables("a")
+        pytest.raises(RUValueError, func)
@@ -23,7 +23,11 @@ import pytest
 
 from rubisco.lib.exceptions import RUValueError
 from rubisco.lib.variable.fast_format_str import fast_format_str
-from rubisco.lib.variable.variable import push_variables
+from rubisco.lib.variable.variable import (
+    get_variable,
+    pop_variables,
+    push_variables,
+)
 
 
 class TestFastFormatStr:
@@ -94,3 +98,26 @@ class TestFastFormatStr:
             fast_format_str,
             "${{var:$&{{1+1}}}}",
         )
+
+    def test_fmt_first(self) -> None:
+        """Test fmt is looked up first without changing global variables."""
+        push_variables("var", "global")
+        if fast_format_str("${{var}}-${{x}}", fmt={"x": 1}) != "global-1":
+            pytest.fail("Global variable should be used.")
+        if fast_format_str("${{var}}!", fmt={"var": "local"}) != "local!":
+            pytest.fail("fmt should be looked up first.")
+        if get_variable("var") != "global":
+            pytest.fail("Global variables should not be changed.")
+        pytest.raises(KeyError, get_variable, "x")
+        pop_variables("var")
+
+    def test_value_not_formatted(self) -> None:
+        """Test the value is inserted without being formatted again."""
+        res = fast_format_str(
+            "${{a}} ${{b}}",
+            fmt={"a": "${{b}}", "b": "x"},
+        )
+        if res != "${{b}} x":
+            pytest.fail("The value should be inserted as is.")
+        if fast_format_str("${{a}}\n", fmt={"a": 1}) != 1:
+            pytest.fail("The variable with a newline should be returned.")
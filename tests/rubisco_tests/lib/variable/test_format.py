@@ -21,8 +21,13 @@
 
 import pytest
 
-from rubisco.lib.variable.format import format_str
-from rubisco.lib.variable.variable import variables
+from rubisco.lib.variable.callbacks import undefined_var_callbacks
+from rubisco.lib.variable.format import format_many, format_str
+from rubisco.lib.variable.variable import (
+    get_generations,
+    push_variables,
+    variables,
+)
 
 
 class TestFormatStr:
@@ -60,3 +65,47 @@ class TestFormatStr:
         self._reset()
         if format_str("hello ${{var:$&{{1+1}}}}}}") != "hello 2}}":
             pytest.fail("format_str() should return the formatted string")
+
+    def test_format_many(self) -> None:
+        """Test format many strings."""
+        self._reset()
+        push_variables("var", "global")
+        res = format_many(
+            ["${{var}}", "${{x}}-${{var}}", 1, "plain", "${{x}}"],
+            fmt={"x": 2},
+        )
+        if res != ["global", "2-global", 1, "plain", 2]:
+            pytest.fail(f"format_many() returned wrong result: {res}")
+        if "x" in variables:
+            pytest.fail("fmt should be popped.")
+        self._reset()
+
+    def test_format_many_snapshot(self) -> None:
+        """Test format_many renders against a snapshot."""
+        self._reset()
+        push_variables("var", "global")
+        generations = get_generations(["var", "snapshot_x"])
+        res = format_many(
+            ["${{var}}-${{snapshot_x}}", "$&{{var + '!'}}"],
+            fmt={"snapshot_x": 1},
+        )
+        if res != ["global-1", "global!"]:
+            pytest.fail(f"format_many() returned wrong result: {res}")
+        if get_generations(["var", "snapshot_x"]) != generations:
+            pytest.fail("fmt should not be pushed to the variable stacks.")
+        self._reset()
+
+    def test_format_many_undefined(self) -> None:
+        """Test the callbacks are called once for a batch."""
+        self._reset()
+        calls: list[str] = []
+        undefined_var_callbacks.append(calls.append)
+        try:
+            res = format_many(["${{missing:a}}", "${{missing:b}}-x"])
+        finally:
+            undefined_var_callbacks.remove(calls.append)
+        if res != ["a", "b-x"]:
+            pytest.fail(f"format_many() returned wrong result: {res}")
+        if calls != ["missing"]:
+            pytest.fail(f"The callbacks should be called once: {calls}")
+        self._reset()
@@ -0,0 +1,211 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Differential test of rubisco.lib.variable.lexer module.
+
+The reference lexer is the character-by-character lexer the scanner replaced.
+It only got one fix: the '$' look-ahead buffer is reset after it's used.
+Without it, "$a $b ${{v}}" was lexed as "$a $a $b " and "$&{x" was dropped.
+"""
+
+import random
+import re
+
+import pytest
+
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.stack import Stack
+from rubisco.lib.variable.lexer import TS, Token, TokenType, get_token
+
+
+def _reference_get_token(  # noqa: C901, PLR0912, PLR0915
+    expression: str,
+) -> list[Token]:
+    current_state: Stack[TS] = Stack()
+    current_state.put(TS.CONSTANT)
+    cur_token_value = ""
+    cur_ignored_token_value = ""
+
+    res: list[Token] = []
+
+    idx = 0
+
+    def _read(size: int) -> str:
+        nonlocal idx
+        res = expression[idx : idx + size]
+        idx += size
+        return res
+
+    def _flush(tt: TokenType) -> None:
+        nonlocal cur_token_value
+        if cur_token_value:
+            res.append(Token(tt, cur_token_value))
+            cur_token_value = ""
+
+    def _push(tt: TokenType) -> None:
+        nonlocal cur_token_value
+        res.append(Token(tt, cur_token_value))
+        cur_token_value = ""
+
+    while idx < len(expression):
+        c = _read(1)
+        if current_state.top() in (TS.CONSTANT, TS.DECORATE_CONSTANT):
+            dont_save_char = False
+            if c == "}" and current_state.top() == TS.DECORATE_CONSTANT:
+                if _read(1) != "}":
+                    msg = "Invalid variable expression."
+                    raise RUValueError(msg)
+                _flush(TokenType.CONSTANT)
+                current_state.get()
+                current_state.get()
+                current_state.get()
+                _push(TokenType.VARIABLE_IDENTIFIER_END)
+                dont_save_char = True
+
+            if c == "$":
+                cur_ignored_token_value = c  # Fixed: was `+=`.
+                next_str = _read(2)
+                cur_ignored_token_value += next_str
+                if next_str == "{{":
+                    _flush(TokenType.CONSTANT)
+                    current_state.put(TS.VARIABLE_IDENTIFIER_START)
+                    _push(TokenType.VARIABLE_IDENTIFIER_START)
+                    current_state.put(TS.VARIABLE_NAME)
+                elif next_str == "&{":
+                    next_c = _read(1)
+                    cur_ignored_token_value += next_c
+                    if next_c == "{":
+                        _flush(TokenType.CONSTANT)
+                        current_state.put(TS.PYTHONEXPR_IDENTIFIER_START)
+                        _push(TokenType.PYTHONEXPR_IDENTIFIER_START)
+                        current_state.put(TS.PYTHONEXPR_EXPRESSION)
+                    else:  # Fixed: was dropped.
+                        cur_token_value += cur_ignored_token_value
+                else:
+                    cur_token_value += cur_ignored_token_value
+            elif not dont_save_char:
+                cur_token_value += c
+        elif current_state.top() == TS.VARIABLE_NAME:
+            if c == ":":
+                _flush(TokenType.VARIABLE_NAME)
+                current_state.get()
+                current_state.put(TS.VARIABLE_DECORATE)
+            elif c == "}":
+                if _read(1) != "}":
+                    msg = "Invalid variable expression."
+                    raise RUValueError(msg)
+                _flush(TokenType.VARIABLE_NAME)
+                _push(TokenType.VARIABLE_IDENTIFIER_END)
+                current_state.get()
+                current_state.get()
+            else:
+                cur_token_value += c
+        elif current_state.top() == TS.PYTHONEXPR_EXPRESSION:
+            if c == "}":
+                cur_ignored_token_value = c  # Fixed: was `+=`.
+                next_c = _read(1)
+                cur_ignored_token_value += next_c
+                if next_c == "}":
+                    _flush(TokenType.PYTHONEXPR_EXPRESSION)
+                    current_state.get()
+                    current_state.get()
+                    _push(TokenType.PYTHONEXPR_IDENTIFIER_END)
+                else:
+                    cur_token_value += cur_ignored_token_value
+            else:
+                cur_token_value += c
+        elif current_state.top() == TS.VARIABLE_DECORATE:
+            idx -= 1
+            if c in (":", "}"):
+                msg = "Invalid variable decorate expression."
+                raise RUValueError(msg)
+            _push(TokenType.VARIABLE_DECORATE)
+            current_state.put(TS.DECORATE_CONSTANT)
+
+    if cur_token_value:
+        res.append(Token(TokenType.CONSTANT, cur_token_value))
+
+    if current_state.get() != TS.CONSTANT or not current_state.empty():
+        msg = "Invalid variable expression."
+        raise RUValueError(msg)
+
+    for token in res:
+        if token.token_type == TokenType.VARIABLE_NAME:
+            token.value = token.value.strip()
+            if not re.match(r"^[a-zA-Z0-9_.-]*$", token.value):
+                msg = "Invalid variable name."
+                raise RUValueError(msg)
+
+    return res
+
+
+def _run(
+    lexer: "type[object] | object",
+    expression: str,
+) -> list[Token] | str:
+    try:
+        return lexer(expression)  # type: ignore[operator]
+    except RUValueError as exc:
+        return f"{type(exc).__name__}: {exc}"
+
+
+_FRAGMENTS = [
+    "$",
+    "{",
+    "}",
+    "{{",
+    "}}",
+    "${{",
+    "$&{{",
+    "$&{",
+    ":",
+    "&",
+    "a",
+    "b.c",
+    " ",
+    "\n",
+    "$HOME",
+    "1 + 1",
+]
+
+
+class TestLexerDifferential:
+    """Compare the scanner with the reference lexer."""
+
+    def test_random(self) -> None:
+        """Test random expressions."""
+        rand = random.Random(20241018)  # noqa: S311
+        for _ in range(5000):
+            expression = "".join(
+                rand.choices(_FRAGMENTS, k=rand.randint(0, 12)),
+            )
+            expected = _run(_reference_get_token, expression)
+            actual = _run(get_token, expression)
+            if expected != actual:
+                pytest.fail(
+                    f"{expression!r}: expected {expected!r}, got {actual!r}",
+                )
+
+    def test_dollar_is_kept(self) -> None:
+        """Test non-variable '$' is not duplicated or dropped."""
+        if get_token("echo $HOME $PATH $&{x ${{v}}")[0] != Token(
+            TokenType.CONSTANT,
+            "echo $HOME $PATH $&{x ",
+        ):
+            pytest.fail("Constant should be kept as-is.")
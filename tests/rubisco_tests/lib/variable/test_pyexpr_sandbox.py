@@ -22,11 +22,13 @@
 
 import pytest
 
+from rubisco.lib.variable.format import format_str
 from rubisco.lib.variable.pyexpr_sandbox import (
     RUEvalError,
     RUFunctionDisallowedError,
     eval_pyexpr,
 )
+from rubisco.lib.variable.variable import push_variables, variables
 
 
 class TestEval:
@@ -39,6 +41,25 @@ class TestEval:
         if eval_pyexpr('"str" * 2') != "strstr":
             pytest.fail('"str" * 2 != "strstr"')
 
+    def test_padded(self) -> None:
+        """Test expressions padded with whitespace."""
+        if eval_pyexpr(" 1 + 1 ") != 2:  # noqa: PLR2004
+            pytest.fail("Padded expression should be stripped.")
+        if eval_pyexpr("\t1 + 1\n") != 2:  # noqa: PLR2004
+            pytest.fail("Padded expression should be stripped.")
+        if format_str("$&{{ 1 + 1 }}") != 2:  # noqa: PLR2004
+            pytest.fail("Padded template expression should be stripped.")
+
+    def test_builtins_readonly(self) -> None:
+        """Test expressions can't change the shared builtins."""
+        pytest.raises(
+            RUEvalError,
+            eval_pyexpr,
+            "__builtins__.__setitem__('len', None)",
+        )
+        if eval_pyexpr("len([1])") != 1:
+            pytest.fail("Builtins are changed by an expression.")
+
     def test_syntax_error(self) -> None:
         """Test syntax error."""
         pytest.raises(
@@ -70,3 +91,26 @@ class TestEval:
             eval_pyexpr,
             'exec(\'__import__("o" + "s")\')',
         )
+
+    def test_variables(self) -> None:
+        """Test variables are resolved in the expression."""
+        variables.clear()
+        push_variables("a", 1)
+        push_variables("items", [1, 2])
+        if eval_pyexpr("[x + a for x in items]") != [2, 3]:
+            pytest.fail("Variables should be visible in comprehensions.")
+        push_variables("a", 2)
+        if eval_pyexpr("a") != 2:  # noqa: PLR2004
+            pytest.fail("The cached code should read the current variable.")
+        pytest.raises(RUEvalError, eval_pyexpr, "undefined_var")
+
+    def test_disallowed_function_override(self) -> None:
+        """Test variables can't override disallowed functions."""
+        variables.clear()
+        push_variables("open", print)
+        pytest.raises(
+            RUFunctionDisallowedError,
+            eval_pyexpr,
+            "open('test.txt')",
+        )
+        variables.clear()
@@ -0,0 +1,80 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Test rubisco.lib.variable.references module."""
+
+import pytest
+
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable.autoformatdict import AutoFormatDict
+from rubisco.lib.variable.references import (
+    VariableReferences,
+    get_expression_references,
+    get_variable_references,
+)
+from rubisco.lib.variable.ru_ast import get_references
+from rubisco.lib.variable.template_cache import get_template
+from rubisco.lib.variable.variable import variables
+
+
+class TestReferences:
+    """Test variable references analysis."""
+
+    def test_template(self) -> None:
+        """Test references of a template string."""
+        refs = get_variable_references("${{a}}-${{b:${{c}}}} $&{{1 + 1}}")
+        if refs.names != {"a", "b", "c"}:
+            pytest.fail(f"Wrong references: {refs.names}")
+        if not refs.is_opaque or refs.opaque != ("1 + 1",):
+            pytest.fail("Python expression should be opaque.")
+        if get_variable_references("plain text") != VariableReferences():
+            pytest.fail("Constant should reference nothing.")
+        if get_variable_references(1).names:
+            pytest.fail("Non-string should reference nothing.")
+        pytest.raises(RUValueError, get_variable_references, "${{a")
+
+    def test_memo_references(self) -> None:
+        """Test the references used by the memo agree with the analysis."""
+        for template in (
+            "${{a}}-${{b:${{c}}}}",
+            "${{a:$&{{b}}}}",
+            "${{a}} $&{{1 + 1}}",
+        ):
+            expr = get_template(template).expression
+            refs = get_expression_references(expr)
+            expected = None if refs.is_opaque else refs.names
+            if get_references(expr) != expected:
+                pytest.fail(f"References of {template!r} disagree.")
+
+    def test_tree(self) -> None:
+        """Test references of an AutoFormatDict without formatting it."""
+        variables.clear()
+        afd = AutoFormatDict(
+            {
+                "${{key}}": {"x": ["${{item}}", 1, {"y": "${{deep}}"}]},
+                "z": "${{undefined}}",
+            },
+        )
+        refs = get_variable_references(afd)
+        if refs.names != {"key", "item", "deep", "undefined"}:
+            pytest.fail(f"Wrong references: {refs.names}")
+        if refs.is_opaque:
+            pytest.fail("The tree has no python expression.")
+        merged = refs | get_variable_references("$&{{x}}")
+        if merged.names != refs.names or merged.opaque != ("x",):
+            pytest.fail("Merged references are wrong.")
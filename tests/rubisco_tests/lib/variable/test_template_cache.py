@@ -0,0 +1,178 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.lib.variable.template_cache module."""
+
+import pytest
+
+from rubisco.lib.exceptions import RUValueError
+from rubisco.lib.variable.autoformatdict import AutoFormatDict
+from rubisco.lib.variable.format import format_str, format_str_memoized
+from rubisco.lib.variable.template_cache import (
+    DEFAULT_TEMPLATE_CACHE_SIZE,
+    clear_template_cache,
+    get_template,
+    has_template_syntax,
+    render_memo_info,
+    set_template_cache_size,
+    template_cache_info,
+)
+from rubisco.lib.variable.variable import (
+    pop_variables,
+    push_variables,
+    variables,
+)
+from rubisco.shared.api.variable import get_orig_variables
+
+
+class TestTemplateCache:
+    """Test template cache."""
+
+    def _reset(self) -> None:
+        variables.clear()
+        set_template_cache_size(DEFAULT_TEMPLATE_CACHE_SIZE)
+        clear_template_cache()
+
+    def test_has_template_syntax(self) -> None:
+        """Test has_template_syntax."""
+        if has_template_syntax("hello $world {{}}"):
+            pytest.fail("Constant string should not need to be parsed.")
+        if not has_template_syntax("hello ${{world}}"):
+            pytest.fail("Variable should need to be parsed.")
+        if not has_template_syntax("$&{{1 + 1}}"):
+            pytest.fail("Python expression should need to be parsed.")
+
+    def test_hit_and_miss(self) -> None:
+        """Test hit and miss counters."""
+        self._reset()
+        expr1 = get_template("${{a}}")
+        expr2 = get_template("${{a}}")
+        if expr1 is not expr2:
+            pytest.fail("The parsed template should be cached.")
+        info = template_cache_info()
+        if (info.hits, info.misses, info.currsize) != (1, 1, 1):
+            pytest.fail(f"Unexpected cache info: {info}")
+
+    def test_constant_skip_cache(self) -> None:
+        """Test constant strings skip the lexer and the cache."""
+        self._reset()
+        if format_str("hello world") != "hello world":
+            pytest.fail("format_str() should return the same string.")
+        if template_cache_info().misses != 0:
+            pytest.fail("Constant string should not be parsed.")
+
+    def test_lru(self) -> None:
+        """Test the least recently used template is evicted."""
+        self._reset()
+        set_template_cache_size(2)
+        expr_a = get_template("${{a}}")
+        get_template("${{b}}")
+        get_template("${{a}}")
+        get_template("${{c}}")  # Evict ${{b}}.
+        if template_cache_info().currsize != 2:  # noqa: PLR2004
+            pytest.fail("Cache size should be bounded.")
+        if get_template("${{a}}") is not expr_a:
+            pytest.fail("${{a}} should still be cached.")
+        misses = template_cache_info().misses
+        get_template("${{b}}")
+        if template_cache_info().misses != misses + 1:
+            pytest.fail("${{b}} should be evicted.")
+        self._reset()
+
+    def test_disable(self) -> None:
+        """Test disable the cache."""
+        self._reset()
+        set_template_cache_size(0)
+        if format_str("${{a}}", fmt={"a": 1}) != 1:
+            pytest.fail("format_str() should work without cache.")
+        if get_template("${{a}}") is get_template("${{a}}"):
+            pytest.fail("Template should not be cached.")
+        if template_cache_info().currsize != 0:
+            pytest.fail("Cache should be empty.")
+        pytest.raises(ValueError, set_template_cache_size, -1)
+        self._reset()
+
+    def test_error_not_cached(self) -> None:
+        """Test invalid templates raise every time."""
+        self._reset()
+        pytest.raises(RUValueError, format_str, "${{a")
+        pytest.raises(RUValueError, format_str, "${{a")
+        if template_cache_info().currsize != 0:
+            pytest.fail("Invalid template should not be cached.")
+
+    def test_memoized(self) -> None:
+        """Test memoized rendering is invalidated by push and pop."""
+        self._reset()
+        push_variables("a", "1")
+        template = "${{a}}-${{b:x}}"
+        if format_str_memoized(template) != "1-x":
+            pytest.fail("Wrong rendered value.")
+        if format_str_memoized(template) != "1-x":
+            pytest.fail("Wrong memoized value.")
+        info = render_memo_info()
+        if (info.hits, info.misses) != (1, 1):
+            pytest.fail(f"Unexpected memo info: {info}")
+        push_variables("b", "2")
+        if format_str_memoized(template) != "1-2":
+            pytest.fail("Push should invalidate the memoized value.")
+        pop_variables("b")
+        if format_str_memoized(template) != "1-x":
+            pytest.fail("Pop should invalidate the memoized value.")
+        push_variables("c", "3")
+        format_str_memoized(template)
+        if render_memo_info().hits != 2:  # noqa: PLR2004
+            pytest.fail("Unrelated variable should not invalidate.")
+        if format_str_memoized("$&{{1 + 1}}") != 2:  # noqa: PLR2004
+            pytest.fail("Python expression should be rendered.")
+        if render_memo_info().uncacheable != 1:
+            pytest.fail("Python expression should not be memoized.")
+        self._reset()
+
+    def test_memoized_autoformatdict(self) -> None:
+        """Test AutoFormatDict values follow the variables."""
+        self._reset()
+        afd = AutoFormatDict({"${{k}}": "${{v}}", "x": ["${{v}}"]})
+        push_variables("k", "key")
+        push_variables("v", 1)
+        if afd["key"] != 1 or afd["x"][0] != 1:
+            pytest.fail("Wrong formatted value.")
+        push_variables("v", 2)
+        if afd["key"] != 2 or afd["x"][0] != 2:  # noqa: PLR2004
+            pytest.fail("Memoized value should be invalidated.")
+        if render_memo_info().hits == 0:
+            pytest.fail("Formatted key should be memoized.")
+        self._reset()
+
+    def test_memoized_orig_variables(self) -> None:
+        """Test the stacks changed by extensions invalidate the memo."""
+        self._reset()
+        push_variables("x", 1)
+        afd = AutoFormatDict({"k": "${{x}}"})
+        if afd["k"] != 1:
+            pytest.fail("Wrong formatted value.")
+        get_orig_variables()["x"].put(2)
+        if afd["k"] != 2:  # noqa: PLR2004
+            pytest.fail("Memoized value should be invalidated.")
+        get_orig_variables()["x"][-1] = 3
+        if afd["k"] != 3:  # noqa: PLR2004
+            pytest.fail("Memoized value should be invalidated.")
+        get_orig_variables()["x"].get()
+        if afd["k"] != 1:
+            pytest.fail("Memoized value should be invalidated.")
+        self._reset()
@@ -19,18 +19,120 @@
 
 """Test rubisco.lib.variable.typecheck module."""
 
-from types import EllipsisType, NoneType
-from typing import Any
+import itertools
+import warnings
+from types import EllipsisType, GenericAlias, NoneType, UnionType
+from typing import Any, cast, get_args, get_origin
 
 import pytest
 
 from rubisco.lib.variable.typecheck import (
     AutoFormatDict,
     AutoFormatList,
+    compile_type_checker,
     is_instance,
+    rubisco_isinstance,
 )
 
 
+# The uncompiled implementation, as the reference of the compiled one.
+def _ref_generic_alias_dict(
+    obj: dict[Any, Any],
+    args: tuple[Any, ...],
+) -> bool:
+    if len(args) != 2:  # noqa: PLR2004
+        msg = "Invalid generic type"
+        raise TypeError(msg)
+    keytype, valtype = args
+    keytype: type | GenericAlias | UnionType | None
+    valtype: type | GenericAlias | UnionType | None
+    if type(obj).__name__ == "AutoFormatDict":
+        return all(
+            ref_is_instance(key, keytype) and ref_is_instance(val, valtype)
+            for key, val in cast("AutoFormatDict", obj).orig_items()
+        )
+    return all(
+        ref_is_instance(key, keytype) and ref_is_instance(val, valtype)
+        for key, val in obj.items()
+    )
+
+
+def _ref_generic_alias_tuple(
+    obj: Any,  # noqa: ANN401
+    args: tuple[Any, ...],
+) -> bool:
+    if len(args) == 1:
+        argstype = (args[0], ...)
+    argstype = args
+
+    if argstype[-1] is Ellipsis:
+        argtype = args[0]
+        argtype: type | GenericAlias | UnionType | None
+        return all(ref_is_instance(item, argtype) for item in obj)
+    for i, argtype in enumerate(args):
+        if i >= len(obj):
+            break
+        if not ref_is_instance(obj[i], argtype):
+            return False
+    return True
+
+
+def _ref_generic_alias(  # pylint: disable=R0911  # noqa: PLR0911
+    obj: Any,  # noqa: ANN401
+    objtype: GenericAlias,
+) -> bool:
+    orig = get_origin(objtype)
+    # get_origin will return None, but type checker thinks it
+    # returns a type always.
+    if orig is None:  # type: ignore[arg-type]
+        msg = "Invalid generic type"
+        raise TypeError(msg)
+
+    if not rubisco_isinstance(obj, orig):
+        return False
+
+    args = get_args(objtype)
+    if not args:
+        return True
+
+    if orig in (list, set, AutoFormatList):
+        argtype = args[0]
+        argtype: type | GenericAlias | UnionType | None
+        return all(ref_is_instance(item, argtype) for item in obj)
+    if orig is dict or orig.__name__ == "AutoFormatDict":
+        return _ref_generic_alias_dict(obj, args)
+    if orig is tuple:
+        return _ref_generic_alias_tuple(obj, args)
+    if orig is EllipsisType:
+        # Ellipsis is a valid type for all objects.
+        return True
+
+    warnings.warn(
+        f"Unsupported generic type: {orig}",
+        RuntimeWarning,
+        stacklevel=2,
+    )
+    return rubisco_isinstance(obj, orig)
+
+
+def ref_is_instance(
+    obj: Any,  # noqa: ANN401
+    objtype: type | GenericAlias | UnionType | None,
+) -> bool:
+    """Check types like the uncompiled implementation."""
+    if objtype is None:
+        return obj is None
+
+    if get_origin(objtype) is UnionType:
+        return any(ref_is_instance(obj, t) for t in get_args(objtype))
+
+    if rubisco_isinstance(objtype, GenericAlias):
+        ot = cast("GenericAlias", objtype)
+        return _ref_generic_alias(obj, ot)
+
+    return rubisco_isinstance(obj, cast("type", objtype))
+
+
 class TestIsInstance:
     """Test is_instance."""
 
@@ -147,3 +249,75 @@ class TestIsInstance:
             pytest.fail("Type check failed.")
         if not is_instance(Any, object):
             pytest.fail("Type check failed.")
+
+    def test_differential(self) -> None:
+        """Test the compiled checkers have the same verdicts."""
+        types: list[Any] = [
+            None,
+            object,
+            int,
+            str,
+            bool,
+            list,
+            dict,
+            tuple,
+            AutoFormatList,
+            AutoFormatDict,
+            int | str,
+            str | None,
+            list | dict,
+            list[str],
+            list[int | str],
+            list[list[str]],
+            set[str],
+            dict[str, str],
+            dict[str, int | None],
+            dict[str, list[str]],
+            dict[str, object],
+            tuple[int],
+            tuple[int, str],
+            tuple[str, ...],
+            list[str] | None,
+        ]
+        objs: list[Any] = [
+            None,
+            1,
+            True,
+            "",
+            "a",
+            [],
+            ["a", "b"],
+            ["a", 1],
+            [["a"], ["b"]],
+            [["a"], "b"],
+            {"a"},
+            {},
+            {"a": "b"},
+            {"a": 1, "b": None},
+            {"a": ["b"]},
+            {1: "a"},
+            (),
+            (1,),
+            (1, "a"),
+            ("a", "b"),
+            AutoFormatList(["a"]),
+            AutoFormatList([1]),
+            AutoFormatDict({"a": "b"}),
+            AutoFormatDict({"a": 1}),
+        ]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for objtype, obj in itertools.product(types, objs):
+                if is_instance(obj, objtype) != ref_is_instance(obj, objtype):
+                    pytest.fail(f"Verdict mismatch: {obj!r}, {objtype!r}")
+
+    def test_cached(self) -> None:
+        """Test the checker is compiled only once."""
+        if compile_type_checker(list[str]) is not compile_type_checker(
+            list[str],
+        ):
+            pytest.fail("Compiled checker should be cached.")
+        if not is_instance(["a"] * 1000, list[str]):
+            pytest.fail("Type check failed.")
+        if is_instance(["a"] * 1000 + [1], list[str]):
+            pytest.fail("Type check failed.")
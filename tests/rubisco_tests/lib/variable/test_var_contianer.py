@@ -49,3 +49,21 @@ class TestVariableContainer:
         """Test the VariableContainer class with None format dictionary."""
         with VariableContainer(None):
             pass
+
+    def test_variable_container_nested(self) -> None:
+        """Test entering the same container again before exiting it."""
+        fmt = {"var1": "outer"}
+        container = VariableContainer(fmt)
+        with container:
+            fmt["var1"] = "inner"
+            fmt["var2"] = "inner"
+            with container:
+                if get_variable("var2") != "inner":
+                    pytest.fail("var2 is not set correctly.")
+            if has_variable("var2"):
+                pytest.fail("Inner frame should be popped.")
+            if get_variable("var1") != "outer":
+                pytest.fail("Outer frame should be kept.")
+
+        if has_variable("var1") or has_variable("var2"):
+            pytest.fail("Variables should be removed after context exit.")
@@ -19,15 +19,27 @@
 
 """Test rubisco.lib.variable.variable module."""
 
+import asyncio
+import threading
+
 import pytest
 
+from rubisco.lib.variable.callbacks import undefined_var_callbacks
+from rubisco.lib.variable.format import format_str
 from rubisco.lib.variable.variable import (
+    current_scope,
+    enter_scope,
+    fork_scope,
     get_variable,
     has_variable,
+    join_scope,
+    pop_frame,
     pop_variables,
+    push_frame,
     push_variables,
     variables,
 )
+from rubisco.shared.api.variable import get_orig_variables
 
 
 class TestVariable:
@@ -72,3 +84,162 @@ class TestVariable:
         push_variables("a", 1)
         if pop_variables("a", default=2) != 1:
             pytest.fail("Variable a should be 1.")
+
+    def test_frame(self) -> None:
+        """Test push and pop a frame."""
+        self._reset()
+        push_variables("a", 1)
+        frame = push_frame({"a": 2, "b": 3})
+        if get_variable("a") != 2 or get_variable("b") != 3:  # noqa: PLR2004
+            pytest.fail("Frame variables should be pushed.")
+        pop_frame(frame)
+        if get_variable("a") != 1:
+            pytest.fail("Variable a should be restored.")
+        if has_variable("b"):
+            pytest.fail("Variable b should not exist.")
+
+    def test_scope(self) -> None:
+        """Test the forked scope is copy-on-write."""
+        self._reset()
+        push_variables("a", 1)
+        push_variables("b", 1)
+        root = current_scope()
+        with enter_scope() as scope:
+            if current_scope() is not scope or get_variable("a") != 1:
+                pytest.fail("Forked scope should have the parent variables.")
+            push_variables("a", 2)
+            pop_variables("b")
+            push_variables("c", 3)
+            if format_str("${{a}}${{b:x}}${{c}}") != "2x3":
+                pytest.fail("Forked scope should see its own variables.")
+        if current_scope() is not root:
+            pytest.fail("The parent scope should be restored.")
+        if get_variable("a") != 1 or get_variable("b") != 1:
+            pytest.fail("The parent scope should not be changed.")
+        if has_variable("c") or format_str("${{a}}${{b:x}}") != "11":
+            pytest.fail("The parent scope should not be changed.")
+        self._reset()
+
+    def test_join_scope(self) -> None:
+        """Test applying the changes of a forked scope."""
+        self._reset()
+        push_variables("a", 1)
+        push_variables("b", 1)
+        push_variables("c", 1)
+        scope = fork_scope()
+        with enter_scope(scope):
+            push_variables("a", 2)
+            pop_variables("b")
+        push_variables("c", 2)
+        join_scope(scope)
+        if variables["a"] != [1, 2] or has_variable("b"):
+            pytest.fail("Changes of the forked scope should be applied.")
+        if get_variable("c") != 2:  # noqa: PLR2004
+            pytest.fail("Unchanged variables should be kept.")
+        push_variables("a", 3)
+        if scope["a"] != [1, 2]:
+            pytest.fail("The joined stacks should be copy-on-write.")
+        self._reset()
+
+    def test_orig_variables(self) -> None:
+        """Test changing the stacks of the original variables."""
+        self._reset()
+        push_variables("a", 1)
+        push_variables("a", 2)
+        with enter_scope():
+            get_orig_variables()["a"].put(3)
+            stack = get_orig_variables()["a"]
+            if stack != [1, 2, 3] or stack.top() != 3:  # noqa: PLR2004
+                pytest.fail("The stack of the child scope should be changed.")
+            stack[0] = 0
+            if stack.get() != 3 or get_variable("a") != 2:  # noqa: PLR2004
+                pytest.fail("The stack should be popped.")
+        if variables["a"] != [1, 2]:
+            pytest.fail("The parent scope should not be changed.")
+
+        stack = variables["a"]
+        stack.get()
+        stack.get()
+        if not stack.empty() or has_variable("a"):
+            pytest.fail("The empty stack should be removed.")
+        self._reset()
+
+    def test_scope_threads(self) -> None:
+        """Test threads with their own scopes."""
+        self._reset()
+        push_variables("name", "main")
+        errors: list[str] = []
+
+        def _worker(idx: int, scope: object) -> None:
+            with enter_scope(scope):  # type: ignore[arg-type]
+                for i in range(200):
+                    push_variables("name", f"{idx}-{i}")
+                    if format_str("${{name}}") != f"{idx}-{i}":
+                        errors.append(f"Thread {idx} saw other values.")
+                    pop_variables("name")
+                if get_variable("name") != "main":
+                    errors.append(f"Thread {idx} lost the parent value.")
+
+        threads = [
+            threading.Thread(target=_worker, args=(idx, fork_scope()))
+            for idx in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            pytest.fail(errors[0])
+        if variables["name"] != ["main"]:
+            pytest.fail("The root scope should not be changed.")
+        self._reset()
+
+    def test_scope_tasks(self) -> None:
+        """Test asyncio tasks with their own scopes."""
+        self._reset()
+
+        async def _task(idx: int) -> str:
+            with enter_scope():
+                push_variables("task", idx)
+                await asyncio.sleep(0)
+                return format_str("task-${{task}}")
+
+        async def _main() -> list[str]:
+            return list(await asyncio.gather(*(_task(i) for i in range(4))))
+
+        if asyncio.run(_main()) != [f"task-{i}" for i in range(4)]:
+            pytest.fail("Tasks should see their own variables.")
+        if has_variable("task"):
+            pytest.fail("The root scope should not be changed.")
+
+    def test_undefined_callbacks_once(self) -> None:
+        """Test callbacks run once per name until it's changed."""
+        self._reset()
+        calls: list[str] = []
+
+        def _callback(name: str) -> None:
+            calls.append(name)
+            if name == "lazy":
+                push_variables("lazy", "value")
+
+        undefined_var_callbacks.append(_callback)
+        try:
+            for _ in range(3):
+                if format_str("${{u:default}}") != "default":
+                    pytest.fail("The decoration should be used.")
+                if get_variable("u", default=1) != 1:
+                    pytest.fail("The default value should be returned.")
+            if calls != ["u"]:
+                pytest.fail(f"Callbacks should run only once: {calls}")
+
+            push_variables("u", 1)
+            pop_variables("u")
+            get_variable("u", default=1)
+            if calls != ["u", "u"]:
+                pytest.fail("Push and pop should invalidate the cache.")
+
+            if get_variable("lazy") != "value" or calls[-1] != "lazy":
+                pytest.fail("Callbacks should be able to define it.")
+        finally:
+            undefined_var_callbacks.remove(_callback)
+        self._reset()
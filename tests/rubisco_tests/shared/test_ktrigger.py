@@ -19,6 +19,7 @@
 
 """Test rubisco.shared.ktrigger module."""
 
+import threading
 from contextlib import suppress
 from typing import Any
 
@@ -28,6 +29,7 @@ from rubisco.lib.exceptions import RUValueError
 from rubisco.shared.ktrigger import (
     IKernelTrigger,
     bind_ktrigger_interface,
+    buffer_ktriggers,
     call_ktrigger,
 )
 
@@ -55,6 +57,10 @@ class TestKrigger:
             }:
                 raise AssertionError
 
+        def on_test4(self, calls: list[str]) -> None:
+            """Test4: KTrigger records its calls."""
+            calls.append("on_test4")
+
         def on_test3(self) -> None:
             """Test3: KTrigger raises an exception."""
             msg = "Test3 exception."
@@ -85,3 +91,41 @@ class TestKrigger:
     def test_non_exists_krigger(self) -> None:
         """Test calling a non-exists KTrigger."""
         call_ktrigger("non_exists")
+
+    def test_buffer_ktriggers(self) -> None:
+        """Test deferring KTrigger calls."""
+        calls: list[str] = []
+        with buffer_ktriggers() as buffer:
+            call_ktrigger("on_test4", calls=calls)
+            call_ktrigger("on_test4", calls=calls)
+        if calls:
+            pytest.fail("KTrigger calls should be deferred.")
+        buffer.flush()
+        if calls != ["on_test4", "on_test4"]:
+            pytest.fail(f"Unexpected calls: {calls}")
+        buffer.flush()
+        if len(calls) != 2:  # noqa: PLR2004
+            pytest.fail("Flushed calls should be cleared.")
+
+    def test_nested_buffer(self) -> None:
+        """Test flushing a nested buffer to its parent."""
+        calls: list[str] = []
+        with buffer_ktriggers() as parent:
+            with buffer_ktriggers() as buffer:
+                call_ktrigger("on_test4", calls=calls)
+                buffer.flush()
+
+            # Context variables are not inherited by threads.
+            def _job() -> None:
+                with buffer_ktriggers(parent) as job_buffer:
+                    call_ktrigger("on_test4", calls=calls)
+                    job_buffer.flush()
+
+            thread = threading.Thread(target=_job)
+            thread.start()
+            thread.join()
+            if calls:
+                pytest.fail("Nested buffer should be flushed to its parent.")
+        parent.flush()
+        if calls != ["on_test4", "on_test4"]:
+            pytest.fail(f"Unexpected calls: {calls}")
@@ -0,0 +1,180 @@
+# -*- mode: python -*-
+# vi: set ft=python :
+
+# Copyright (C) 2024 The C++ Plus Project.
+# This file is part of the Rubisco.
+#
+# Rubisco is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Rubisco is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test rubisco.shared.trace module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from rubisco.envutils.env import WORKSPACE_ENV
+from rubisco.kernel.workflow import run_inline_workflow
+from rubisco.lib.variable import AutoFormatDict
+from rubisco.shared.extension import load_extension
+from rubisco.shared.ktrigger import (
+    IKernelTrigger,
+    bind_ktrigger_interface,
+    buffer_ktriggers,
+    call_ktrigger,
+    ktriggers,
+)
+from rubisco.shared.trace import TraceKTrigger
+
+TRACE_EXTENSION_INFO = """{
+    "name": "tracetest",
+    "version": "0.1.0",
+    "description": "Trace test extension.",
+    "homepage": "https://github.com/cppp-project/rubisco",
+    "maintainers": ["ChenPi11"],
+    "license": "GPL-3.0",
+    "tags": ["test"]
+}
+"""
+
+TRACE_EXTENSION_MODULE = """
+from rubisco.lib.version import Version
+from rubisco.shared.extension import IRUExtension
+from rubisco.shared.ktrigger import IKernelTrigger
+
+
+class TraceTestExtension(IRUExtension):
+    name = "tracetest"
+    version = Version((0, 1, 0))
+    ktrigger = IKernelTrigger()
+    workflow_steps = {}
+    steps_contributions = {}
+
+    def extension_can_load_now(self):
+        return True
+
+    def reqs_is_solved(self):
+        return True
+
+    def on_load(self):
+        pass
+
+    def solve_reqs(self):
+        pass
+
+
+instance = TraceTestExtension()
+"""
+
+
+class TestTraceKTrigger:
+    """Test TraceKTrigger."""
+
+    @classmethod
+    def setup_class(cls) -> None:
+        """Bind the tracer."""
+        cls.tracer = TraceKTrigger()
+        bind_ktrigger_interface("test-trace", cls.tracer)
+
+    @classmethod
+    def teardown_class(cls) -> None:
+        """Unbind the tracer."""
+        ktriggers.pop("test-trace")
+
+    def _find(self, name: str) -> dict:
+        for event in self.tracer.get_events():
+            if event["name"] == name:
+                return event
+        pytest.fail(f"Event {name} is not recorded.")
+
+    def test_workflow(self, tmp_path: Path) -> None:
+        """Test tracing a workflow."""
+        run_inline_workflow(
+            AutoFormatDict(
+                {
+                    "name": "trace-wf",
+                    "steps": [{"name": "trace-step", "echo": "hi"}],
+                },
+            ),
+            "trace-wf",
+        )
+        workflow = self._find("trace-wf")
+        step = self._find("trace-step")
+        if (workflow["ph"], workflow["cat"]) != ("X", "workflow"):
+            pytest.fail("Workflow event is wrong.")
+        if step["args"]["id"] != "trace-wf.trace-wf.steps.0":
+            pytest.fail("Step event is wrong.")
+        if not (
+            workflow["ts"] <= step["ts"]
+            and step["ts"] + step["dur"] <= workflow["ts"] + workflow["dur"]
+        ):
+            pytest.fail("Step is not in its workflow.")
+
+        self.tracer.save(tmp_path / "trace.json")
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        if not any(
+            event["name"] == "trace-wf" for event in trace["traceEvents"]
+        ):
+            pytest.fail("Trace file is wrong.")
+
+    def test_load_extension(self, tmp_path: Path) -> None:
+        """Test tracing an extension loading."""
+        (tmp_path / "rubisco.json").write_text(TRACE_EXTENSION_INFO)
+        (tmp_path / "tracetest").mkdir()
+        (tmp_path / "tracetest" / "__init__.py").write_text(
+            TRACE_EXTENSION_MODULE,
+        )
+        load_extension(tmp_path, WORKSPACE_ENV, strict=True)
+        event = self._find("tracetest")
+        if (event["ph"], event["cat"]) != ("X", "extension"):
+            pytest.fail("Extension event is wrong.")
+
+    def test_unfinished(self) -> None:
+        """Test tracing an unfinished operation."""
+        call_ktrigger(
+            IKernelTrigger.on_new_task,
+            task_start_msg="",
+            task_name="trace-task",
+            total=1,
+        )
+        event = self._find("trace-task")
+        if event["ph"] != "B" or not event["args"]["unfinished"]:
+            pytest.fail("Unfinished event is wrong.")
+        call_ktrigger(IKernelTrigger.on_finish_task, task_name="trace-task")
+        if self._find("trace-task")["ph"] != "X":
+            pytest.fail("Finished event is wrong.")
+
+    def test_buffered(self) -> None:
+        """Test the tracer is not buffered."""
+        with buffer_ktriggers() as buffer:
+            call_ktrigger(
+                IKernelTrigger.on_new_task,
+                task_start_msg="",
+                task_name="trace-buffered",
+                total=1,
+            )
+            call_ktrigger(
+                IKernelTrigger.on_finish_task,
+                task_name="trace-buffered",
+            )
+            if self._find("trace-buffered")["ph"] != "X":
+                pytest.fail("Tracer is buffered.")
+            buffer.flush()
+        events = [
+            event
+            for event in self.tracer.get_events()
+            if event["name"] == "trace-buffered"
+        ]
+        if len(events) != 1:
+            pytest.fail("Buffered calls are traced again when flushed.")